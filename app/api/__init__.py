@@ -1,26 +1,45 @@
+from importlib import import_module
+from typing import Iterable, Optional
+
 from fastapi import APIRouter
 
 from config import settings
+from startup_timing import startup_timer
+
+# Routers are imported only when enabled, see settings.app.routers
+ROUTER_MODULES = {
+    "test": ".test",
+    "posts": ".posts",
+    "recipes": ".recipes",
+    "cuisines": ".cuisines",
+    "allergens": ".allergens",
+    "ingredients": ".ingredients",
+    "lab1": ".lab1_misc",
+    "auth": ".auth",
+    "users": ".users",
+    "stats": ".stats",
+    "batch": ".batch",
+}
+
+
+def build_router(enabled: Optional[Iterable[str]] = None) -> APIRouter:
+    if enabled is None:
+        enabled = settings.app.routers
+
+    router = APIRouter(
+        prefix=settings.url.prefix,
+    )
+    for name in enabled:
+        if name not in ROUTER_MODULES:
+            raise ValueError(f"Unknown router {name!r}")
+        with startup_timer.phase(f"app.routers.{name}"):
+            module = import_module(ROUTER_MODULES[name], __name__)
+            router.include_router(module.router)
+    return router
+
 
-from .test import router as test_router
-from .posts import router as posts_router
-from .auth import router as auth_router
-from .users import router as users_router
-from .recipes import router as recipes_router
-from .cuisines import router as cuisines_router
-from .allergens import router as allergens_router
-from .ingredients import router as ingredients_router
-from .lab1_misc import router as lab1_misc_router
-
-router = APIRouter(
-    prefix=settings.url.prefix,
-)
-#router.include_router(test_router)
-#router.include_router(posts_router)
-router.include_router(recipes_router)
-router.include_router(cuisines_router)
-router.include_router(allergens_router)
-router.include_router(ingredients_router)
-router.include_router(lab1_misc_router)
-router.include_router(auth_router)
-router.include_router(users_router)
+def __getattr__(name: str):
+    # Backwards compatible `from api import router`
+    if name == "router":
+        return build_router()
+    raise AttributeError(name)
@@ -51,13 +51,11 @@ async def update_allergen(
     allergen_update: AllergenUpdate,
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    queries = AllergenQueries(session)
-    allergen = await queries.get_by_id(allergen_id)
+    repository = AllergenRepository(session)
+    allergen = await repository.update(allergen_id, allergen_update)
     if not allergen:
         raise HTTPException(status_code=404, detail="Allergen not found")
-    
-    repository = AllergenRepository(session)
-    return await repository.update(allergen_id, allergen_update)
+    return allergen
 
 
 # Delete Allergen
@@ -65,11 +63,7 @@ async def update_allergen(
 async def delete_allergen(
     allergen_id: int, session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    queries = AllergenQueries(session)
-    allergen = await queries.get_by_id(allergen_id)
-    if not allergen:
-        raise HTTPException(status_code=404, detail="Allergen not found")
-    
     repository = AllergenRepository(session)
-    await repository.delete(allergen_id)
+    if not await repository.delete(allergen_id):
+        raise HTTPException(status_code=404, detail="Allergen not found")
     return
@@ -1,7 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from authentication.fastapi_users import fastapi_users
+from authentication.fastapi_users import fastapi_users, current_active_superuser
 from authentication.backend import authentication_backend
+from authentication.password_executor import password_executor
 from config import settings
 from authentication.schemas.user import (
     UserRead,
@@ -42,3 +43,10 @@ router.include_router(
 router.include_router(
     router=fastapi_users.get_reset_password_router(),
 )
+
+
+# /password-pool
+# Superusers only: queue depth and rejections show when a login flood is working
+@router.get("/password-pool", dependencies=[Depends(current_active_superuser)])
+async def password_pool_stats():
+    return password_executor.stats()
@@ -0,0 +1,115 @@
+import json
+import logging
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Request
+
+from config import settings
+from models import db_helper
+from schemas import BatchRequest, BatchResponse
+from schemas.batch import BatchSubRequest
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(
+    tags=["Batch"],
+    prefix="/batch",
+)
+
+# Request headers passed on to sub-requests
+FORWARDED_HEADERS = {b"authorization", b"cookie", b"accept-language"}
+READ_METHODS = {"GET"}
+
+
+async def call_in_process(request: Request, sub: BatchSubRequest) -> Dict[str, Any]:
+    """
+    Run one sub-request through the application's ASGI stack and collect the result.
+    """
+    path, _, query_string = sub.path.partition("?")
+    headers = [(k, v) for k, v in request.scope["headers"] if k in FORWARDED_HEADERS]
+    body = b""
+    if sub.body is not None:
+        body = json.dumps(sub.body).encode()
+        headers.append((b"content-type", b"application/json"))
+    headers.append((b"content-length", str(len(body)).encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "state": dict(request.scope.get("state", {})),
+        "method": sub.method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "headers": headers,
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    content_type = b""
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error middleware has already produced the 500 response
+        log.exception("Batch sub-request %s %s failed", sub.method, sub.path)
+        status = 500
+
+    payload = b"".join(chunks)
+    if not payload:
+        return {"status": status, "body": None}
+    if content_type.startswith(b"application/json"):
+        return {"status": status, "body": json.loads(payload)}
+    return {"status": status, "body": payload.decode(errors="replace")}
+
+
+# Run several API calls in one round trip
+@router.post("", response_model=BatchResponse)
+async def run_batch(body: BatchRequest, request: Request):
+    """
+    Sub-requests run in order. Consecutive GETs share one database session,
+    and so its identity map; each write uses its own session as usual.
+    """
+    if len(body.requests) > settings.limits.batch_max_requests:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.limits.batch_max_requests} requests per batch",
+        )
+    batch_path = request.url.path.rstrip("/")
+    if any(sub.path.partition("?")[0].rstrip("/") == batch_path for sub in body.requests):
+        raise HTTPException(status_code=422, detail="Batch requests cannot be nested")
+
+    responses = []
+    async with db_helper.session_factory() as read_session:
+        for sub in body.requests:
+            if sub.method in READ_METHODS:
+                async with db_helper.shared_session(read_session):
+                    result = await call_in_process(request, sub)
+                if result["status"] >= 500:
+                    await read_session.rollback()
+            else:
+                # End the read transaction so the write is not blocked by it and
+                # later reads do not see stale cached rows
+                await read_session.rollback()
+                result = await call_in_process(request, sub)
+            responses.append(result)
+    return {"responses": responses}
@@ -51,13 +51,11 @@ async def update_cuisine(
     cuisine_update: CuisineUpdate,
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    queries = CuisineQueries(session)
-    cuisine = await queries.get_by_id(cuisine_id)
+    repository = CuisineRepository(session)
+    cuisine = await repository.update(cuisine_id, cuisine_update)
     if not cuisine:
         raise HTTPException(status_code=404, detail="Cuisine not found")
-    
-    repository = CuisineRepository(session)
-    return await repository.update(cuisine_id, cuisine_update)
+    return cuisine
 
 
 # Delete Cuisine
@@ -65,11 +63,7 @@ async def update_cuisine(
 async def delete_cuisine(
     cuisine_id: int, session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    queries = CuisineQueries(session)
-    cuisine = await queries.get_by_id(cuisine_id)
-    if not cuisine:
-        raise HTTPException(status_code=404, detail="Cuisine not found")
-    
     repository = CuisineRepository(session)
-    await repository.delete(cuisine_id)
+    if not await repository.delete(cuisine_id):
+        raise HTTPException(status_code=404, detail="Cuisine not found")
     return
@@ -28,10 +28,15 @@ async def create_ingredient(
 async def read_ingredients(
     skip: int = 0,
     limit: int = 100,
+    sort: Optional[str] = Query(
+        None,
+        pattern="^-?(id|name|usage)$",
+        description="Sort field: id, name or usage (use '-' prefix for descending)",
+    ),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
     queries = IngredientQueries(session)
-    return await queries.get_all(skip, limit)
+    return await queries.get_all(skip, limit, sort)
 
 
 # Read Ingredient by ID
@@ -53,13 +58,11 @@ async def update_ingredient(
     ingredient_update: IngredientUpdate,
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    queries = IngredientQueries(session)
-    ingredient = await queries.get_by_id(ingredient_id)
+    repository = IngredientRepository(session)
+    ingredient = await repository.update(ingredient_id, ingredient_update)
     if not ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
-    
-    repository = IngredientRepository(session)
-    return await repository.update(ingredient_id, ingredient_update)
+    return ingredient
 
 
 # Delete Ingredient
@@ -67,13 +70,9 @@ async def update_ingredient(
 async def delete_ingredient(
     ingredient_id: int, session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    queries = IngredientQueries(session)
-    ingredient = await queries.get_by_id(ingredient_id)
-    if not ingredient:
-        raise HTTPException(status_code=404, detail="Ingredient not found")
-    
     repository = IngredientRepository(session)
-    await repository.delete(ingredient_id)
+    if not await repository.delete(ingredient_id):
+        raise HTTPException(status_code=404, detail="Ingredient not found")
     return
 
 
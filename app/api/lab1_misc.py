@@ -1,10 +1,17 @@
 from schemas import Item, FilterParams, FormData
-from fastapi import APIRouter, Query, Form, File, UploadFile, HTTPException, Path
+from services.upload_service import (
+    UploadService,
+    UploadTooLarge,
+    InvalidImageFormat,
+    MalformedUpload,
+    MultipartFileStream,
+    MULTIPART_OVERHEAD_BYTES,
+)
+from fastapi import APIRouter, Query, Form, HTTPException, Path, Request
 from config import settings
 from typing import Annotated
 from fastapi.responses import HTMLResponse
 from pathlib import Path as FilePath
-import uuid
 
 router = APIRouter(
     tags=["Lab1 Misc"],
@@ -97,31 +104,49 @@ async def get_data_view(format: str = Query("json", pattern="^(json|html)$")):
 # ЧАСТЬ А3
 # ============================================================================
 
-UPLOAD_DIR = FilePath("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
+# Created by create_app at startup
+UPLOAD_DIR = FilePath(settings.upload.dir)
 
-
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+upload_service = UploadService(
+    upload_dir=UPLOAD_DIR,
+    max_size=settings.upload.max_size_bytes,
+    chunk_size=settings.upload.chunk_size_bytes,
+    content_addressed=settings.upload.content_addressed,
+)
 
 
-@router.post("/upload-image/")
-async def upload_image(file: UploadFile = File(...)):
-    if not allowed_file(file.filename or ""):
-        raise HTTPException(
-            status_code=400, detail="Invalid file format. Allowed: PNG, JPG, JPEG, WEBP"
+# The body is parsed here instead of by a File() parameter, which would
+# receive and spool the whole upload before the size limit could apply
+@router.post(
+    "/upload-image/",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_image(request: Request):
+    try:
+        file = MultipartFileStream(
+            request.headers,
+            request.stream(),
+            "file",
+            max_body=upload_service.max_size + MULTIPART_OVERHEAD_BYTES,
         )
+        path = await upload_service.save_image_stream(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (InvalidImageFormat, MalformedUpload) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # генерация уникального имени
-    ext = file.filename.split(".")[-1] if file.filename else "jpg"
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = UPLOAD_DIR / filename
-
-    # сохранение
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
-
-    file_url = f"/uploads/{filename}"
+    file_url = f"/uploads/{path}"
     return {"url": file_url}
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from importlib.metadata import version
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+
+log = logging.getLogger(__name__)
+
+# Sources of the application; models and schemas shape the document too
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def source_stamp(root: Path = APP_DIR) -> str:
+    """
+    Hash of every Python source under root and of the libraries that render
+    the document, so any code change invalidates the cache.
+    """
+    digest = hashlib.sha256()
+    for package in ("fastapi", "pydantic"):
+        digest.update(f"{package}=={version(package)}\n".encode())
+    for path in sorted(root.rglob("*.py")):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _route_parts(route: APIRoute) -> list:
+    dependant = get_flat_dependant(route.dependant)
+    params = [
+        (kind, field.alias, repr(field.field_info))
+        for kind, fields in (
+            ("path", dependant.path_params),
+            ("query", dependant.query_params),
+            ("header", dependant.header_params),
+            ("cookie", dependant.cookie_params),
+            ("body", dependant.body_params),
+        )
+        for field in fields
+    ]
+    return [
+        sorted(route.methods),
+        route.path,
+        route.name,
+        route.status_code,
+        route.summary,
+        route.description,
+        route.response_description,
+        [str(tag) for tag in route.tags],
+        route.deprecated,
+        route.include_in_schema,
+        repr(route.response_model),
+        repr(route.responses),
+        repr(route.openapi_extra),
+        params,
+    ]
+
+
+def routes_fingerprint(app: FastAPI) -> str:
+    """
+    Key of everything the OpenAPI document is generated from: app metadata,
+    each route's parameters, models, status codes and descriptions, and the
+    application sources.
+    """
+    parts = [app.title, app.version, app.description, app.openapi_version, source_stamp()]
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            parts.append(_route_parts(route))
+    # Reprs of functions and other objects embed addresses that vary per process
+    text = re.sub(r" at 0x[0-9a-f]+", "", json.dumps(parts, default=repr))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def dump_openapi(app: FastAPI, path: Path) -> dict:
+    document = FastAPI.openapi(app)
+    payload = {"key": routes_fingerprint(app), "document": document}
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return document
+
+
+def load_openapi(app: FastAPI, path: Path) -> dict | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if payload.get("key") != routes_fingerprint(app):
+        return None
+    return payload["document"]
+
+
+def install_openapi_cache(app: FastAPI, path: Path) -> None:
+    """
+    Serve the OpenAPI document from a pre-generated file when it matches the routes,
+    and regenerate the file otherwise.
+    """
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            document = load_openapi(app, path)
+            if document is None:
+                log.warning("OpenAPI cache %s is missing or stale, regenerating", path)
+                try:
+                    document = dump_openapi(app, path)
+                except OSError:
+                    document = FastAPI.openapi(app)
+            app.openapi_schema = document
+        return app.openapi_schema
+
+    app.openapi = openapi
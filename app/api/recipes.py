@@ -1,13 +1,27 @@
 from models import db_helper, Recipe, User
-from schemas import RecipeCreate, RecipeUpdate, RecipeResponse
+from schemas import (
+    RecipeCreate,
+    RecipeUpdate,
+    RecipeResponse,
+    RecipeBulkDelete,
+    RecipeBulkDeleteResponse,
+    FacetedPage,
+    PantryMatchResponse,
+    SimilarRecipeResponse,
+    RecipeSearchResponse,
+    RecipeBatchGet,
+    RecipeBatchGetResponse,
+    ShoppingListRequest,
+    ShoppingListResponse,
+)
 from repositories import RecipeRepository
 from queries import RecipeQueries
-from services import RecipeService
+from services import RecipeService, PantryService, SimilarityService, SearchService
 from authentication.fastapi_users import current_active_user
+from config import settings
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_pagination import Page
 
 router = APIRouter(
     tags=["Recipes"],
@@ -38,13 +52,32 @@ async def read_recipes(
     queries = RecipeQueries(session)
     service = RecipeService(session)
     recipes = await queries.get_all(skip, limit)
+    return await service.build_recipe_responses(recipes)
 
-    response = []
-    for recipe in recipes:
-        recipe_response = await service.build_recipe_response(recipe)
-        response.append(recipe_response)
 
-    return response
+# Recipes that can be cooked from a pantry
+@router.get("/pantry/", response_model=List[PantryMatchResponse])
+async def match_pantry(
+    ingredient_id: List[int] = Query(..., description="Ingredient IDs in the pantry"),
+    limit: int = Query(20, ge=1, le=settings.limits.pantry_max_results),
+    max_missing: Optional[int] = Query(
+        None, ge=0, description="Only recipes missing at most this many ingredients"
+    ),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    service = PantryService(session)
+    return await service.find_recipes(ingredient_id, limit, max_missing)
+
+
+# Ranked full-text search over titles and descriptions
+@router.get("/search/", response_model=List[RecipeSearchResponse])
+async def search_recipes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search words"),
+    limit: int = Query(20, ge=1, le=settings.limits.search_max_results),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    service = SearchService(session)
+    return await service.search(q, limit)
 
 
 # Read by ID
@@ -61,6 +94,21 @@ async def read_recipe(
     return await service.build_recipe_response(recipe)
 
 
+# Recipes with similar ingredients
+@router.get("/{recipe_id}/similar", response_model=List[SimilarRecipeResponse])
+async def read_similar_recipes(
+    recipe_id: int,
+    limit: int = Query(10, ge=1, le=settings.limits.similar_max_results),
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    service = SimilarityService(session)
+    try:
+        return await service.get_similar_recipes(recipe_id, limit, min_similarity)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 # Update
 @router.put("/{recipe_id}", response_model=RecipeResponse)
 async def update_recipe(
@@ -71,16 +119,14 @@ async def update_recipe(
 ):
     repository = RecipeRepository(session)
     service = RecipeService(session)
-    
-    db_recipe = await repository.get_by_id(recipe_id)
-    if not db_recipe:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Check if user is the author
-    if db_recipe.author_id != user.id:
+
+    # Ownership is checked inside the UPDATE itself
+    updated_recipe = await repository.update(recipe_id, recipe_update, author_id=user.id)
+    if not updated_recipe:
+        if not await repository.get_by_id(recipe_id):
+            raise HTTPException(status_code=404, detail="Recipe not found")
         raise HTTPException(status_code=403, detail="You can only update your own recipes")
 
-    updated_recipe = await repository.update(recipe_id, recipe_update)
     return await service.build_recipe_response(updated_recipe)
 
 
@@ -92,26 +138,107 @@ async def delete_recipe(
     user: User = Depends(current_active_user),
 ):
     repository = RecipeRepository(session)
-    
-    db_recipe = await repository.get_by_id(recipe_id)
-    if not db_recipe:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Check if user is the author
-    if db_recipe.author_id != user.id:
+
+    # Ownership is checked inside the DELETE itself
+    if not await repository.delete(recipe_id, author_id=user.id):
+        if not await repository.get_by_id(recipe_id):
+            raise HTTPException(status_code=404, detail="Recipe not found")
         raise HTTPException(status_code=403, detail="You can only delete your own recipes")
-    
-    await repository.delete(recipe_id)
     return
 
 
+# Bulk delete
+@router.delete("/", response_model=RecipeBulkDeleteResponse)
+async def delete_recipes(
+    body: RecipeBulkDelete,
+    session: AsyncSession = Depends(db_helper.session_getter),
+    user: User = Depends(current_active_user),
+):
+    if len(body.ids) > settings.limits.bulk_delete_max_ids:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.limits.bulk_delete_max_ids} ids per request",
+        )
+
+    repository = RecipeRepository(session)
+    # Recipes of other authors and unknown ids are reported as not deleted
+    deleted = await repository.delete_many(body.ids, author_id=user.id)
+    deleted_set = set(deleted)
+    not_deleted = [
+        recipe_id for recipe_id in dict.fromkeys(body.ids) if recipe_id not in deleted_set
+    ]
+    return {"deleted": sorted(deleted_set), "not_deleted": not_deleted}
+
+
+# Read many by ID
+@router.post("/batch-get", response_model=RecipeBatchGetResponse)
+async def read_recipes_batch(
+    body: RecipeBatchGet,
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    if len(body.ids) > settings.limits.batch_get_max_ids:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.limits.batch_get_max_ids} ids per request",
+        )
+
+    service = RecipeService(session)
+    return await service.get_recipes_by_ids(body.ids)
+
+
+# Aggregate the ingredients of several recipes
+@router.post("/shopping-list", response_model=ShoppingListResponse)
+async def build_shopping_list(
+    body: ShoppingListRequest,
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    if len(body.recipe_ids) > settings.limits.shopping_list_max_recipes:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.limits.shopping_list_max_recipes} recipes per request",
+        )
+
+    service = RecipeService(session)
+    return await service.get_shopping_list(body.recipe_ids)
+
+
 # Get all recipes with pagination, filtering, and sorting
-@router.get("/paginated/", response_model=Page[RecipeResponse])
+@router.get("/paginated/", response_model=FacetedPage[RecipeResponse])
 async def get_recipes_paginated(
     name__like: Optional[str] = Query(None, description="Search recipes by name (title)"),
     ingredient_id: Optional[List[int]] = Query(None, description="Filter by ingredient IDs"),
     sort: Optional[str] = Query("-id", description="Sort field (use '-' prefix for descending)"),
+    exclude_allergen_id: Optional[List[int]] = Query(
+        None, description="Only recipes free of these allergen IDs"
+    ),
+    facets: bool = Query(False, description="Include facet counts for the filtered results"),
+    include_total: bool = Query(
+        True, description="Count all matches; false skips the count and sets has_next"
+    ),
+    ingredient_match: Literal["any", "all"] = Query(
+        "any", description="Match recipes with any or with all of the ingredient IDs"
+    ),
+    cooking_time_min: Optional[int] = Query(None, ge=0, description="Minimum cooking time"),
+    cooking_time_max: Optional[int] = Query(None, ge=0, description="Maximum cooking time"),
+    difficulty_min: Optional[int] = Query(None, ge=1, le=5, description="Minimum difficulty"),
+    difficulty_max: Optional[int] = Query(None, ge=1, le=5, description="Maximum difficulty"),
+    cuisine_id: Optional[List[int]] = Query(None, description="Filter by cuisine IDs"),
+    explain: bool = Query(False, description="Include the chosen filter plan"),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
     service = RecipeService(session)
-    return await service.get_paginated_recipes(name__like, ingredient_id, sort)
+    return await service.get_paginated_recipes(
+        name__like,
+        ingredient_id,
+        sort,
+        exclude_allergen_id,
+        facets,
+        include_total,
+        ingredient_match,
+        cooking_time_min,
+        cooking_time_max,
+        difficulty_min,
+        difficulty_max,
+        cuisine_id,
+        explain,
+    )
@@ -0,0 +1,19 @@
+from models import db_helper
+from schemas import CatalogStatsResponse
+from services import StatsService
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(
+    tags=["Statistics"],
+    prefix="/stats",
+)
+
+
+# Recipe counts per cuisine, allergen and difficulty, cooking time percentiles
+@router.get("/catalog", response_model=CatalogStatsResponse)
+async def read_catalog_stats(
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    service = StatsService(session)
+    return await service.get_catalog_stats()
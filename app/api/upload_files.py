@@ -0,0 +1,151 @@
+import os
+import re
+from collections import OrderedDict
+from mimetypes import guess_type
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+# ab/cd/<sha256>.<ext>, as written by UploadService in content-addressed mode
+CONTENT_ADDRESSED_PATH = re.compile(
+    r"(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.[a-z0-9]+$"
+)
+
+
+def content_digest(path: str) -> Optional[str]:
+    """
+    Return the sha256 of a content-addressed upload path, or None for other files.
+    """
+    match = CONTENT_ADDRESSED_PATH.search(path.replace(os.sep, "/"))
+    return match.group(3) if match else None
+
+
+class LRUBytesCache:
+    """
+    Least-recently-used cache of file bodies bounded by their total size.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._items.get(key)
+        if body is not None:
+            self._items.move_to_end(key)
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._items[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for the upload directory.
+
+    Content-addressed blobs never change, so they get their sha256 as a strong
+    ETag and a long-lived immutable Cache-Control; small ones are also kept in
+    an in-memory LRU. Byte ranges and zero-copy pathsend (when the ASGI server
+    advertises it) are handled by FileResponse. Dotfiles such as the upload
+    index and unfinished temporary files are never served.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        max_age: int = 31536000,
+        memory_cache_bytes: int = 0,
+        memory_cache_max_file_bytes: int = 256 * 1024,
+    ) -> None:
+        super().__init__(directory=directory)
+        self.cache_control = f"public, max-age={max_age}, immutable"
+        self.memory_cache = (
+            LRUBytesCache(memory_cache_bytes) if memory_cache_bytes > 0 else None
+        )
+        self.memory_cache_max_file_bytes = memory_cache_max_file_bytes
+
+    def immutable_headers(self, digest: str) -> dict:
+        return {"etag": f'"{digest}"', "cache-control": self.cache_control}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in path.split(os.sep)):
+            raise HTTPException(status_code=404)
+
+        digest = content_digest(path)
+        request_headers = Headers(scope=scope)
+        use_memory_cache = (
+            digest is not None
+            and self.memory_cache is not None
+            and scope["method"] in ("GET", "HEAD")
+            and "range" not in request_headers
+        )
+
+        if use_memory_cache:
+            body = self.memory_cache.get(path)
+            if body is not None:
+                return self.memory_response(path, body, digest, request_headers)
+
+        response = await super().get_response(path, scope)
+
+        if (
+            use_memory_cache
+            and isinstance(response, FileResponse)
+            and response.stat_result.st_size <= self.memory_cache_max_file_bytes
+        ):
+            body = await anyio.to_thread.run_sync(self.read_file, response.path)
+            self.memory_cache.put(path, body)
+            return self.memory_response(path, body, digest, request_headers)
+        return response
+
+    @staticmethod
+    def read_file(path) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def memory_response(
+        self, path: str, body: bytes, digest: str, request_headers: Headers
+    ) -> Response:
+        headers = self.immutable_headers(digest)
+        headers["accept-ranges"] = "bytes"
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+        media_type = guess_type(path)[0] or "application/octet-stream"
+        return Response(body, media_type=media_type, headers=headers)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        digest = content_digest(str(full_path))
+        if digest is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=self.immutable_headers(digest),
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
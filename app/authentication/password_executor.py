@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi_users.password import PasswordHelper
+
+from config import settings
+
+log = logging.getLogger(__name__)
+
+# Created lazily so that every process-pool worker builds its own hasher
+_password_helper: Optional[PasswordHelper] = None
+
+
+def _get_password_helper() -> PasswordHelper:
+    global _password_helper
+    if _password_helper is None:
+        _password_helper = PasswordHelper()
+    return _password_helper
+
+
+def _hash(password: str) -> str:
+    return _get_password_helper().hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    return _get_password_helper().verify_and_update(plain_password, hashed_password)
+
+
+class PreparedPasswordHelper:
+    """
+    password_helper for UserManager that only returns results computed in the pool.
+
+    BaseUserManager calls its helper synchronously, so UserManager hashes and
+    verifies through password_executor first and records the results here.
+    A call nothing was prepared for raises instead of hashing on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._helper = PasswordHelper()
+        self._hashes: dict[str, str] = {}
+        self._verifications: dict[tuple[str, str], tuple[bool, Optional[str]]] = {}
+
+    def prepare_hash(self, password: str, hashed_password: str) -> None:
+        self._hashes[password] = hashed_password
+
+    def prepare_verify(
+        self,
+        plain_password: str,
+        hashed_password: str,
+        result: tuple[bool, Optional[str]],
+    ) -> None:
+        self._verifications[(plain_password, hashed_password)] = result
+
+    def generate(self) -> str:
+        return self._helper.generate()
+
+    def hash(self, password: str) -> str:
+        try:
+            return self._hashes.pop(password)
+        except KeyError:
+            raise RuntimeError("Password was not hashed through password_executor")
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        try:
+            return self._verifications.pop((plain_password, hashed_password))
+        except KeyError:
+            raise RuntimeError("Password was not verified through password_executor")
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when too many hash/verify calls are already waiting for a worker."""
+
+
+class PasswordHashingExecutor:
+    """
+    Bounded worker pool for the password KDF, so hashing never runs on the event loop.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(self.in_flight - self.max_workers, 0)
+
+    async def _submit(self, fn, *args):
+        if self.queued >= self.max_pending:
+            self.rejected += 1
+            log.warning(
+                "Password hashing pool saturated: %d in flight, %d queued",
+                self.in_flight,
+                self.queued,
+            )
+            raise PasswordPoolSaturated()
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        return await self._submit(_verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_executor = PasswordHashingExecutor(
+    kind=settings.password_hashing.executor,
+    max_workers=settings.password_hashing.max_workers,
+    max_pending=settings.password_hashing.max_pending,
+)
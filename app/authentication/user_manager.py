@@ -1,16 +1,29 @@
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
+import jwt
+from fastapi import HTTPException, status
 from fastapi_users import (
     BaseUserManager,
     IntegerIDMixin,
+    exceptions,
+    schemas,
 )
+from fastapi_users.db import BaseUserDatabase
+from fastapi_users.jwt import decode_jwt
 
 from config import settings
 from models import User
 
+from .password_executor import (
+    password_executor,
+    PasswordPoolSaturated,
+    PreparedPasswordHelper,
+)
+
 if TYPE_CHECKING:
     from fastapi import Request
+    from fastapi.security import OAuth2PasswordRequestForm
 
 log = logging.getLogger(__name__)
 
@@ -19,6 +32,98 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = settings.access_token.reset_password_token_secret
     verification_token_secret = settings.access_token.verification_token_secret
 
+    password_helper: PreparedPasswordHelper
+
+    def __init__(self, user_db: BaseUserDatabase[User, int]):
+        super().__init__(user_db, PreparedPasswordHelper())
+
+    async def hash_password(self, password: str) -> str:
+        try:
+            hashed_password = await password_executor.hash(password)
+        except PasswordPoolSaturated:
+            raise self._pool_saturated()
+        self.password_helper.prepare_hash(password, hashed_password)
+        return hashed_password
+
+    async def verify_password(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        try:
+            result = await password_executor.verify_and_update(
+                plain_password, hashed_password
+            )
+        except PasswordPoolSaturated:
+            raise self._pool_saturated()
+        self.password_helper.prepare_verify(plain_password, hashed_password, result)
+        return result
+
+    @staticmethod
+    def _pool_saturated() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": str(settings.password_hashing.retry_after_seconds)},
+        )
+
+    # BaseUserManager hashes through password_helper synchronously. The methods
+    # below only work out which hashes it is about to need, compute them in the
+    # pool and then defer to it.
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional["Request"] = None,
+    ) -> User:
+        await self.hash_password(user_create.password)
+        return await super().create(user_create, safe, request)
+
+    async def authenticate(
+        self, credentials: "OAuth2PasswordRequestForm"
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            await self.hash_password(credentials.password)
+        else:
+            await self.verify_password(credentials.password, user.hashed_password)
+        return await super().authenticate(credentials)
+
+    async def forgot_password(
+        self, user: User, request: Optional["Request"] = None
+    ) -> None:
+        if user.is_active:
+            await self.hash_password(user.hashed_password)
+        await super().forgot_password(user, request)
+
+    async def reset_password(
+        self, token: str, password: str, request: Optional["Request"] = None
+    ) -> User:
+        try:
+            data = decode_jwt(
+                token,
+                self.reset_password_token_secret,
+                [self.reset_password_token_audience],
+            )
+            user = await self.get(self.parse_id(data["sub"]))
+            password_fingerprint = data["password_fgpt"]
+        except (
+            jwt.PyJWTError,
+            KeyError,
+            exceptions.InvalidID,
+            exceptions.UserNotExists,
+        ):
+            # BaseUserManager rejects the token before it hashes anything
+            return await super().reset_password(token, password, request)
+        await self.verify_password(user.hashed_password, password_fingerprint)
+        return await super().reset_password(token, password, request)
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.hash_password(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(
         self,
         user: User,
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from config import settings
+from models import db_helper, SCHEMA_VERSION, get_schema_version, upgrade_schema
+
+
+async def schema_status() -> None:
+    current = await get_schema_version(db_helper.engine)
+    print(f"Database schema version: {current}, code schema version: {SCHEMA_VERSION}")
+
+
+async def schema_upgrade() -> None:
+    version = await upgrade_schema(db_helper.engine)
+    print(f"Database schema upgraded to version {version}")
+
+
+async def stats_rebuild() -> None:
+    from repositories import RecipeStatsRepository, IngredientRepository, RecipeRepository
+
+    async with db_helper.session_factory() as session:
+        await RecipeStatsRepository(session).rebuild()
+        await IngredientRepository(session).rebuild_usage_counts()
+        await RecipeRepository(session).rebuild_allergen_masks()
+    print("Recipe statistics rebuilt")
+
+
+async def index_snapshot() -> None:
+    from sqlalchemy import delete
+    from indexes.postings import save_snapshot
+    from models import RecipeIngredientChange
+
+    path = settings.indexes.snapshot_path
+    if not path:
+        raise SystemExit("Set APP_CONFIG__INDEXES__SNAPSHOT_PATH first")
+    async with db_helper.session_factory() as session:
+        high_water = await save_snapshot(session, path)
+        # Workers notice the replaced file and never replay past its mark
+        await session.execute(
+            delete(RecipeIngredientChange).where(RecipeIngredientChange.seq <= high_water)
+        )
+        await session.commit()
+    print(f"Postings snapshot written to {path} at change {high_water}")
+
+
+async def openapi_dump() -> None:
+    from main import create_app
+    from api.openapi_cache import dump_openapi
+
+    path = Path(settings.app.openapi_cache_path or "openapi.cache.json")
+    dump_openapi(create_app(), path)
+    print(f"OpenAPI document written to {path}")
+
+
+COMMANDS = {
+    ("schema", "status"): schema_status,
+    ("schema", "upgrade"): schema_upgrade,
+    ("openapi", "dump"): openapi_dump,
+    ("stats", "rebuild"): stats_rebuild,
+    ("index", "snapshot"): index_snapshot,
+}
+
+
+async def run(command) -> None:
+    try:
+        await command()
+    finally:
+        await db_helper.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recipe API management commands")
+    groups = parser.add_subparsers(dest="group", required=True)
+
+    schema = groups.add_parser("schema", help="Database schema management")
+    schema_commands = schema.add_subparsers(dest="command", required=True)
+    schema_commands.add_parser("status", help="Show applied and expected schema versions")
+    schema_commands.add_parser("upgrade", help="Apply pending schema changes")
+
+    openapi = groups.add_parser("openapi", help="OpenAPI document cache")
+    openapi_commands = openapi.add_subparsers(dest="command", required=True)
+    openapi_commands.add_parser("dump", help="Pre-generate the cached OpenAPI document")
+
+    stats = groups.add_parser("stats", help="Catalog statistics counters")
+    stats_commands = stats.add_subparsers(dest="command", required=True)
+    stats_commands.add_parser("rebuild", help="Recompute catalog counters, ingredient usage counts and allergen masks")
+
+    index = groups.add_parser("index", help="In-memory recipe indexes")
+    index_commands = index.add_subparsers(dest="command", required=True)
+    index_commands.add_parser("snapshot", help="Rewrite the postings snapshot and prune the change log")
+
+    args = parser.parse_args()
+    asyncio.run(run(COMMANDS[(args.group, args.command)]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import List, Literal, Optional
+
 from pydantic import BaseModel
 from pydantic_settings import (
     BaseSettings,
@@ -15,6 +17,14 @@ class DatabaseConfig(BaseModel):
     url: str
     echo: bool = True
     future: bool = True
+    # Run pending schema migrations at startup instead of failing
+    apply_schema_on_startup: bool = True
+    # Independent relation loads of one request may run on separate pooled
+    # connections; at most this many at once, and only while the pool keeps
+    # parallel_loads_reserved_connections free for other requests
+    parallel_loads: bool = True
+    parallel_loads_max_concurrency: int = 4
+    parallel_loads_reserved_connections: int = 2
 
 
 class AccessTokenConfig(BaseModel):
@@ -29,6 +39,109 @@ class AuthConfig(BaseModel):
     cookie_samesite: str = "lax"
 
 
+class PasswordHashingConfig(BaseModel):
+    executor: Literal["thread", "process"] = "thread"
+    # None means one worker per CPU core
+    max_workers: Optional[int] = None
+    # Requests allowed to wait for a free worker before new ones are rejected
+    max_pending: int = 64
+    retry_after_seconds: int = 1
+
+
+class UploadConfig(BaseModel):
+    dir: str = "uploads"
+    max_size_bytes: int = 10 * 1024 * 1024
+    chunk_size_bytes: int = 64 * 1024
+    # Store files as ab/cd/<sha256>.<ext> and keep one copy per content
+    content_addressed: bool = True
+    # Serving of /uploads
+    cache_max_age_seconds: int = 31536000
+    memory_cache_bytes: int = 32 * 1024 * 1024
+    memory_cache_max_file_bytes: int = 256 * 1024
+
+
+class AppConfig(BaseModel):
+    # Names from api.ROUTER_MODULES, only these are imported and mounted
+    routers: List[str] = [
+        "recipes",
+        "cuisines",
+        "allergens",
+        "ingredients",
+        "lab1",
+        "auth",
+        "users",
+        "stats",
+        "batch",
+    ]
+    serve_uploads: bool = True
+    # Pre-generated OpenAPI document, see `python cli.py openapi dump`
+    openapi_cache_path: Optional[str] = "openapi.cache.json"
+    startup_report: bool = True
+
+
+class LimitsConfig(BaseModel):
+    bulk_delete_max_ids: int = 5000
+    # Number of ingredients listed in search facets
+    facet_top_ingredients: int = 10
+    pantry_max_results: int = 100
+    similar_max_results: int = 50
+    shopping_list_max_recipes: int = 200
+    batch_get_max_ids: int = 100
+    batch_max_requests: int = 20
+    search_max_results: int = 100
+
+
+class IndexConfig(BaseModel):
+    # In-memory recipe indexes are rebuilt from the database after this many
+    # seconds so writes made by other workers show up; None never rebuilds
+    max_age_seconds: Optional[int] = 300
+    # MinHash LSH for similar recipes: recall rises with more bands and fewer rows;
+    # pairs above roughly (1 / bands) ** (1 / rows) Jaccard are likely found
+    minhash_bands: int = 32
+    minhash_rows: int = 4
+    minhash_seed: int = 1
+    # Answer /recipes/paginated/ range and cuisine filters from the in-memory
+    # columnar recipe table when no other filter needs the database
+    columnar_filters: bool = True
+    # Snapshot file of the recipe -> ingredient postings. Indexes read it through
+    # mmap and query only the recipes changed since it was written, instead of
+    # scanning recipe_ingredients. Must not be shared between databases; None
+    # always scans. `python cli.py index snapshot` refreshes it; writes prune
+    # the change log up to its high-water mark
+    snapshot_path: Optional[str] = None
+    # A worker rewrites the snapshot after replaying more changed recipes than this
+    snapshot_rewrite_after: int = 1000
+
+
+class SearchConfig(BaseModel):
+    # "database" ranks with SQLite FTS5 or the Postgres GIN index added by schema
+    # migration 5, "memory" with the in-process inverted index; "auto" uses the
+    # database index when it exists
+    backend: Literal["auto", "database", "memory"] = "auto"
+    # BM25 parameters and per-field weights
+    title_weight: float = 2.0
+    description_weight: float = 1.0
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+
+
+class PlannerConfig(BaseModel):
+    # Order combined /recipes/paginated/ filters by estimated selectivity
+    enabled: bool = True
+    # Materialize the ids of the most selective filter and push them down as
+    # an IN list when it is expected to match at most this many recipes
+    pushdown_max_rows: int = 1000
+    # Share of recipes a name__like filter is assumed to match when its words
+    # are not whole title terms of the in-memory search index
+    default_like_selectivity: float = 0.1
+
+
+class PaginationConfig(BaseModel):
+    # Filtered totals of /recipes/paginated/ are reused for this long; 0 disables
+    count_cache_ttl_seconds: int = 30
+    count_cache_max_entries: int = 1024
+
+
 class UrlPrefix(BaseModel):
     prefix: str = "/api"
     test: str = "/test"
@@ -47,10 +160,18 @@ class Settings(BaseSettings):
         env_prefix="APP_CONFIG__",
     )
     run: RunConfig = RunConfig()
+    app: AppConfig = AppConfig()
     url: UrlPrefix = UrlPrefix()
     db: DatabaseConfig
     access_token: AccessTokenConfig = AccessTokenConfig()
     auth: AuthConfig = AuthConfig()
+    password_hashing: PasswordHashingConfig = PasswordHashingConfig()
+    upload: UploadConfig = UploadConfig()
+    limits: LimitsConfig = LimitsConfig()
+    indexes: IndexConfig = IndexConfig()
+    pagination: PaginationConfig = PaginationConfig()
+    search: SearchConfig = SearchConfig()
+    planner: PlannerConfig = PlannerConfig()
 
 
 settings = Settings()
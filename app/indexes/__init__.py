@@ -0,0 +1,21 @@
+__all__ = (
+    "RecipeIndex",
+    "recipe_indexes",
+    "PantryIndex",
+    "pantry_index",
+    "SimilarityIndex",
+    "similarity_index",
+    "SearchIndex",
+    "search_index",
+    "RecipeTable",
+    "recipe_table",
+    "RecipeCountCache",
+    "recipe_count_cache",
+)
+
+from .base import RecipeIndex, recipe_indexes
+from .pantry import PantryIndex, pantry_index
+from .similar import SimilarityIndex, similarity_index
+from .search import SearchIndex, search_index
+from .columns import RecipeTable, recipe_table
+from .count_cache import RecipeCountCache, recipe_count_cache
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config import settings
+
+log = logging.getLogger(__name__)
+
+
+class RecipeIndex:
+    """
+    In-memory structure derived from the recipe tables.
+
+    Built from the database on first use and then kept current by the
+    RecipeRepository writes of this process. Writes made by other workers are
+    picked up by a full rebuild once the index is older than
+    settings.indexes.max_age_seconds; that rebuild runs in a background task
+    while requests keep using the current contents.
+    """
+
+    def __init__(self) -> None:
+        self._loaded_at: Optional[float] = None
+        # Write events seen while a fetch is in flight, replayed onto its result
+        self._pending: Optional[List[Tuple[Callable, tuple]]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Set when a caller saw the contents disagree with the database
+        self._stale = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _is_stale(self) -> bool:
+        if self._stale:
+            return True
+        max_age = settings.indexes.max_age_seconds
+        return max_age is not None and time.monotonic() - self._loaded_at >= max_age
+
+    def mark_stale(self) -> None:
+        """
+        Rebuild in the background on the next ensure_loaded, whatever the age.
+        """
+        self._stale = True
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self._rebuild(session)
+        elif self._is_stale() and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh(session.bind))
+
+    async def _refresh(self, bind: AsyncEngine) -> None:
+        try:
+            async with self._lock:
+                async with AsyncSession(bind) as session:
+                    await self._rebuild(session)
+        except Exception:
+            # Keep serving the current contents and retry after another max_age
+            log.exception("Rebuilding %s failed", type(self).__name__)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._refresh_task = None
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        self._stale = False
+        self._pending = []
+        try:
+            data = await self._fetch(session)
+        finally:
+            pending, self._pending = self._pending, None
+        self._build(data)
+        # Writes that raced the fetch; the hooks are idempotent, so replaying
+        # one the fetch already saw is harmless
+        for apply, args in pending:
+            apply(*args)
+        self._loaded_at = time.monotonic()
+
+    def reset(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        self._pending = None
+        self._stale = False
+        self._loaded_at = None
+        self._build(None)
+
+    def recipe_saved(
+        self,
+        recipe_id: int,
+        fields: Dict[str, Any],
+        ingredient_ids: Optional[Set[int]] = None,
+    ) -> None:
+        """
+        Called after a recipe was created or updated. ingredient_ids is None when
+        the ingredient list did not change.
+        """
+        if self._pending is not None:
+            self._pending.append((self._apply_saved, (recipe_id, fields, ingredient_ids)))
+        if self.loaded:
+            self._apply_saved(recipe_id, fields, ingredient_ids)
+
+    def recipes_deleted(self, recipe_ids: Iterable[int]) -> None:
+        recipe_ids = list(recipe_ids)
+        if self._pending is not None:
+            self._pending.append((self._apply_deleted, (recipe_ids,)))
+        if self.loaded:
+            self._apply_deleted(recipe_ids)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        raise NotImplementedError
+
+    def _build(self, data: Any) -> None:
+        """
+        Replace the index contents; data is None to empty the index.
+        """
+        raise NotImplementedError
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        raise NotImplementedError
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        raise NotImplementedError
+
+
+class RecipeIndexRegistry:
+    """
+    Fans RecipeRepository write events out to every registered index.
+    """
+
+    def __init__(self) -> None:
+        # RecipeIndex instances or anything else with the same write hooks
+        self.indexes: List[RecipeIndex] = []
+
+    def register(self, index):
+        self.indexes.append(index)
+        return index
+
+    def recipe_saved(
+        self,
+        recipe_id: int,
+        fields: Dict[str, Any],
+        ingredient_ids: Optional[Set[int]] = None,
+    ) -> None:
+        for index in self.indexes:
+            index.recipe_saved(recipe_id, fields, ingredient_ids)
+
+    def recipes_deleted(self, recipe_ids: Iterable[int]) -> None:
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return
+        for index in self.indexes:
+            index.recipes_deleted(recipe_ids)
+
+    def reset(self) -> None:
+        for index in self.indexes:
+            index.reset()
+
+
+recipe_indexes = RecipeIndexRegistry()
@@ -0,0 +1,200 @@
+import heapq
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Recipe
+
+from .base import RecipeIndex, recipe_indexes
+
+Range = Tuple[Optional[int], Optional[int]]
+
+
+class RecipeTable(RecipeIndex):
+    """
+    Column-oriented copy of the scalar recipe columns.
+
+    Each column is a flat array indexed by row, so a filter is a pass over one
+    or two arrays and never touches recipe objects. Deleting a recipe moves
+    the last row into its slot, which keeps the rows dense.
+    """
+
+    # Sortable columns; ties are broken by id in the same direction
+    SORT_COLUMNS = ("id", "cooking_time", "difficulty")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._build(None)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        result = await session.execute(
+            select(
+                Recipe.id,
+                Recipe.cooking_time,
+                Recipe.difficulty,
+                Recipe.cuisine_id,
+                Recipe.author_id,
+                Recipe.allergen_mask,
+            )
+        )
+        return result.all()
+
+    def _build(self, data: Optional[Sequence[tuple]]) -> None:
+        self._row_of: Dict[int, int] = {}
+        self.id = array("q")
+        self.cooking_time = array("q")
+        self.difficulty = array("b")
+        # 0 for recipes without a cuisine
+        self.cuisine_id = array("q")
+        self.author_id = array("q")
+        self.allergen_mask = array("q")
+        for values in data or ():
+            self._set(*values)
+
+    @property
+    def _columns(self) -> Tuple[array, ...]:
+        return (
+            self.id,
+            self.cooking_time,
+            self.difficulty,
+            self.cuisine_id,
+            self.author_id,
+            self.allergen_mask,
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def _set(
+        self,
+        recipe_id: int,
+        cooking_time: int,
+        difficulty: int,
+        cuisine_id: Optional[int],
+        author_id: int,
+        allergen_mask: Optional[int],
+    ) -> None:
+        values = (
+            recipe_id,
+            cooking_time,
+            difficulty,
+            cuisine_id or 0,
+            author_id,
+            allergen_mask or 0,
+        )
+        row = self._row_of.get(recipe_id)
+        if row is None:
+            self._row_of[recipe_id] = len(self.id)
+            for column, value in zip(self._columns, values):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns, values):
+                column[row] = value
+
+    def _remove(self, recipe_id: int) -> None:
+        row = self._row_of.pop(recipe_id, None)
+        if row is None:
+            return
+        last = len(self.id) - 1
+        if row != last:
+            for column in self._columns:
+                column[row] = column[last]
+            self._row_of[self.id[row]] = row
+        for column in self._columns:
+            column.pop()
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        self._set(
+            recipe_id,
+            fields["cooking_time"],
+            fields["difficulty"],
+            fields["cuisine_id"],
+            fields["author_id"],
+            fields.get("allergen_mask"),
+        )
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        for recipe_id in recipe_ids:
+            self._remove(recipe_id)
+
+    @staticmethod
+    def _in_range(column: array, rows: Iterable[int], bounds: Range) -> List[int]:
+        low, high = bounds
+        if low is None:
+            return [row for row in rows if column[row] <= high]
+        if high is None:
+            return [row for row in rows if low <= column[row]]
+        return [row for row in rows if low <= column[row] <= high]
+
+    def filter(
+        self,
+        cooking_time: Range = (None, None),
+        difficulty: Range = (None, None),
+        cuisine_ids: Optional[Iterable[int]] = None,
+        exclude_allergen_mask: int = 0,
+        order: Sequence[str] = (),
+    ) -> List[int]:
+        """
+        Rows matching every given predicate; None bounds are open.
+
+        Predicates run in the given order of names ("cooking_time",
+        "difficulty", "cuisine", "allergen"), each over the rows the previous
+        ones kept, so the most selective one should come first.
+        """
+        predicates = {}
+        if cooking_time != (None, None):
+            predicates["cooking_time"] = lambda rows: self._in_range(
+                self.cooking_time, rows, cooking_time
+            )
+        if difficulty != (None, None):
+            predicates["difficulty"] = lambda rows: self._in_range(
+                self.difficulty, rows, difficulty
+            )
+        if cuisine_ids is not None:
+            wanted = set(cuisine_ids)
+            cuisine_column = self.cuisine_id
+            predicates["cuisine"] = lambda rows: [
+                row for row in rows if cuisine_column[row] in wanted
+            ]
+        if exclude_allergen_mask:
+            allergen_column = self.allergen_mask
+            predicates["allergen"] = lambda rows: [
+                row for row in rows if not allergen_column[row] & exclude_allergen_mask
+            ]
+
+        names = [name for name in order if name in predicates]
+        names += [name for name in predicates if name not in names]
+        rows: Iterable[int] = range(len(self.id))
+        for name in names:
+            rows = predicates[name](rows)
+        return list(rows)
+
+    def page(self, rows: List[int], sort: str, offset: int, limit: int) -> List[int]:
+        """
+        Recipe ids of one page of rows ordered by a SORT_COLUMNS field, with a
+        '-' prefix for descending order.
+
+        Only offset + limit rows are ordered, using a bounded heap, unless the
+        page reaches far into the result.
+        """
+        descending = sort.startswith("-")
+        column = getattr(self, sort.lstrip("-"))
+        ids = self.id
+
+        def key(row: int) -> Tuple[int, int]:
+            return column[row], ids[row]
+
+        wanted = offset + limit
+        if wanted * 4 < len(rows):
+            select_top = heapq.nlargest if descending else heapq.nsmallest
+            ordered = select_top(wanted, rows, key=key)
+        else:
+            ordered = sorted(rows, key=key, reverse=descending)
+        return [ids[row] for row in ordered[offset:wanted]]
+
+
+recipe_table = recipe_indexes.register(RecipeTable())
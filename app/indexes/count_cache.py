@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+from config import settings
+
+from .base import recipe_indexes
+
+
+class RecipeCountCache:
+    """
+    Short-lived cache of filtered recipe counts keyed by normalized filters.
+
+    Any recipe write in this process clears it; writes from other workers are
+    bounded by settings.pagination.count_cache_ttl_seconds.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        count, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return count
+
+    def put(self, key: Hashable, count: int, generation: int) -> None:
+        """
+        Store a count computed while self.generation was `generation`; counts
+        that raced a write are dropped.
+        """
+        ttl = settings.pagination.count_cache_ttl_seconds
+        if not ttl or generation != self.generation:
+            return
+        self._entries[key] = (count, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.pagination.count_cache_max_entries:
+            self._entries.popitem(last=False)
+
+    def reset(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def recipe_saved(
+        self,
+        recipe_id: int,
+        fields: Dict[str, Any],
+        ingredient_ids: Optional[Set[int]] = None,
+    ) -> None:
+        self.reset()
+
+    def recipes_deleted(self, recipe_ids: Iterable[int]) -> None:
+        self.reset()
+
+
+recipe_count_cache = recipe_indexes.register(RecipeCountCache())
@@ -0,0 +1,82 @@
+import heapq
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import RecipeIndex, recipe_indexes
+from .postings import RecipePostings, load_recipe_ingredients
+
+
+class PantryIndex(RecipeIndex):
+    """
+    Recipe x ingredient incidence matrix used for pantry matching.
+
+    The matrix is the recipe ingredient postings: its columns (ingredient ->
+    recipes) and rows (recipe -> ingredients) are read from the mapped
+    snapshot, plus the overlay of recipes changed since. Scoring a pantry only
+    touches the columns of the pantry's ingredients.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._build(None)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        return await load_recipe_ingredients(session)
+
+    def _build(self, data: Optional[RecipePostings]) -> None:
+        self._postings = data if data is not None else RecipePostings()
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        if ingredient_ids is None:
+            return
+        self._postings.set(recipe_id, ingredient_ids)
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        for recipe_id in recipe_ids:
+            self._postings.set(recipe_id, ())
+
+    def match(
+        self,
+        pantry: Iterable[int],
+        limit: int,
+        max_missing: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top recipes by the share of their ingredients found in the pantry.
+
+        Ties are broken by fewer missing ingredients, then by lower recipe id.
+        """
+        postings = self._postings
+        pantry = set(pantry)
+        matched: Dict[int, int] = defaultdict(int)
+        for ingredient_id in pantry:
+            for recipe_id in postings.recipes_of(ingredient_id):
+                matched[recipe_id] += 1
+
+        sizes = {recipe_id: len(postings.ingredients_of(recipe_id)) for recipe_id in matched}
+        touched: Iterable[int] = matched
+        if max_missing is not None:
+            touched = [r for r in matched if sizes[r] - matched[r] <= max_missing]
+        top = heapq.nlargest(
+            limit,
+            touched,
+            key=lambda r: (matched[r] / sizes[r], matched[r] - sizes[r], -r),
+        )
+        return [
+            {
+                "recipe_id": recipe_id,
+                "matched": matched[recipe_id],
+                "total": sizes[recipe_id],
+                "missing_ingredient_ids": sorted(
+                    set(postings.ingredients_of(recipe_id)) - pantry
+                ),
+            }
+            for recipe_id in top
+        ]
+
+
+pantry_index = recipe_indexes.register(PantryIndex())
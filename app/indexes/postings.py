@@ -0,0 +1,432 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Collection, Dict, FrozenSet, Iterable, Iterator, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import RecipeIngredient, RecipeIngredientChange
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"RCPPOSTS"
+FORMAT_VERSION = 1
+_BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+# magic, format version, byte order of the arrays, padding,
+# high-water mark, number of recipes, number of ingredients, number of pairs
+_HEADER = struct.Struct("<8sHHIqqqq")
+_ITEM = array("q").itemsize
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def write_snapshot(
+    path: str, ingredients: Dict[int, Iterable[int]], high_water: int
+) -> None:
+    """
+    Atomically write recipe -> ingredient postings and their high-water mark.
+
+    After the header the file holds six int64 arrays in native byte order:
+    recipe ids, recipe offsets and ingredient ids (recipe -> ingredients), then
+    ingredient ids, ingredient offsets and recipe ids (ingredient -> recipes).
+    Both directions are sorted by id so lookups are binary searches.
+    """
+    recipe_ids = array("q")
+    recipe_offsets = array("q", [0])
+    recipe_ingredients = array("q")
+    by_ingredient = defaultdict(list)
+    for recipe_id in sorted(ingredients):
+        row = sorted(ingredients[recipe_id])
+        if not row:
+            continue
+        recipe_ids.append(recipe_id)
+        recipe_ingredients.extend(row)
+        recipe_offsets.append(len(recipe_ingredients))
+        for ingredient_id in row:
+            by_ingredient[ingredient_id].append(recipe_id)
+
+    ingredient_ids = array("q")
+    ingredient_offsets = array("q", [0])
+    ingredient_recipes = array("q")
+    for ingredient_id in sorted(by_ingredient):
+        ingredient_ids.append(ingredient_id)
+        ingredient_recipes.extend(by_ingredient[ingredient_id])
+        ingredient_offsets.append(len(ingredient_recipes))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                _BYTE_ORDER,
+                0,
+                high_water,
+                len(recipe_ids),
+                len(ingredient_ids),
+                len(recipe_ingredients),
+            )
+        )
+        for values in (
+            recipe_ids,
+            recipe_offsets,
+            recipe_ingredients,
+            ingredient_ids,
+            ingredient_offsets,
+            ingredient_recipes,
+        ):
+            values.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        return _identity(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+class PostingsSnapshot:
+    """
+    Read-only view of a postings file mapped into memory.
+
+    The arrays are memoryviews over the mapping, so workers opening the same
+    file share its pages through the OS page cache. Lookups return views into
+    the mapping. close() fails while such views are alive; a snapshot that is
+    simply dropped is unmapped once the last view is gone.
+
+    Raises:
+        SnapshotError: If the file is not a valid snapshot for this machine
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = _identity(stat)
+            size = stat.st_size
+            if size < _HEADER.size:
+                raise SnapshotError(f"{path} is too short")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(path, size)
+        except SnapshotError:
+            self._mmap.close()
+            raise
+
+    def _open(self, path: str, size: int) -> None:
+        (
+            magic,
+            version,
+            byte_order,
+            _,
+            self.high_water,
+            recipes,
+            ingredients,
+            pairs,
+        ) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a postings snapshot")
+        if version != FORMAT_VERSION or byte_order != _BYTE_ORDER:
+            raise SnapshotError(f"{path} has format {version}/{byte_order}")
+        lengths = [recipes, recipes + 1, pairs, ingredients, ingredients + 1, pairs]
+        if size != _HEADER.size + sum(lengths) * _ITEM:
+            raise SnapshotError(f"{path} is truncated")
+
+        self._views = []
+        offset = _HEADER.size
+        for length in lengths:
+            view = memoryview(self._mmap)[offset : offset + length * _ITEM].cast("q")
+            self._views.append(view)
+            offset += length * _ITEM
+        (
+            self.recipe_ids,
+            self._recipe_offsets,
+            self._recipe_ingredients,
+            self.ingredient_ids,
+            self._ingredient_offsets,
+            self._ingredient_recipes,
+        ) = self._views
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "PostingsSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _lookup(keys, offsets, values, key: int) -> memoryview:
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return values[0:0]
+        return values[offsets[i] : offsets[i + 1]]
+
+    def ingredients_of(self, recipe_id: int) -> memoryview:
+        return self._lookup(
+            self.recipe_ids, self._recipe_offsets, self._recipe_ingredients, recipe_id
+        )
+
+    def recipes_of(self, ingredient_id: int) -> memoryview:
+        return self._lookup(
+            self.ingredient_ids,
+            self._ingredient_offsets,
+            self._ingredient_recipes,
+            ingredient_id,
+        )
+
+
+def read_high_water(path: str) -> Optional[int]:
+    """
+    High-water mark in a snapshot's header, or None if it is not a snapshot.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, byte_order, _, high_water, *_ = _HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION or byte_order != _BYTE_ORDER:
+        return None
+    return high_water
+
+
+class RecipePostings:
+    """
+    recipe -> ingredients and ingredient -> recipes, served from a mapped
+    snapshot.
+
+    Recipes changed after the snapshot was written (or every recipe, without a
+    snapshot) live in a small in-memory overlay that shadows their snapshot
+    rows, so a worker only holds Python objects for what changed. Lookups
+    return the snapshot's memoryviews or the overlay's sets; callers must not
+    keep them past a rebuild of their index.
+    """
+
+    def __init__(self, snapshot: Optional[PostingsSnapshot] = None):
+        self._snapshot = snapshot
+        # An empty set marks a recipe that has no ingredients any more
+        self._changed: Dict[int, FrozenSet[int]] = {}
+        self._changed_by_ingredient: Dict[int, Set[int]] = defaultdict(set)
+        self._size = len(snapshot.recipe_ids) if snapshot is not None else 0
+
+    @property
+    def high_water(self) -> int:
+        return self._snapshot.high_water if self._snapshot is not None else 0
+
+    @property
+    def identity(self) -> Optional[Tuple[int, int, int]]:
+        return self._snapshot.identity if self._snapshot is not None else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        if self._snapshot is not None:
+            changed = self._changed
+            for recipe_id in self._snapshot.recipe_ids:
+                if recipe_id not in changed:
+                    yield recipe_id
+        for recipe_id, ingredient_ids in self._changed.items():
+            if ingredient_ids:
+                yield recipe_id
+
+    def items(self) -> Iterator[Tuple[int, Collection[int]]]:
+        for recipe_id in self:
+            yield recipe_id, self.ingredients_of(recipe_id)
+
+    def ingredients_of(self, recipe_id: int) -> Collection[int]:
+        ingredient_ids = self._changed.get(recipe_id)
+        if ingredient_ids is not None:
+            return ingredient_ids
+        if self._snapshot is not None:
+            return self._snapshot.ingredients_of(recipe_id)
+        return ()
+
+    def recipes_of(self, ingredient_id: int) -> Iterator[int]:
+        if self._snapshot is not None:
+            changed = self._changed
+            for recipe_id in self._snapshot.recipes_of(ingredient_id):
+                if recipe_id not in changed:
+                    yield recipe_id
+        yield from self._changed_by_ingredient.get(ingredient_id, ())
+
+    def set(self, recipe_id: int, ingredient_ids: Iterable[int]) -> None:
+        """
+        Record a recipe's current ingredients; an empty set removes it.
+        """
+        ingredient_ids = frozenset(ingredient_ids)
+        self._size += bool(ingredient_ids) - bool(self.ingredients_of(recipe_id))
+        for ingredient_id in self._changed.get(recipe_id, ()):
+            recipes = self._changed_by_ingredient[ingredient_id]
+            recipes.discard(recipe_id)
+            if not recipes:
+                del self._changed_by_ingredient[ingredient_id]
+        self._changed[recipe_id] = ingredient_ids
+        for ingredient_id in ingredient_ids:
+            self._changed_by_ingredient[ingredient_id].add(recipe_id)
+
+    def adjacency(self) -> Dict[int, Set[int]]:
+        """
+        recipe id -> ingredient ids, copied out; used to write a new snapshot.
+        """
+        return {recipe_id: set(ingredient_ids) for recipe_id, ingredient_ids in self.items()}
+
+
+def open_snapshot(path: str) -> Optional[PostingsSnapshot]:
+    """
+    Open a snapshot, or return None if it is missing or unusable.
+    """
+    try:
+        return PostingsSnapshot(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, SnapshotError):
+        log.warning("Ignoring postings snapshot %s", path, exc_info=True)
+        return None
+
+
+async def change_high_water(session: AsyncSession) -> int:
+    seq = await session.scalar(select(func.max(RecipeIngredientChange.seq)))
+    return seq or 0
+
+
+async def scan_recipe_ingredients(session: AsyncSession) -> Dict[int, Set[int]]:
+    result = await session.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+    )
+    ingredients = defaultdict(set)
+    for recipe_id, ingredient_id in result.all():
+        ingredients[recipe_id].add(ingredient_id)
+    return ingredients
+
+
+async def replay_changes(
+    session: AsyncSession, postings: RecipePostings, high_water: int
+) -> Tuple[int, int]:
+    """
+    Bring postings loaded at high_water up to date, in place.
+
+    Returns the new high-water mark and the number of recipes re-read.
+    """
+    new_high_water = await change_high_water(session)
+    if new_high_water <= high_water:
+        return high_water, 0
+    result = await session.scalars(
+        select(RecipeIngredientChange.recipe_id)
+        .where(RecipeIngredientChange.seq > high_water)
+        .distinct()
+    )
+    changed = result.all()
+    result = await session.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id).where(
+            RecipeIngredient.recipe_id.in_(changed)
+        )
+    )
+    current = defaultdict(set)
+    for recipe_id, ingredient_id in result.all():
+        current[recipe_id].add(ingredient_id)
+    for recipe_id in changed:
+        postings.set(recipe_id, current.get(recipe_id, ()))
+    return new_high_water, len(changed)
+
+
+async def save_snapshot(session: AsyncSession, path: str) -> int:
+    """
+    Write a fresh snapshot from a full scan and return its high-water mark.
+    """
+    high_water = await change_high_water(session)
+    ingredients = await scan_recipe_ingredients(session)
+    await asyncio.to_thread(write_snapshot, path, ingredients, high_water)
+    return high_water
+
+
+async def load_recipe_ingredients(session: AsyncSession) -> RecipePostings:
+    """
+    Recipe ingredient postings from the snapshot plus replayed changes when
+    settings.indexes.snapshot_path is set, otherwise from a full table scan.
+
+    A missing or unusable snapshot is rebuilt from the scan.
+    """
+    path = settings.indexes.snapshot_path
+    if not path:
+        return _from_scan(await scan_recipe_ingredients(session))
+
+    snapshot = open_snapshot(path)
+    if snapshot is not None:
+        postings = RecipePostings(snapshot)
+        high_water, replayed = await replay_changes(
+            session, postings, snapshot.high_water
+        )
+        # A replaced snapshot means the change log may have been pruned past
+        # our high-water mark while we replayed; fall back to a scan then
+        if _file_identity(path) == postings.identity:
+            if replayed > settings.indexes.snapshot_rewrite_after:
+                await asyncio.to_thread(
+                    write_snapshot, path, postings.adjacency(), high_water
+                )
+            return postings
+
+    # Read the mark first, so changes that race the scan are replayed later
+    high_water = await change_high_water(session)
+    ingredients = await scan_recipe_ingredients(session)
+    await asyncio.to_thread(write_snapshot, path, ingredients, high_water)
+    return _from_scan(ingredients)
+
+
+def _from_scan(ingredients: Dict[int, Set[int]]) -> RecipePostings:
+    postings = RecipePostings()
+    for recipe_id, ingredient_ids in ingredients.items():
+        postings.set(recipe_id, ingredient_ids)
+    return postings
+
+
+# snapshot path -> identity of the file whose mark this process already pruned to
+_pruned: Dict[str, Tuple[int, int, int]] = {}
+
+
+async def prune_changes(session: AsyncSession) -> None:
+    """
+    Delete change log rows already included in the current snapshot.
+
+    Called from write transactions, so the log stays short without running
+    the CLI. Runs once per snapshot file per process. Workers replaying from
+    an older snapshot notice the replaced file and rescan.
+    """
+    path = settings.indexes.snapshot_path
+    if not path:
+        return
+    identity = _file_identity(path)
+    if identity is None or _pruned.get(path) == identity:
+        return
+    high_water = read_high_water(path)
+    if high_water:
+        await session.execute(
+            delete(RecipeIngredientChange).where(RecipeIngredientChange.seq <= high_water)
+        )
+    _pruned[path] = identity
@@ -0,0 +1,133 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Recipe
+
+from .base import RecipeIndex, recipe_indexes
+from .text import analyze
+
+
+class SearchIndex(RecipeIndex):
+    """
+    Inverted index over recipe titles and descriptions with BM25F ranking.
+
+    Each term maps to the recipes containing it together with the term's
+    frequency in the title and in the description. Field frequencies are
+    length-normalised separately, weighted, and summed before BM25
+    saturation, so a word in the title counts more than the same word in a
+    long description.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._build(None)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        result = await session.execute(select(Recipe.id, Recipe.title, Recipe.description))
+        return result.all()
+
+    def _build(self, data: Optional[List[Tuple[int, str, str]]]) -> None:
+        self._postings: Dict[str, Dict[int, Tuple[int, int]]] = defaultdict(dict)
+        # recipe id -> (title length, description length) in terms
+        self._lengths: Dict[int, Tuple[int, int]] = {}
+        self._terms: Dict[int, Set[str]] = {}
+        self._title_total = 0
+        self._description_total = 0
+        for recipe_id, title, description in data or ():
+            self._add(recipe_id, title, description)
+
+    def _add(self, recipe_id: int, title: str, description: str) -> None:
+        title_terms = Counter(analyze(title))
+        description_terms = Counter(analyze(description))
+        terms = set(title_terms) | set(description_terms)
+        for term in terms:
+            self._postings[term][recipe_id] = (title_terms[term], description_terms[term])
+        title_length = sum(title_terms.values())
+        description_length = sum(description_terms.values())
+        self._lengths[recipe_id] = (title_length, description_length)
+        self._terms[recipe_id] = terms
+        self._title_total += title_length
+        self._description_total += description_length
+
+    def _remove(self, recipe_id: int) -> None:
+        terms = self._terms.pop(recipe_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(recipe_id, None)
+            if not postings:
+                del self._postings[term]
+        title_length, description_length = self._lengths.pop(recipe_id)
+        self._title_total -= title_length
+        self._description_total -= description_length
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        if "title" not in fields or "description" not in fields:
+            return
+        self._remove(recipe_id)
+        self._add(recipe_id, fields["title"], fields["description"])
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        for recipe_id in recipe_ids:
+            self._remove(recipe_id)
+
+    def document_frequency(self, term: str) -> int:
+        """
+        Number of recipes containing an (already stemmed) term.
+        """
+        postings = self._postings.get(term)
+        return len(postings) if postings else 0
+
+    def title_frequency(self, term: str) -> int:
+        """
+        Number of recipes whose title contains an (already stemmed) term.
+        """
+        postings = self._postings.get(term)
+        return sum(1 for title_tf, _ in postings.values() if title_tf) if postings else 0
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Top (recipe_id, score) pairs for a free-text query, best first.
+
+        Any query term may match; recipes containing more and rarer terms
+        rank higher. Ties are broken by lower recipe id.
+        """
+        total = len(self._lengths)
+        if not total:
+            return []
+        config = settings.search
+        k1, b = config.bm25_k1, config.bm25_b
+        title_average = self._title_total / total or 1.0
+        description_average = self._description_total / total or 1.0
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(analyze(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for recipe_id, (title_tf, description_tf) in postings.items():
+                title_length, description_length = self._lengths[recipe_id]
+                tf = config.title_weight * title_tf / (
+                    1 - b + b * title_length / title_average
+                ) + config.description_weight * description_tf / (
+                    1 - b + b * description_length / description_average
+                )
+                scores[recipe_id] += idf * tf * (k1 + 1) / (tf + k1)
+
+        return heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+
+
+search_index = recipe_indexes.register(SearchIndex())
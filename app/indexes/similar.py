@@ -0,0 +1,138 @@
+import heapq
+import random
+from array import array
+from collections import defaultdict
+from typing import Any, Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+
+from .base import RecipeIndex, recipe_indexes
+from .postings import RecipePostings, load_recipe_ingredients
+
+# Mersenne prime modulus for the universal hash family
+_PRIME = (1 << 61) - 1
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex(RecipeIndex):
+    """
+    MinHash signatures of recipe ingredient sets with LSH banding.
+
+    Each signature has bands * rows hash minima. Two recipes become candidates
+    when all rows of at least one band agree, which happens with probability
+    1 - (1 - J^rows)^bands for Jaccard similarity J. More bands or fewer rows
+    raise recall at the cost of more candidates. Candidates are re-ranked by
+    their exact Jaccard similarity, computed from the recipe ingredient
+    postings, which are read from the mapped snapshot.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._build(None)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        return await load_recipe_ingredients(session)
+
+    def _build(self, data: Optional[RecipePostings]) -> None:
+        self._bands = settings.indexes.minhash_bands
+        self._rows = settings.indexes.minhash_rows
+        rng = random.Random(settings.indexes.minhash_seed)
+        self._hashes: List[Tuple[int, int]] = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(self._bands * self._rows)
+        ]
+        self._hash_rows: Dict[int, array] = {}
+        self._postings = data if data is not None else RecipePostings()
+        self._signatures: Dict[int, array] = {}
+        self._buckets: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        for recipe_id, ingredient_ids in self._postings.items():
+            self._add(recipe_id, ingredient_ids)
+
+    def _ingredient_hashes(self, ingredient_id: int) -> array:
+        # The ingredient vocabulary is small, so per-ingredient hash rows are cached
+        hashes = self._hash_rows.get(ingredient_id)
+        if hashes is None:
+            hashes = array("Q", ((a * ingredient_id + b) % _PRIME for a, b in self._hashes))
+            self._hash_rows[ingredient_id] = hashes
+        return hashes
+
+    def signature(self, ingredient_ids: Iterable[int]) -> array:
+        # Column-wise minimum over the hash rows of the recipe's ingredients
+        rows = [self._ingredient_hashes(x) for x in ingredient_ids]
+        return array("Q", map(min, *rows)) if len(rows) > 1 else array("Q", rows[0])
+
+    def _band_keys(self, signature: array) -> List[Tuple[int, int]]:
+        rows = self._rows
+        return [
+            (band, hash(tuple(signature[band * rows : (band + 1) * rows])))
+            for band in range(self._bands)
+        ]
+
+    def _add(self, recipe_id: int, ingredient_ids: Collection[int]) -> None:
+        if not ingredient_ids:
+            return
+        signature = self.signature(ingredient_ids)
+        self._signatures[recipe_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets[key].add(recipe_id)
+
+    def _remove(self, recipe_id: int) -> None:
+        signature = self._signatures.pop(recipe_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets[key]
+            bucket.discard(recipe_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        if ingredient_ids is None:
+            return
+        self._remove(recipe_id)
+        self._postings.set(recipe_id, ingredient_ids)
+        self._add(recipe_id, ingredient_ids)
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        for recipe_id in recipe_ids:
+            self._remove(recipe_id)
+            self._postings.set(recipe_id, ())
+
+    def similar(
+        self, recipe_id: int, limit: int, min_similarity: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """
+        Top (recipe_id, jaccard) pairs among the LSH candidates of a recipe.
+        """
+        signature = self._signatures.get(recipe_id)
+        if signature is None:
+            return []
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        candidates.discard(recipe_id)
+
+        postings = self._postings
+        ingredients = set(postings.ingredients_of(recipe_id))
+        scored = (
+            (jaccard(ingredients, set(postings.ingredients_of(other))), other)
+            for other in candidates
+        )
+        top = heapq.nlargest(
+            limit,
+            (pair for pair in scored if pair[0] >= min_similarity),
+            key=lambda pair: (pair[0], -pair[1]),
+        )
+        return [(other, similarity) for similarity, other in top]
+
+
+similarity_index = recipe_indexes.register(SimilarityIndex())
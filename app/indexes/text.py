@@ -0,0 +1,63 @@
+import re
+from typing import List
+
+_TOKEN = re.compile(r"[^\W_]+")
+_CYRILLIC = re.compile(r"[а-я]")
+
+# Longest suffix first; a stem keeps at least _MIN_STEM characters
+_MIN_STEM = 3
+_ENGLISH_SUFFIXES = sorted(
+    ["ingly", "edly", "ings", "ing", "ed", "es", "ly", "s", "e"],
+    key=len,
+    reverse=True,
+)
+_RUSSIAN_SUFFIXES = sorted(
+    [
+        "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ать",
+        "ять", "ить", "еть", "ая", "яя", "ое", "ее", "ые", "ие", "ой", "ей",
+        "ый", "ий", "ам", "ям", "ах", "ях", "ом", "ем", "ов", "ев", "ию", "ия",
+        "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+    ],
+    key=len,
+    reverse=True,
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens of a text, with "ё" folded into "е".
+    """
+    return _TOKEN.findall(text.lower().replace("ё", "е")) if text else []
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix-stripping stemmer for English and Russian words.
+
+    Strips at most one inflectional suffix, so "bake", "baked" and "baking"
+    share a stem. Not a full Porter stemmer, but queries and documents go
+    through the same function, which is all ranking needs.
+    """
+    if token.isdigit():
+        return token
+    if _CYRILLIC.search(token):
+        return _strip_suffix(token, _RUSSIAN_SUFFIXES)
+    token = _strip_suffix(token, _ENGLISH_SUFFIXES)
+    # "berry" and "berries" both become "berri"
+    if token.endswith("y") and len(token) > _MIN_STEM:
+        token = token[:-1] + "i"
+    return token
+
+
+def _strip_suffix(token: str, suffixes: List[str]) -> str:
+    for suffix in suffixes:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            return token[: -len(suffix)]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Index terms of a text: tokenized and stemmed, in order, with repeats.
+    """
+    return [stem(token) for token in tokenize(text)]
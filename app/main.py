@@ -2,42 +2,91 @@ import uvicorn
 from fastapi import FastAPI
 from config import settings
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Iterable, Optional
 
-from models import db_helper, Base
-from api import router as api_router
-
-from fastapi.staticfiles import StaticFiles
-from fastapi_pagination import add_pagination
+from startup_timing import startup_timer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from models import db_helper, ensure_schema
+
     # startup
-    async with db_helper.engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    with startup_timer.phase("lifespan"):
+        with startup_timer.phase("lifespan.schema_check"):
+            await ensure_schema(
+                db_helper.engine, apply=settings.db.apply_schema_on_startup
+            )
+    if settings.app.startup_report:
+        startup_timer.log_report()
 
     yield
     # shutdown
+    from authentication.password_executor import password_executor
+
+    password_executor.shutdown()
     await db_helper.dispose()
 
 
-main_app = FastAPI(
-    lifespan=lifespan,
-)
-main_app.include_router(
-    api_router,
-)
+def create_app(routers: Optional[Iterable[str]] = None) -> FastAPI:
+    """
+    Build the application with the given routers (settings.app.routers by default).
+
+    Serve it with `uvicorn --factory main:create_app`.
+    """
+    # Models, the router package and pagination are imported here, so the
+    # import phase is measured without a module level timestamp
+    with startup_timer.phase("import"):
+        from fastapi_pagination import add_pagination
+
+        from api import build_router
+        import models  # noqa: F401
+
+    with startup_timer.phase("app"):
+        if routers is None:
+            routers = settings.app.routers
+        routers = list(routers)
+
+        app = FastAPI(
+            lifespan=lifespan,
+        )
+        app.include_router(
+            build_router(routers),
+        )
+
+        # Add pagination support
+        add_pagination(app)
+
+        if settings.app.openapi_cache_path:
+            from api.openapi_cache import install_openapi_cache
+
+            install_openapi_cache(app, Path(settings.app.openapi_cache_path))
+
+        if settings.app.serve_uploads or "lab1" in routers:
+            Path(settings.upload.dir).mkdir(exist_ok=True)
 
-# Add pagination support
-add_pagination(main_app)
+        # Нужно для загрузки картинок в 1 лабе
+        if settings.app.serve_uploads:
+            from api.upload_files import UploadFiles
 
-# Нужно для загрузки картинок в 1 лабе
-main_app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+            app.mount(
+                "/uploads",
+                UploadFiles(
+                    directory=settings.upload.dir,
+                    max_age=settings.upload.cache_max_age_seconds,
+                    memory_cache_bytes=settings.upload.memory_cache_bytes,
+                    memory_cache_max_file_bytes=settings.upload.memory_cache_max_file_bytes,
+                ),
+                name="uploads",
+            )
+    return app
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "main:main_app",
+        "main:create_app",
+        factory=True,
         host=settings.run.host,
         port=settings.run.port,
         reload=settings.run.reload,
@@ -8,9 +8,16 @@ __all__ = (
     "Ingredient",
     "RecipeAllergen",
     "RecipeIngredient",
+    "RecipeIngredientChange",
     "MeasurementEnum",
     "User",
     "AccessToken",
+    "SchemaVersion",
+    "RecipeStat",
+    "SCHEMA_VERSION",
+    "get_schema_version",
+    "upgrade_schema",
+    "ensure_schema",
 )
 
 from .db_helper import db_helper
@@ -22,6 +29,10 @@ from .allergen import Allergen
 from .ingredient import Ingredient
 from .recipe_allergen import RecipeAllergen
 from .recipe_ingredient import RecipeIngredient
+from .recipe_ingredient_change import RecipeIngredientChange
 from .enums import MeasurementEnum
 from .users import User
 from .access_token import AccessToken
+from .schema_version import SchemaVersion
+from .recipe_stat import RecipeStat
+from .schema import SCHEMA_VERSION, get_schema_version, upgrade_schema, ensure_schema
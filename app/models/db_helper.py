@@ -1,4 +1,6 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
 
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -9,6 +11,12 @@ from sqlalchemy.ext.asyncio import (
 
 from config import settings
 
+# Session handed to every session_getter dependency in the current context,
+# used by /api/batch to run read-only sub-requests on one session
+_shared_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "shared_session", default=None
+)
+
 
 class DatabaseHelper:
     def __init__(
@@ -34,9 +42,24 @@ class DatabaseHelper:
         await self.engine.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+        shared = _shared_session.get()
+        if shared is not None:
+            yield shared
+            return
         async with self.session_factory() as session:
             yield session
 
+    @asynccontextmanager
+    async def shared_session(self, session: AsyncSession):
+        """
+        Make session_getter yield `session` inside this block instead of a new one.
+        """
+        token = _shared_session.set(session)
+        try:
+            yield session
+        finally:
+            _shared_session.reset(token)
+
 
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String
+from sqlalchemy import String, Integer
 
 from .base import Base
 
@@ -9,6 +9,10 @@ class Ingredient(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True)
+    # Number of recipes using the ingredient, maintained by RecipeRepository
+    usage_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", index=True
+    )
 
     def __repr__(self):
         return f"Ingredient(id={self.id}, name={self.name})"
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
-from sqlalchemy import String, Text, Integer, CheckConstraint, ForeignKey
-from typing import Optional
+from sqlalchemy import String, Text, Integer, BigInteger, CheckConstraint, ForeignKey
+from typing import Iterable, Optional
 
 from .base import Base
 
@@ -9,6 +9,9 @@ from .base import Base
 class Recipe(Base):
     __tablename__ = "recipes"
 
+    # Allergens 1..63 map to bits 0..62 of allergen_mask; the sign bit is unused
+    ALLERGEN_MASK_BITS = 63
+
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
@@ -20,6 +23,10 @@ class Recipe(Base):
     author_id: Mapped[int] = mapped_column(
         ForeignKey("user.id"), nullable=False
     )
+    # Bitmask of the recipe's allergens, maintained by RecipeRepository
+    allergen_mask: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
 
     __table_args__ = (
         CheckConstraint(
@@ -27,5 +34,16 @@ class Recipe(Base):
         ),
     )
 
+    @classmethod
+    def allergen_mask_for(cls, allergen_ids: Iterable[int]) -> int:
+        """
+        Bitmask for the given allergen ids; ids outside the mask are ignored.
+        """
+        mask = 0
+        for allergen_id in allergen_ids:
+            if 1 <= allergen_id <= cls.ALLERGEN_MASK_BITS:
+                mask |= 1 << (allergen_id - 1)
+        return mask
+
     def __repr__(self):
         return f"Recipe(id={self.id}, title={self.title})"
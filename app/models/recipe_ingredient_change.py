@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Integer
+
+from .base import Base
+
+
+class RecipeIngredientChange(Base):
+    """
+    Append-only log of recipes whose ingredient set changed, written by
+    RecipeRepository. Postings snapshots record the highest seq they include
+    and replay only the recipes logged after it.
+    """
+
+    __tablename__ = "recipe_ingredient_changes"
+    # Never reuse seq values, even after the log was pruned
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    # No foreign key: deletions are logged too
+    recipe_id: Mapped[int] = mapped_column(Integer)
+
+    def __repr__(self):
+        return f"RecipeIngredientChange(seq={self.seq}, recipe_id={self.recipe_id})"
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer
+
+from .base import Base
+
+
+class RecipeStat(Base):
+    """
+    Recipe counters maintained by RecipeRepository writes.
+
+    One row per (dimension, key): e.g. ("cuisine", 3) counts recipes of cuisine 3,
+    ("cooking_time", 30) counts recipes that take 30 minutes.
+    """
+
+    __tablename__ = "recipe_stats"
+
+    DIMENSION_CUISINE = "cuisine"
+    DIMENSION_ALLERGEN = "allergen"
+    DIMENSION_DIFFICULTY = "difficulty"
+    DIMENSION_COOKING_TIME = "cooking_time"
+    # Key used for recipes without a cuisine
+    NO_CUISINE = 0
+
+    dimension: Mapped[str] = mapped_column(String(32), primary_key=True)
+    key: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __repr__(self):
+        return f"RecipeStat(dimension={self.dimension}, key={self.key}, count={self.count})"
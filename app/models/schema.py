@@ -0,0 +1,171 @@
+import logging
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import Connection, delete, insert, inspect, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .base import Base
+from .schema_version import SchemaVersion
+
+log = logging.getLogger(__name__)
+
+
+def _create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+
+
+def _add_recipe_stats(conn: Connection) -> None:
+    from repositories.recipe_stats_repository import rebuild_statements
+
+    Base.metadata.create_all(conn)
+    for stmt in rebuild_statements():
+        conn.execute(stmt)
+
+
+def _add_ingredient_usage_count(conn: Connection) -> None:
+    from repositories.ingredient_repository import usage_count_rebuild_statement
+
+    add_column_if_missing(conn, "ingredients", "usage_count")
+    for index in Base.metadata.tables["ingredients"].indexes:
+        index.create(conn, checkfirst=True)
+    conn.execute(usage_count_rebuild_statement())
+
+
+def _add_recipe_allergen_mask(conn: Connection) -> None:
+    from repositories.recipe_repository import allergen_mask_rebuild_statement
+
+    add_column_if_missing(conn, "recipes", "allergen_mask")
+    conn.execute(allergen_mask_rebuild_statement())
+
+
+def _add_recipe_search(conn: Connection) -> None:
+    from queries.recipe_search_queries import search_index_statements
+
+    try:
+        for statement in search_index_statements(conn.dialect.name):
+            conn.exec_driver_sql(statement)
+    except DBAPIError:
+        # SQLite built without FTS5; search uses the in-process index
+        log.warning("Full-text index not created, search will run in memory", exc_info=True)
+
+
+def _add_recipe_ingredient_changes(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+
+
+# Upgrade steps keyed by the version they produce. Every step must be safe to
+# run on a database that create_all has already brought to the latest shape.
+MIGRATIONS: Dict[int, Callable[[Connection], None]] = {
+    1: _create_tables,
+    2: _add_recipe_stats,
+    3: _add_ingredient_usage_count,
+    4: _add_recipe_allergen_mask,
+    5: _add_recipe_search,
+    6: _add_recipe_ingredient_changes,
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column_name: str) -> None:
+    """
+    Add a column declared on the model to an existing table.
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column_name in existing:
+        return
+    column = Base.metadata.tables[table_name].c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
+
+
+async def get_schema_version(engine: AsyncEngine) -> Optional[int]:
+    """
+    Read the applied schema version, or None if the database was never versioned.
+    """
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(
+                select(SchemaVersion.version).where(SchemaVersion.id == 1)
+            )
+    except DBAPIError:
+        return None
+
+
+# Postgres advisory lock key serializing schema upgrades
+_SCHEMA_LOCK_KEY = 7_347_001
+
+
+def _lock_schema(conn: Connection) -> None:
+    """
+    Take a lock held until the end of the transaction, so concurrently
+    starting workers upgrade one after another.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_SCHEMA_LOCK_KEY})")
+    elif conn.dialect.name == "sqlite":
+        # Takes the database write lock now instead of at the first write
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _read_version(conn: Connection) -> Optional[int]:
+    # Checked first: a failed SELECT would abort a Postgres transaction
+    if not inspect(conn).has_table(SchemaVersion.__tablename__):
+        return None
+    return conn.scalar(select(SchemaVersion.version).where(SchemaVersion.id == 1))
+
+
+async def upgrade_schema(engine: AsyncEngine) -> int:
+    """
+    Apply all pending migrations and record the new version.
+
+    The version is re-read under a lock inside the upgrade transaction, so of
+    several workers starting at once only the first one runs the migrations.
+
+    Raises:
+        RuntimeError: If the database schema is newer than the code
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(_lock_schema)
+        current = await conn.run_sync(_read_version) or 0
+        if current == SCHEMA_VERSION:
+            return current
+        if current > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database schema version {current} is newer than the code ({SCHEMA_VERSION})"
+            )
+        for version in sorted(MIGRATIONS):
+            if version > current:
+                log.warning("Applying schema migration %d", version)
+                await conn.run_sync(MIGRATIONS[version])
+        await conn.execute(delete(SchemaVersion))
+        await conn.execute(insert(SchemaVersion).values(id=1, version=SCHEMA_VERSION))
+    return SCHEMA_VERSION
+
+
+async def ensure_schema(engine: AsyncEngine, apply: bool = False) -> None:
+    """
+    Startup check: one query when the schema is current, DDL only when it is not.
+
+    Raises:
+        RuntimeError: If the schema is outdated and apply is False
+    """
+    current = await get_schema_version(engine)
+    if current == SCHEMA_VERSION:
+        return
+    if current is not None and current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than the code ({SCHEMA_VERSION})"
+        )
+    if not apply:
+        raise RuntimeError(
+            f"Database schema version is {current}, expected {SCHEMA_VERSION}. "
+            "Run `python cli.py schema upgrade`"
+        )
+    await upgrade_schema(engine)
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer
+
+from .base import Base
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    # Single row table, id is always 1
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+
+    def __repr__(self):
+        return f"SchemaVersion(version={self.version})"
@@ -3,9 +3,17 @@ __all__ = (
     "CuisineQueries",
     "AllergenQueries",
     "IngredientQueries",
+    "RecipeStatsQueries",
+    "RecipeRelationQueries",
+    "RecipeSearchQueries",
+    "NameQueries",
 )
 
 from .recipe_queries import RecipeQueries
 from .cuisine_queries import CuisineQueries
 from .allergen_queries import AllergenQueries
 from .ingredient_queries import IngredientQueries
+from .recipe_stats_queries import RecipeStatsQueries
+from .recipe_relation_queries import RecipeRelationQueries
+from .recipe_search_queries import RecipeSearchQueries
+from .name_queries import NameQueries
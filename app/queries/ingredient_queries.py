@@ -1,17 +1,47 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models import Ingredient, RecipeIngredient
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class IngredientQueries:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Ingredient]:
-        result = await self.session.execute(select(Ingredient).offset(skip).limit(limit))
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, sort: Optional[str] = None
+    ) -> List[Ingredient]:
+        query = select(Ingredient)
+        if sort:
+            query = self.apply_sorting(query, sort)
+        result = await self.session.execute(query.offset(skip).limit(limit))
         return list(result.scalars().all())
 
+    def apply_sorting(self, query, sort: str):
+        """
+        Raises:
+            ValueError: If sort is not id, name or usage, optionally with '-'
+        """
+        # "usage" sorts by the denormalized usage_count column
+        descending = sort.startswith("-")
+        field_name = sort.lstrip("-")
+        if field_name == "usage":
+            field_name = "usage_count"
+        if field_name not in ("id", "name", "usage_count"):
+            raise ValueError(f"Unknown sort field {sort!r}")
+        column = getattr(Ingredient, field_name)
+        if descending:
+            return query.order_by(column.desc(), Ingredient.id)
+        return query.order_by(column, Ingredient.id)
+
+    async def get_usage_counts(self, ingredient_ids: List[int]) -> Dict[int, int]:
+        result = await self.session.execute(
+            select(Ingredient.id, Ingredient.usage_count).where(
+                Ingredient.id.in_(ingredient_ids)
+            )
+        )
+        return dict(result.all())
+
     async def get_by_id(self, ingredient_id: int) -> Optional[Ingredient]:
         result = await self.session.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
         return result.scalar_one_or_none()
@@ -0,0 +1,21 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, Iterable, Optional
+
+
+class NameQueries:
+    """
+    Display names of catalog rows (cuisines, ingredients, allergens) by id.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_names(self, model, ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return {}
+        result = await self.session.execute(
+            select(model.id, model.name).where(model.id.in_(ids))
+        )
+        return {row.id: row.name for row in result.all()}
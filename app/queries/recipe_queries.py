@@ -1,7 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import Recipe, RecipeIngredient
-from typing import List, Optional
+from sqlalchemy import (
+    String,
+    case,
+    distinct,
+    exists,
+    func,
+    literal,
+    select,
+    union_all,
+)
+from models import Recipe, RecipeAllergen, RecipeIngredient, Ingredient
+from typing import Dict, List, Optional
 
 
 class RecipeQueries:
@@ -24,6 +33,38 @@ class RecipeQueries:
         )
         return [row[0] for row in result.all()]
 
+    async def get_existing_ids(self, recipe_ids: List[int]) -> List[int]:
+        result = await self.session.execute(
+            select(Recipe.id).where(Recipe.id.in_(recipe_ids))
+        )
+        return list(result.scalars().all())
+
+    async def get_ingredient_totals(self, servings: Dict[int, int]):
+        """
+        Ingredient quantities summed per (ingredient, measurement) over the given
+        recipes in one grouped query; servings maps recipe id to how many times
+        it is cooked.
+        """
+        quantity = RecipeIngredient.quantity
+        if any(count != 1 for count in servings.values()):
+            quantity = quantity * case(servings, value=RecipeIngredient.recipe_id, else_=0)
+        result = await self.session.execute(
+            select(
+                RecipeIngredient.ingredient_id,
+                Ingredient.name,
+                RecipeIngredient.measurement,
+                func.sum(quantity).label("quantity"),
+                func.count(RecipeIngredient.recipe_id.distinct()).label("recipe_count"),
+            )
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(RecipeIngredient.recipe_id.in_(list(servings)))
+            .group_by(
+                RecipeIngredient.ingredient_id, Ingredient.name, RecipeIngredient.measurement
+            )
+            .order_by(Ingredient.name, RecipeIngredient.measurement)
+        )
+        return result.all()
+
     async def get_by_ids(self, recipe_ids: List[int]) -> List[Recipe]:
         result = await self.session.execute(
             select(Recipe).where(Recipe.id.in_(recipe_ids))
@@ -36,11 +77,145 @@ class RecipeQueries:
     def apply_name_filter(self, query, name_like: str):
         return query.where(Recipe.title.ilike(f"%{name_like}%"))
 
+    def apply_ingredient_filter(
+        self, query, ingredient_ids: List[int], match_all: bool = False
+    ):
+        """
+        Keep recipes using any (or, with match_all, every) of the ingredients.
+
+        The filter is a semi-join inside the main query, so no recipe ids are
+        loaded into Python however many recipes match.
+        """
+        ingredient_ids = sorted(set(ingredient_ids))
+        if match_all:
+            matching = (
+                select(RecipeIngredient.recipe_id)
+                .where(RecipeIngredient.ingredient_id.in_(ingredient_ids))
+                .group_by(RecipeIngredient.recipe_id)
+                .having(
+                    func.count(RecipeIngredient.ingredient_id.distinct())
+                    == len(ingredient_ids)
+                )
+            )
+            return query.where(Recipe.id.in_(matching))
+        return query.where(
+            exists().where(
+                RecipeIngredient.recipe_id == Recipe.id,
+                RecipeIngredient.ingredient_id.in_(ingredient_ids),
+            )
+        )
+
+    def apply_range_filter(
+        self, query, column, low: Optional[int] = None, high: Optional[int] = None
+    ):
+        if low is not None:
+            query = query.where(column >= low)
+        if high is not None:
+            query = query.where(column <= high)
+        return query
+
+    def apply_cuisine_filter(self, query, cuisine_ids: List[int]):
+        return query.where(Recipe.cuisine_id.in_(cuisine_ids))
+
     def apply_recipe_ids_filter(self, query, recipe_ids: List[int]):
         if not recipe_ids:
             return query.where(Recipe.id.in_([-1]))  # No match condition
         return query.where(Recipe.id.in_(recipe_ids))
 
+    def apply_allergen_exclusion(self, query, allergen_ids: List[int]):
+        """
+        Keep only recipes that contain none of the given allergens.
+        """
+        mask = Recipe.allergen_mask_for(allergen_ids)
+        if mask:
+            query = query.where(Recipe.allergen_mask.bitwise_and(mask) == 0)
+        # Allergens beyond the mask width fall back to an anti-join
+        outside = [a for a in allergen_ids if not Recipe.allergen_mask_for([a])]
+        if outside:
+            query = query.where(
+                ~exists().where(
+                    RecipeAllergen.recipe_id == Recipe.id,
+                    RecipeAllergen.allergen_id.in_(outside),
+                )
+            )
+        return query
+
+    async def count(self, query) -> int:
+        return await self.session.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    async def get_facet_counts(
+        self, query, cooking_time_buckets: List[int], top_ingredients: int
+    ) -> Dict[str, Dict]:
+        """
+        Facet counts over the recipes of a filtered query, in one statement.
+
+        The filtered recipes are materialized once in a CTE and every facet is
+        grouped from it, so the filter runs once however many facets there are.
+
+        Returns {value: count} dicts for "cuisine" (cuisine_id, None for none),
+        "difficulty", "cooking_time" (index of the bucket whose lower bound is
+        the last one not above the recipe's cooking time) and "ingredient"
+        (the top_ingredients ingredients used by most recipes, ties by lower id).
+        """
+        bucket = case(
+            *[
+                (Recipe.cooking_time >= lower, index)
+                for index, lower in reversed(list(enumerate(cooking_time_buckets)))
+            ],
+            else_=-1,
+        )
+        filtered = (
+            query.with_only_columns(
+                Recipe.id,
+                Recipe.cuisine_id,
+                Recipe.difficulty,
+                bucket.label("cooking_time"),
+            )
+            .order_by(None)
+            .cte("filtered_recipes")
+            .prefix_with("MATERIALIZED")
+        )
+
+        def grouped(name: str, column):
+            return select(
+                literal(name, String).label("facet"),
+                column.label("value"),
+                func.count().label("count"),
+            ).group_by(column)
+
+        recipes = func.count(distinct(RecipeIngredient.recipe_id))
+        ingredients = (
+            select(RecipeIngredient.ingredient_id.label("value"), recipes.label("count"))
+            .join(filtered, RecipeIngredient.recipe_id == filtered.c.id)
+            .group_by(RecipeIngredient.ingredient_id)
+            .order_by(recipes.desc(), RecipeIngredient.ingredient_id)
+            .limit(top_ingredients)
+            .subquery()
+        )
+        result = await self.session.execute(
+            union_all(
+                grouped("cuisine", filtered.c.cuisine_id),
+                grouped("difficulty", filtered.c.difficulty),
+                grouped("cooking_time", filtered.c.cooking_time),
+                select(
+                    literal("ingredient", String).label("facet"),
+                    ingredients.c.value,
+                    ingredients.c.count,
+                ),
+            )
+        )
+
+        counts = {"cuisine": {}, "difficulty": {}, "cooking_time": {}, "ingredient": {}}
+        for facet, value, count in result.all():
+            counts[facet][value] = count
+        # UNION ALL does not keep the ranking of its branches
+        counts["ingredient"] = dict(
+            sorted(counts["ingredient"].items(), key=lambda kv: (-kv[1], kv[0]))
+        )
+        return counts
+
     def apply_sorting(self, query, sort: str):
         if sort.startswith("-"):
             field_name = sort[1:]
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from models import Recipe, Cuisine, Allergen, RecipeAllergen, RecipeIngredient, Ingredient, User
+from typing import Any, Dict, List
+
+
+class RecipeRelationQueries:
+    """
+    Loads one related entity for a whole batch of recipes in a single query.
+
+    Results are keyed by recipe id and shaped like the nested objects of
+    RecipeResponse.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_cuisines(self, recipes: List[Recipe]) -> Dict[int, Any]:
+        cuisine_ids = {r.cuisine_id for r in recipes if r.cuisine_id}
+        names = {}
+        if cuisine_ids:
+            result = await self.session.execute(
+                select(Cuisine.id, Cuisine.name).where(Cuisine.id.in_(cuisine_ids))
+            )
+            names = {row.id: row.name for row in result.all()}
+        return {
+            r.id: {"id": r.cuisine_id, "name": names[r.cuisine_id]}
+            if r.cuisine_id in names
+            else None
+            for r in recipes
+        }
+
+    async def get_authors(self, recipes: List[Recipe]) -> Dict[int, Any]:
+        author_ids = {r.author_id for r in recipes}
+        result = await self.session.execute(
+            select(User.id, User.first_name, User.last_name).where(User.id.in_(author_ids))
+        )
+        authors = {
+            row.id: {"id": row.id, "first_name": row.first_name, "last_name": row.last_name}
+            for row in result.all()
+        }
+        return {r.id: authors.get(r.author_id) for r in recipes}
+
+    async def get_allergens(self, recipes: List[Recipe]) -> Dict[int, List[dict]]:
+        result = await self.session.execute(
+            select(RecipeAllergen.recipe_id, Allergen.id, Allergen.name)
+            .join(Allergen, Allergen.id == RecipeAllergen.allergen_id)
+            .where(RecipeAllergen.recipe_id.in_([r.id for r in recipes]))
+            .order_by(Allergen.id)
+        )
+        allergens = defaultdict(list)
+        for row in result.all():
+            allergens[row.recipe_id].append({"id": row.id, "name": row.name})
+        return {r.id: allergens.get(r.id, []) for r in recipes}
+
+    async def get_ingredients(self, recipes: List[Recipe]) -> Dict[int, List[dict]]:
+        result = await self.session.execute(
+            select(
+                RecipeIngredient.recipe_id,
+                RecipeIngredient.ingredient_id,
+                Ingredient.name,
+                RecipeIngredient.quantity,
+                RecipeIngredient.measurement,
+            )
+            .outerjoin(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(RecipeIngredient.recipe_id.in_([r.id for r in recipes]))
+            .order_by(RecipeIngredient.id)
+        )
+        ingredients = defaultdict(list)
+        for row in result.all():
+            ingredients[row.recipe_id].append(
+                {
+                    "id": row.ingredient_id,
+                    "name": row.name or "",
+                    "quantity": row.quantity,
+                    "measurement": row.measurement,
+                }
+            )
+        return {r.id: ingredients.get(r.id, []) for r in recipes}
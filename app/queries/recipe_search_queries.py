@@ -0,0 +1,124 @@
+from typing import List, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import literal_column, select, text, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Recipe
+
+# The GIN index is on this exact expression; queries must repeat it verbatim
+# for Postgres to use the index
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', description), 'B')"
+)
+_PG_INDEX = "ix_recipes_search"
+_SQLITE_TABLE = "recipes_fts"
+
+# Whether the database index exists, per engine
+_available: "WeakKeyDictionary[object, bool]" = WeakKeyDictionary()
+
+
+def search_index_statements(dialect_name: str) -> List[str]:
+    """
+    DDL creating the database full-text index for a dialect, if it has one.
+
+    SQLite gets an external-content FTS5 table kept in sync by triggers and
+    filled from the existing rows; Postgres an expression GIN index.
+    """
+    if dialect_name == "sqlite":
+        columns = "title, description"
+        new_values = "new.id, new.title, new.description"
+        old_values = "'delete', old.id, old.title, old.description"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {_SQLITE_TABLE} USING fts5("
+            f"{columns}, content='recipes', content_rowid='id', "
+            "tokenize='porter unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {_SQLITE_TABLE}_ai AFTER INSERT ON recipes "
+            f"BEGIN INSERT INTO {_SQLITE_TABLE}(rowid, {columns}) "
+            f"VALUES ({new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {_SQLITE_TABLE}_ad AFTER DELETE ON recipes "
+            f"BEGIN INSERT INTO {_SQLITE_TABLE}({_SQLITE_TABLE}, rowid, {columns}) "
+            f"VALUES ({old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {_SQLITE_TABLE}_au "
+            f"AFTER UPDATE OF {columns} ON recipes "
+            f"BEGIN INSERT INTO {_SQLITE_TABLE}({_SQLITE_TABLE}, rowid, {columns}) "
+            f"VALUES ({old_values}); "
+            f"INSERT INTO {_SQLITE_TABLE}(rowid, {columns}) VALUES ({new_values}); END",
+            f"INSERT INTO {_SQLITE_TABLE}({_SQLITE_TABLE}) VALUES ('rebuild')",
+        ]
+    if dialect_name == "postgresql":
+        return [
+            f"CREATE INDEX IF NOT EXISTS {_PG_INDEX} ON recipes "
+            f"USING GIN (({_PG_DOCUMENT}))"
+        ]
+    return []
+
+
+class RecipeSearchQueries:
+    """
+    Ranked full-text search backed by the database's own text index.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def _dialect(self) -> str:
+        return self.session.bind.dialect.name
+
+    async def index_available(self) -> bool:
+        """
+        Whether schema migration 5 created a full-text index in this database.
+        """
+        engine = self.session.bind.sync_engine
+        available = _available.get(engine)
+        if available is None:
+            if self._dialect == "sqlite":
+                stmt = text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ).bindparams(name=_SQLITE_TABLE)
+            elif self._dialect == "postgresql":
+                stmt = text("SELECT 1 FROM pg_indexes WHERE indexname = :name").bindparams(
+                    name=_PG_INDEX
+                )
+            else:
+                stmt = None
+            available = stmt is not None and await self.session.scalar(stmt) is not None
+            _available[engine] = available
+        return available
+
+    async def search(self, terms: List[str], limit: int) -> List[Tuple[int, str, float]]:
+        """
+        Top (id, title, score) rows matching any of the terms, best first.
+
+        Terms must be plain word tokens; the database stems them itself.
+        """
+        if not terms:
+            return []
+        if self._dialect == "sqlite":
+            stmt = text(
+                f"SELECT r.id, r.title, -bm25({_SQLITE_TABLE}, :title_weight, "
+                ":description_weight) AS score "
+                f"FROM {_SQLITE_TABLE} JOIN recipes r ON r.id = {_SQLITE_TABLE}.rowid "
+                f"WHERE {_SQLITE_TABLE} MATCH :query "
+                "ORDER BY score DESC, r.id LIMIT :limit"
+            ).bindparams(
+                title_weight=settings.search.title_weight,
+                description_weight=settings.search.description_weight,
+                query=" OR ".join(f'"{term}"' for term in terms),
+                limit=limit,
+            )
+        else:
+            document = literal_column(f"({_PG_DOCUMENT})")
+            tsquery = func.to_tsquery(literal_column("'english'"), " | ".join(terms))
+            score = func.ts_rank_cd(document, tsquery).label("score")
+            stmt = (
+                select(Recipe.id, Recipe.title, score)
+                .where(document.op("@@")(tsquery))
+                .order_by(score.desc(), Recipe.id)
+                .limit(limit)
+            )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
@@ -0,0 +1,23 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from models import RecipeStat
+from typing import Dict
+
+
+class RecipeStatsQueries:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_counts(self) -> Dict[str, Dict[int, int]]:
+        """
+        Non-zero counters grouped by dimension: {dimension: {key: count}}.
+        """
+        result = await self.session.execute(
+            select(RecipeStat.dimension, RecipeStat.key, RecipeStat.count).where(
+                RecipeStat.count > 0
+            )
+        )
+        counts: Dict[str, Dict[int, int]] = {}
+        for dimension, key, count in result.all():
+            counts.setdefault(dimension, {})[key] = count
+        return counts
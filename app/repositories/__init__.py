@@ -3,9 +3,11 @@ __all__ = (
     "CuisineRepository",
     "AllergenRepository",
     "IngredientRepository",
+    "RecipeStatsRepository",
 )
 
 from .recipe_repository import RecipeRepository
 from .cuisine_repository import CuisineRepository
 from .allergen_repository import AllergenRepository
 from .ingredient_repository import IngredientRepository
+from .recipe_stats_repository import RecipeStatsRepository
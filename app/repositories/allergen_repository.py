@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from models import Allergen
 from schemas import AllergenCreate, AllergenUpdate
 
@@ -12,29 +12,28 @@ class AllergenRepository:
         db_allergen = Allergen(**allergen_data.model_dump())
         self.session.add(db_allergen)
         await self.session.commit()
-        await self.session.refresh(db_allergen)
         return db_allergen
 
     async def update(self, allergen_id: int, allergen_update: AllergenUpdate) -> Allergen | None:
-        result = await self.session.execute(select(Allergen).where(Allergen.id == allergen_id))
-        db_allergen = result.scalar_one_or_none()
-        if not db_allergen:
-            return None
-
         update_data = allergen_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_allergen, key, value)
-
+        if not update_data:
+            result = await self.session.execute(select(Allergen).where(Allergen.id == allergen_id))
+            return result.scalar_one_or_none()
+
+        result = await self.session.execute(
+            update(Allergen)
+            .where(Allergen.id == allergen_id)
+            .values(**update_data)
+            .returning(Allergen)
+        )
+        db_allergen = result.scalar_one_or_none()
         await self.session.commit()
-        await self.session.refresh(db_allergen)
         return db_allergen
 
     async def delete(self, allergen_id: int) -> bool:
-        result = await self.session.execute(select(Allergen).where(Allergen.id == allergen_id))
-        db_allergen = result.scalar_one_or_none()
-        if not db_allergen:
-            return False
-
-        await self.session.delete(db_allergen)
+        result = await self.session.execute(
+            delete(Allergen).where(Allergen.id == allergen_id).returning(Allergen.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
         await self.session.commit()
-        return True
+        return deleted
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from models import Cuisine
 from schemas import CuisineCreate, CuisineUpdate
 
@@ -12,29 +12,28 @@ class CuisineRepository:
         db_cuisine = Cuisine(**cuisine_data.model_dump())
         self.session.add(db_cuisine)
         await self.session.commit()
-        await self.session.refresh(db_cuisine)
         return db_cuisine
 
     async def update(self, cuisine_id: int, cuisine_update: CuisineUpdate) -> Cuisine | None:
-        result = await self.session.execute(select(Cuisine).where(Cuisine.id == cuisine_id))
-        db_cuisine = result.scalar_one_or_none()
-        if not db_cuisine:
-            return None
-
         update_data = cuisine_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_cuisine, key, value)
-
+        if not update_data:
+            result = await self.session.execute(select(Cuisine).where(Cuisine.id == cuisine_id))
+            return result.scalar_one_or_none()
+
+        result = await self.session.execute(
+            update(Cuisine)
+            .where(Cuisine.id == cuisine_id)
+            .values(**update_data)
+            .returning(Cuisine)
+        )
+        db_cuisine = result.scalar_one_or_none()
         await self.session.commit()
-        await self.session.refresh(db_cuisine)
         return db_cuisine
 
     async def delete(self, cuisine_id: int) -> bool:
-        result = await self.session.execute(select(Cuisine).where(Cuisine.id == cuisine_id))
-        db_cuisine = result.scalar_one_or_none()
-        if not db_cuisine:
-            return False
-
-        await self.session.delete(db_cuisine)
+        result = await self.session.execute(
+            delete(Cuisine).where(Cuisine.id == cuisine_id).returning(Cuisine.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
         await self.session.commit()
-        return True
+        return deleted
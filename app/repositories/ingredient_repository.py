@@ -1,9 +1,23 @@
+from collections import Counter
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import Ingredient
+from sqlalchemy import select, update, delete, func, bindparam
+from models import Ingredient, RecipeIngredient
 from schemas import IngredientCreate, IngredientUpdate
 
 
+def usage_count_rebuild_statement():
+    """
+    Statement that recomputes every usage_count from recipe_ingredients.
+    """
+    usage = (
+        select(func.count(RecipeIngredient.recipe_id.distinct()))
+        .where(RecipeIngredient.ingredient_id == Ingredient.id)
+        .scalar_subquery()
+    )
+    return update(Ingredient.__table__).values(usage_count=usage)
+
+
 class IngredientRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -12,29 +26,54 @@ class IngredientRepository:
         db_ingredient = Ingredient(**ingredient_data.model_dump())
         self.session.add(db_ingredient)
         await self.session.commit()
-        await self.session.refresh(db_ingredient)
         return db_ingredient
 
     async def update(self, ingredient_id: int, ingredient_update: IngredientUpdate) -> Ingredient | None:
-        result = await self.session.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
-        db_ingredient = result.scalar_one_or_none()
-        if not db_ingredient:
-            return None
-
         update_data = ingredient_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_ingredient, key, value)
+        if not update_data:
+            result = await self.session.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
+            return result.scalar_one_or_none()
 
+        result = await self.session.execute(
+            update(Ingredient)
+            .where(Ingredient.id == ingredient_id)
+            .values(**update_data)
+            .returning(Ingredient)
+        )
+        db_ingredient = result.scalar_one_or_none()
         await self.session.commit()
-        await self.session.refresh(db_ingredient)
         return db_ingredient
 
     async def delete(self, ingredient_id: int) -> bool:
-        result = await self.session.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
-        db_ingredient = result.scalar_one_or_none()
-        if not db_ingredient:
-            return False
+        result = await self.session.execute(
+            delete(Ingredient).where(Ingredient.id == ingredient_id).returning(Ingredient.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return deleted
+
+    async def apply_usage_deltas(self, deltas: Counter) -> None:
+        """
+        Adjust usage_count by {ingredient_id: delta} inside the caller's transaction.
+
+        Rows are updated in id order, so concurrent transactions touching
+        overlapping ingredients lock them in the same order and cannot deadlock.
+        """
+        rows = [
+            {"b_id": ingredient_id, "b_delta": delta}
+            for ingredient_id, delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+        table = Ingredient.__table__
+        await self.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(usage_count=table.c.usage_count + bindparam("b_delta")),
+            rows,
+        )
 
-        await self.session.delete(db_ingredient)
+    async def rebuild_usage_counts(self) -> None:
+        await self.session.execute(usage_count_rebuild_statement())
         await self.session.commit()
-        return True
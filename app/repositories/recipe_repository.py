@@ -1,7 +1,48 @@
+from collections import Counter, defaultdict
+from typing import Iterable, List, Tuple
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import Recipe, RecipeAllergen, RecipeIngredient
+from sqlalchemy import select, update, delete, insert, func, literal, BigInteger
+from models import (
+    Recipe,
+    RecipeAllergen,
+    RecipeIngredient,
+    RecipeIngredientChange,
+    RecipeStat,
+)
+from indexes import recipe_indexes
+from indexes.postings import prune_changes
 from schemas import RecipeCreate, RecipeUpdate
+from schemas.recipe import RecipeIngredientInput
+
+from .recipe_stats_repository import RecipeStatsRepository, recipe_stat_keys
+from .ingredient_repository import IngredientRepository
+
+# Scalar fields that feed the recipe_stats counters
+STAT_FIELDS = {"difficulty", "cooking_time"}
+
+
+def index_fields(recipe: Recipe) -> dict:
+    """
+    Column values of a recipe as passed to the in-memory indexes.
+    """
+    return {column.key: getattr(recipe, column.key) for column in Recipe.__table__.columns}
+
+
+def allergen_mask_rebuild_statement():
+    """
+    Statement that recomputes every allergen_mask from recipe_allergens.
+    """
+    bit = literal(1, BigInteger).bitwise_lshift(RecipeAllergen.allergen_id - 1)
+    mask = (
+        select(func.coalesce(func.sum(bit), 0))
+        .where(
+            RecipeAllergen.recipe_id == Recipe.id,
+            RecipeAllergen.allergen_id.between(1, Recipe.ALLERGEN_MASK_BITS),
+        )
+        .scalar_subquery()
+    )
+    return update(Recipe.__table__).values(allergen_mask=mask)
 
 
 class RecipeRepository:
@@ -11,6 +52,7 @@ class RecipeRepository:
     async def create(self, recipe_data: RecipeCreate, author_id: int) -> Recipe:
         recipe_dict = recipe_data.model_dump(exclude={"allergen_ids", "ingredients"})
         recipe_dict["author_id"] = author_id
+        recipe_dict["allergen_mask"] = Recipe.allergen_mask_for(recipe_data.allergen_ids)
         db_recipe = Recipe(**recipe_dict)
         self.session.add(db_recipe)
 
@@ -31,33 +73,245 @@ class RecipeRepository:
             )
             self.session.add(recipe_ingredient)
 
+        await IngredientRepository(self.session).apply_usage_deltas(
+            Counter({i.ingredient_id for i in recipe_data.ingredients})
+        )
+        if recipe_data.ingredients:
+            await self._log_ingredient_changes([db_recipe.id])
+        await RecipeStatsRepository(self.session).apply(
+            Counter(
+                recipe_stat_keys(
+                    db_recipe.cuisine_id,
+                    db_recipe.difficulty,
+                    db_recipe.cooking_time,
+                    set(recipe_data.allergen_ids),
+                )
+            )
+        )
+
+        fields = index_fields(db_recipe)
         await self.session.commit()
-        await self.session.refresh(db_recipe)
+        recipe_indexes.recipe_saved(
+            db_recipe.id, fields, {i.ingredient_id for i in recipe_data.ingredients}
+        )
         return db_recipe
 
-    async def update(self, recipe_id: int, recipe_update: RecipeUpdate) -> Recipe | None:
-        result = await self.session.execute(select(Recipe).where(Recipe.id == recipe_id))
+    async def update(
+        self, recipe_id: int, recipe_update: RecipeUpdate, author_id: int | None = None
+    ) -> Recipe | None:
+        """
+        Update a recipe in a single UPDATE ... RETURNING statement.
+
+        When author_id is given, only a recipe owned by that author is updated.
+        allergen_ids and ingredients, if set, replace the stored lists; only the
+        rows that actually differ are inserted, updated or deleted, all in the
+        same transaction. Returns None if no row matched.
+        """
+        conditions = [Recipe.id == recipe_id]
+        if author_id is not None:
+            conditions.append(Recipe.author_id == author_id)
+
+        update_data = recipe_update.model_dump(
+            exclude_unset=True, exclude={"allergen_ids", "ingredients"}
+        )
+        if recipe_update.allergen_ids is not None:
+            update_data["allergen_mask"] = Recipe.allergen_mask_for(
+                recipe_update.allergen_ids
+            )
+        stat_deltas = Counter()
+
+        # Old counter keys are only needed when a counted field changes
+        if STAT_FIELDS & update_data.keys():
+            result = await self.session.execute(
+                select(Recipe.cuisine_id, Recipe.difficulty, Recipe.cooking_time).where(
+                    *conditions
+                )
+            )
+            old = result.one_or_none()
+            if old is None:
+                return None
+            stat_deltas.subtract(recipe_stat_keys(*old))
+
+        if update_data:
+            result = await self.session.execute(
+                update(Recipe).where(*conditions).values(**update_data).returning(Recipe)
+            )
+        else:
+            result = await self.session.execute(select(Recipe).where(*conditions))
         db_recipe = result.scalar_one_or_none()
         if not db_recipe:
             return None
 
-        update_data = recipe_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_recipe, key, value)
+        if STAT_FIELDS & update_data.keys():
+            stat_deltas.update(
+                recipe_stat_keys(
+                    db_recipe.cuisine_id, db_recipe.difficulty, db_recipe.cooking_time
+                )
+            )
+        if recipe_update.allergen_ids is not None:
+            added, removed = await self._replace_allergens(
+                recipe_id, recipe_update.allergen_ids
+            )
+            stat_deltas.update((RecipeStat.DIMENSION_ALLERGEN, a) for a in added)
+            stat_deltas.subtract((RecipeStat.DIMENSION_ALLERGEN, a) for a in removed)
+        ingredient_ids = None
+        if recipe_update.ingredients is not None:
+            await self._replace_ingredients(recipe_id, recipe_update.ingredients)
+            ingredient_ids = {i.ingredient_id for i in recipe_update.ingredients}
 
+        await RecipeStatsRepository(self.session).apply(stat_deltas)
+        fields = index_fields(db_recipe)
         await self.session.commit()
-        await self.session.refresh(db_recipe)
+        recipe_indexes.recipe_saved(recipe_id, fields, ingredient_ids)
         return db_recipe
 
-    async def delete(self, recipe_id: int) -> bool:
-        result = await self.session.execute(select(Recipe).where(Recipe.id == recipe_id))
-        db_recipe = result.scalar_one_or_none()
-        if not db_recipe:
-            return False
+    async def _replace_allergens(
+        self, recipe_id: int, allergen_ids: List[int]
+    ) -> Tuple[set, set]:
+        result = await self.session.execute(
+            select(RecipeAllergen.allergen_id).where(RecipeAllergen.recipe_id == recipe_id)
+        )
+        existing = set(result.scalars().all())
+        wanted = set(allergen_ids)
+
+        removed = existing - wanted
+        if removed:
+            await self.session.execute(
+                delete(RecipeAllergen).where(
+                    RecipeAllergen.recipe_id == recipe_id,
+                    RecipeAllergen.allergen_id.in_(removed),
+                )
+            )
+        added = wanted - existing
+        if added:
+            await self.session.execute(
+                insert(RecipeAllergen),
+                [{"recipe_id": recipe_id, "allergen_id": a} for a in sorted(added)],
+            )
+        return added, removed
+
+    async def _replace_ingredients(
+        self, recipe_id: int, ingredients: List[RecipeIngredientInput]
+    ) -> None:
+        result = await self.session.execute(
+            select(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe_id)
+        )
+        # Existing rows grouped by ingredient, reused in order for matching inputs
+        existing = defaultdict(list)
+        for row in result.scalars().all():
+            existing[row.ingredient_id].append(row)
+        old_ids = set(existing)
+        new_ids = {item.ingredient_id for item in ingredients}
+
+        to_insert = []
+        to_update = []
+        for item in ingredients:
+            rows = existing.get(item.ingredient_id)
+            if not rows:
+                to_insert.append(
+                    {
+                        "recipe_id": recipe_id,
+                        "ingredient_id": item.ingredient_id,
+                        "quantity": item.quantity,
+                        "measurement": item.measurement,
+                    }
+                )
+                continue
+            row = rows.pop(0)
+            if row.quantity != item.quantity or row.measurement != item.measurement:
+                to_update.append(
+                    {"id": row.id, "quantity": item.quantity, "measurement": item.measurement}
+                )
+        to_delete = [row.id for rows in existing.values() for row in rows]
+
+        if to_delete:
+            await self.session.execute(
+                delete(RecipeIngredient).where(RecipeIngredient.id.in_(to_delete))
+            )
+        if to_update:
+            # Bulk UPDATE by primary key, one executemany
+            await self.session.execute(update(RecipeIngredient), to_update)
+        if to_insert:
+            await self.session.execute(insert(RecipeIngredient), to_insert)
+
+        usage_deltas = Counter(new_ids - old_ids)
+        usage_deltas.subtract(old_ids - new_ids)
+        await IngredientRepository(self.session).apply_usage_deltas(usage_deltas)
+        if new_ids != old_ids:
+            await self._log_ingredient_changes([recipe_id])
+
+    async def _log_ingredient_changes(self, recipe_ids: Iterable[int]) -> None:
+        rows = [{"recipe_id": recipe_id} for recipe_id in recipe_ids]
+        if rows:
+            await self.session.execute(insert(RecipeIngredientChange), rows)
+            await prune_changes(self.session)
+
+    async def delete(self, recipe_id: int, author_id: int | None = None) -> bool:
+        """
+        Delete a recipe together with its ingredient and allergen links.
+
+        When author_id is given, only a recipe owned by that author is deleted.
+        """
+        deleted_ids = await self.delete_many([recipe_id], author_id)
+        return bool(deleted_ids)
+
+    async def delete_many(
+        self, recipe_ids: List[int], author_id: int | None = None
+    ) -> List[int]:
+        """
+        Delete many recipes and their link rows in three set-based statements
+        within one transaction.
+
+        When author_id is given, recipes owned by other authors are left untouched.
+        Returns the ids that were actually deleted.
+        """
+        conditions = [Recipe.id.in_(recipe_ids)]
+        if author_id is not None:
+            conditions.append(Recipe.author_id == author_id)
+        owned_ids = select(Recipe.id).where(*conditions)
+
+        result = await self.session.execute(
+            delete(RecipeIngredient)
+            .where(RecipeIngredient.recipe_id.in_(owned_ids))
+            .returning(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+        )
+        links = set(result.all())
+        usage_deltas = Counter()
+        usage_deltas.subtract(ingredient_id for _, ingredient_id in links)
+        result = await self.session.execute(
+            delete(RecipeAllergen)
+            .where(RecipeAllergen.recipe_id.in_(owned_ids))
+            .returning(RecipeAllergen.allergen_id)
+        )
+        stat_deltas = Counter()
+        stat_deltas.subtract(
+            (RecipeStat.DIMENSION_ALLERGEN, a) for a in result.scalars().all()
+        )
+
+        result = await self.session.execute(
+            delete(Recipe)
+            .where(*conditions)
+            .returning(
+                Recipe.id, Recipe.cuisine_id, Recipe.difficulty, Recipe.cooking_time
+            )
+        )
+        deleted_ids = []
+        for row in result.all():
+            deleted_ids.append(row.id)
+            stat_deltas.subtract(
+                recipe_stat_keys(row.cuisine_id, row.difficulty, row.cooking_time)
+            )
+
+        await IngredientRepository(self.session).apply_usage_deltas(usage_deltas)
+        await RecipeStatsRepository(self.session).apply(stat_deltas)
+        await self._log_ingredient_changes(sorted({recipe_id for recipe_id, _ in links}))
+        await self.session.commit()
+        recipe_indexes.recipes_deleted(deleted_ids)
+        return deleted_ids
 
-        await self.session.delete(db_recipe)
+    async def rebuild_allergen_masks(self) -> None:
+        await self.session.execute(allergen_mask_rebuild_statement())
         await self.session.commit()
-        return True
 
     async def get_by_id(self, recipe_id: int) -> Recipe | None:
         result = await self.session.execute(select(Recipe).where(Recipe.id == recipe_id))
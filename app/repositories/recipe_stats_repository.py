@@ -0,0 +1,92 @@
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from models import Recipe, RecipeAllergen, RecipeStat
+
+StatKey = Tuple[str, int]
+
+
+def recipe_stat_keys(
+    cuisine_id: int | None,
+    difficulty: int,
+    cooking_time: int,
+    allergen_ids: Iterable[int] = (),
+) -> List[StatKey]:
+    """
+    Counters a single recipe contributes to.
+    """
+    keys = [
+        (RecipeStat.DIMENSION_CUISINE, cuisine_id or RecipeStat.NO_CUISINE),
+        (RecipeStat.DIMENSION_DIFFICULTY, difficulty),
+        (RecipeStat.DIMENSION_COOKING_TIME, cooking_time),
+    ]
+    keys.extend((RecipeStat.DIMENSION_ALLERGEN, a) for a in allergen_ids)
+    return keys
+
+
+def rebuild_statements() -> list:
+    """
+    Statements that recompute every counter from the recipes and link tables.
+    """
+    columns = [RecipeStat.dimension, RecipeStat.key, RecipeStat.count]
+    statements = [delete(RecipeStat)]
+    grouped = [
+        (
+            RecipeStat.DIMENSION_CUISINE,
+            func.coalesce(Recipe.cuisine_id, RecipeStat.NO_CUISINE),
+            Recipe,
+        ),
+        (RecipeStat.DIMENSION_DIFFICULTY, Recipe.difficulty, Recipe),
+        (RecipeStat.DIMENSION_COOKING_TIME, Recipe.cooking_time, Recipe),
+        (RecipeStat.DIMENSION_ALLERGEN, RecipeAllergen.allergen_id, RecipeAllergen),
+    ]
+    for dimension, key, source in grouped:
+        statements.append(
+            RecipeStat.__table__.insert().from_select(
+                columns,
+                select(literal(dimension), key, func.count())
+                .select_from(source)
+                .group_by(key),
+            )
+        )
+    return statements
+
+
+class RecipeStatsRepository:
+    """
+    Applies counter deltas inside the caller's transaction; never commits itself.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, deltas: Counter) -> None:
+        # Upserted in key order, so concurrent writers lock counter rows in the
+        # same order and cannot deadlock
+        rows = [
+            {"dimension": dimension, "key": key, "count": delta}
+            for (dimension, key), delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+
+        dialect_insert = (
+            postgresql.insert
+            if self.session.bind.dialect.name == "postgresql"
+            else sqlite.insert
+        )
+        stmt = dialect_insert(RecipeStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RecipeStat.dimension, RecipeStat.key],
+            set_={"count": RecipeStat.count + stmt.excluded.count},
+        )
+        await self.session.execute(stmt, rows)
+
+    async def rebuild(self) -> None:
+        for stmt in rebuild_statements():
+            await self.session.execute(stmt)
+        await self.session.commit()
@@ -7,6 +7,12 @@ __all__ = (
     "RecipeCreate",
     "RecipeUpdate",
     "RecipeResponse",
+    "RecipeBulkDelete",
+    "RecipeBulkDeleteResponse",
+    "RecipeBatchGet",
+    "RecipeBatchGetResponse",
+    "ShoppingListRequest",
+    "ShoppingListResponse",
     "CuisineBase",
     "CuisineCreate",
     "CuisineUpdate",
@@ -19,12 +25,32 @@ __all__ = (
     "IngredientCreate",
     "IngredientUpdate",
     "IngredientResponse",
+    "CatalogStatsResponse",
+    "RecipeFacets",
+    "FacetedPage",
+    "RecipeQueryPlanResponse",
+    "PantryMatchResponse",
+    "SimilarRecipeResponse",
+    "RecipeSearchResponse",
+    "BatchRequest",
+    "BatchResponse",
 )
 
 from .item import Item, Image
 from .filter_params import FilterParams
 from .form_data import FormData
-from .recipe import RecipeBase, RecipeCreate, RecipeUpdate, RecipeResponse
+from .recipe import (
+    RecipeBase,
+    RecipeCreate,
+    RecipeUpdate,
+    RecipeResponse,
+    RecipeBulkDelete,
+    RecipeBulkDeleteResponse,
+    RecipeBatchGet,
+    RecipeBatchGetResponse,
+    ShoppingListRequest,
+    ShoppingListResponse,
+)
 from .cuisine import CuisineBase, CuisineCreate, CuisineUpdate, CuisineResponse
 from .allergen import AllergenBase, AllergenCreate, AllergenUpdate, AllergenResponse
 from .ingredient import (
@@ -33,3 +59,10 @@ from .ingredient import (
     IngredientUpdate,
     IngredientResponse,
 )
+from .stats import CatalogStatsResponse
+from .facets import RecipeFacets, FacetedPage
+from .plan import RecipeQueryPlanResponse
+from .pantry import PantryMatchResponse
+from .similar import SimilarRecipeResponse
+from .search import RecipeSearchResponse
+from .batch import BatchRequest, BatchResponse
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Literal, Optional
+
+
+class BatchSubRequest(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    # Full path including the /api prefix and query string, e.g. "/api/recipes/1"
+    path: str = Field(..., pattern=r"^/")
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+from fastapi_pagination import Page
+
+from .stats import CountByEntity, CountByValue
+from .plan import RecipeQueryPlanResponse
+
+T = TypeVar("T")
+
+
+class CookingTimeBucket(BaseModel):
+    label: str
+    min: int
+    max: Optional[int]
+    count: int
+
+
+class RecipeFacets(BaseModel):
+    by_cuisine: List[CountByEntity] = []
+    by_difficulty: List[CountByValue] = []
+    by_cooking_time: List[CookingTimeBucket] = []
+    top_ingredients: List[CountByEntity] = []
+
+
+class FacetedPage(Page[T], Generic[T]):
+    # total and pages are None when the count was skipped (include_total=false)
+    total: Optional[int] = None
+    pages: Optional[int] = None
+    has_next: Optional[bool] = None
+    facets: Optional[RecipeFacets] = None
+    # Filter plan, only with explain=true
+    plan: Optional[RecipeQueryPlanResponse] = None
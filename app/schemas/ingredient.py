@@ -16,6 +16,7 @@ class IngredientUpdate(BaseModel):
 
 class IngredientResponse(IngredientBase):
     id: int
+    usage_count: int = 0
 
     class Config:
         from_attributes = True
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class PantryMatchResponse(BaseModel):
+    id: int
+    title: str
+    coverage: float
+    matched: int
+    missing: int
+    missing_ingredient_ids: List[int] = []
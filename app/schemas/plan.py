@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Literal, Optional
+
+
+class RecipeQueryPlanStep(BaseModel):
+    filter: str
+    params: Dict[str, Any]
+    estimated_rows: int
+    # recipe_stats, usage_count, search_index_whole_words or default
+    estimate_source: Optional[str] = None
+    # pushdown: ids materialized first and passed on as an IN list
+    strategy: Literal["pushdown", "filter", "columnar"]
+
+
+class RecipeQueryPlanResponse(BaseModel):
+    execution: Literal["sql", "columnar"]
+    total_recipes: int
+    steps: List[RecipeQueryPlanStep] = []
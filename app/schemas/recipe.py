@@ -36,6 +36,9 @@ class RecipeUpdate(BaseModel):
     description: Optional[str] = Field(None, min_length=1)
     cooking_time: Optional[int] = Field(None, gt=0)
     difficulty: Optional[int] = Field(None, ge=1, le=5)
+    # Full replacement lists, applied as a minimal diff against the stored rows
+    allergen_ids: Optional[List[int]] = None
+    ingredients: Optional[List[RecipeIngredientInput]] = None
 
 
 class CuisineInRecipe(BaseModel):
@@ -82,3 +85,41 @@ class RecipeResponse(RecipeBase):
 
     class Config:
         from_attributes = True
+
+
+class RecipeBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class RecipeBulkDeleteResponse(BaseModel):
+    deleted: List[int]
+    not_deleted: List[int]
+
+
+class RecipeBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class RecipeBatchGetResponse(BaseModel):
+    # In request order, without duplicates
+    items: List[RecipeResponse]
+    missing: List[int] = []
+
+
+class ShoppingListRequest(BaseModel):
+    # A recipe listed twice is cooked twice and counted twice
+    recipe_ids: List[int] = Field(..., min_length=1)
+
+
+class ShoppingListItem(BaseModel):
+    ingredient_id: int
+    name: str
+    measurement: int
+    unit: str
+    quantity: float
+    recipe_count: int
+
+
+class ShoppingListResponse(BaseModel):
+    items: List[ShoppingListItem]
+    not_found: List[int] = []
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class RecipeSearchResponse(BaseModel):
+    id: int
+    title: str
+    score: float
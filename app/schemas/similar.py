@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class SimilarRecipeResponse(BaseModel):
+    id: int
+    title: str
+    similarity: float
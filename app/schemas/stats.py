@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class CountByEntity(BaseModel):
+    id: Optional[int]
+    name: Optional[str]
+    count: int
+
+
+class CountByValue(BaseModel):
+    value: int
+    count: int
+
+
+class CookingTimePercentiles(BaseModel):
+    p50: Optional[int] = None
+    p90: Optional[int] = None
+    p95: Optional[int] = None
+    p99: Optional[int] = None
+
+
+class CatalogStatsResponse(BaseModel):
+    total_recipes: int
+    by_cuisine: List[CountByEntity] = []
+    by_allergen: List[CountByEntity] = []
+    by_difficulty: List[CountByValue] = []
+    cooking_time: CookingTimePercentiles
@@ -1,5 +1,15 @@
 __all__ = (
     "RecipeService",
+    "UploadService",
+    "StatsService",
+    "PantryService",
+    "SimilarityService",
+    "SearchService",
 )
 
 from .recipe_service import RecipeService
+from .upload_service import UploadService
+from .stats_service import StatsService
+from .pantry_service import PantryService
+from .similarity_service import SimilarityService
+from .search_service import SearchService
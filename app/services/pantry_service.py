@@ -0,0 +1,56 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from indexes import pantry_index
+from queries import RecipeQueries
+
+
+class PantryService:
+    """
+    "What can I cook" matching over the in-memory recipe x ingredient index.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.recipe_queries = RecipeQueries(session)
+
+    async def find_recipes(
+        self,
+        ingredient_ids: List[int],
+        limit: int = 20,
+        max_missing: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank recipes by the fraction of their ingredients present in the pantry.
+
+        Args:
+            ingredient_ids: Ingredient IDs the user has
+            limit: Maximum number of recipes to return
+            max_missing: Skip recipes missing more ingredients than this
+
+        Returns:
+            List of match dictionaries, best coverage first
+        """
+        await pantry_index.ensure_loaded(self.session)
+        matches = pantry_index.match(ingredient_ids, limit, max_missing)
+        if not matches:
+            return []
+
+        recipes = await self.recipe_queries.get_by_ids([m["recipe_id"] for m in matches])
+        titles = {recipe.id: recipe.title for recipe in recipes}
+
+        response = []
+        for match in matches:
+            # Recipe removed by another worker since the index was built
+            if match["recipe_id"] not in titles:
+                continue
+            response.append(
+                {
+                    "id": match["recipe_id"],
+                    "title": titles[match["recipe_id"]],
+                    "coverage": match["matched"] / match["total"],
+                    "matched": match["matched"],
+                    "missing": match["total"] - match["matched"],
+                    "missing_ingredient_ids": match["missing_ingredient_ids"],
+                }
+            )
+        return response
@@ -0,0 +1,203 @@
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import Recipe, RecipeStat
+from queries import RecipeQueries, IngredientQueries, RecipeStatsQueries
+from indexes import search_index
+from indexes.text import analyze
+from config import settings
+
+
+class RecipeFilter:
+    """
+    One conjunct of a recipe search: how to apply it and what it filters on.
+
+    name is one of NAME, INGREDIENT, ALLERGEN, COOKING_TIME, DIFFICULTY and
+    CUISINE; params holds the request values the estimate is based on.
+    """
+
+    NAME = "name"
+    INGREDIENT = "ingredient"
+    ALLERGEN = "allergen"
+    COOKING_TIME = "cooking_time"
+    DIFFICULTY = "difficulty"
+    CUISINE = "cuisine"
+
+    def __init__(self, name: str, params: Dict[str, Any], apply: Callable[[Any], Any]):
+        self.name = name
+        self.params = params
+        self.apply = apply
+        self.estimated_rows: Optional[int] = None
+        # Which statistics the estimate came from, shown by explain
+        self.estimate_source: Optional[str] = None
+
+
+class RecipeQueryPlan:
+    """
+    Filters in evaluation order, most selective first.
+
+    With pushdown, the first filter is run on its own and its recipe ids are
+    pushed into the main query as an IN list; the other filters then only
+    check those rows.
+    """
+
+    def __init__(self, filters: List[RecipeFilter], total_recipes: int, pushdown: bool):
+        self.filters = filters
+        self.total_recipes = total_recipes
+        self.pushdown = pushdown
+
+    def explain(self, execution: str) -> Dict[str, Any]:
+        steps = []
+        for index, recipe_filter in enumerate(self.filters):
+            if execution == "columnar":
+                strategy = "columnar"
+            elif index == 0 and self.pushdown:
+                strategy = "pushdown"
+            else:
+                strategy = "filter"
+            steps.append(
+                {
+                    "filter": recipe_filter.name,
+                    "params": recipe_filter.params,
+                    "estimated_rows": recipe_filter.estimated_rows,
+                    "estimate_source": recipe_filter.estimate_source,
+                    "strategy": strategy,
+                }
+            )
+        return {
+            "execution": execution,
+            "total_recipes": self.total_recipes,
+            "steps": steps,
+        }
+
+
+class RecipeFilterPlanner:
+    """
+    Estimates how many recipes each filter keeps and orders filters by it.
+
+    Estimates come from statistics that are already maintained on every write:
+    the recipe_stats counters for cuisines, difficulties, cooking times and
+    allergens, ingredients.usage_count for ingredients, and the title term
+    frequencies of the in-memory search index (when loaded) for name__like.
+    Filters are assumed to be independent.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.recipe_queries = RecipeQueries(session)
+        self.ingredient_queries = IngredientQueries(session)
+        self.stats_queries = RecipeStatsQueries(session)
+
+    async def plan(self, filters: List[RecipeFilter]) -> RecipeQueryPlan:
+        counts = await self.stats_queries.get_counts()
+        total = sum(counts.get(RecipeStat.DIMENSION_DIFFICULTY, {}).values())
+
+        ingredient_ids = [
+            i
+            for f in filters
+            if f.name == RecipeFilter.INGREDIENT
+            for i in f.params["ingredient_id"]
+        ]
+        usage = (
+            await self.ingredient_queries.get_usage_counts(ingredient_ids)
+            if ingredient_ids
+            else {}
+        )
+
+        for recipe_filter in filters:
+            estimate, source = self._estimate(recipe_filter, counts, usage, total)
+            recipe_filter.estimated_rows = min(max(estimate, 0), total)
+            recipe_filter.estimate_source = source
+
+        ordered = sorted(filters, key=lambda f: f.estimated_rows)
+        # Without statistics every estimate is 0 and says nothing
+        pushdown = (
+            total > 0
+            and len(ordered) > 1
+            and ordered[0].estimated_rows <= settings.planner.pushdown_max_rows
+        )
+        return RecipeQueryPlan(ordered, total, pushdown)
+
+    def _estimate(
+        self,
+        recipe_filter: RecipeFilter,
+        counts: Dict[str, Dict[int, int]],
+        usage: Dict[int, int],
+        total: int,
+    ) -> Tuple[int, str]:
+        params = recipe_filter.params
+        if recipe_filter.name == RecipeFilter.NAME:
+            return self._estimate_name(params["name__like"], total)
+
+        if recipe_filter.name == RecipeFilter.INGREDIENT:
+            ingredient_counts = [usage.get(i, 0) for i in set(params["ingredient_id"])]
+            if params["ingredient_match"] == "all":
+                return min(ingredient_counts), "usage_count"
+            return sum(ingredient_counts), "usage_count"
+
+        if recipe_filter.name == RecipeFilter.ALLERGEN:
+            if not total:
+                return 0, "recipe_stats"
+            by_allergen = counts.get(RecipeStat.DIMENSION_ALLERGEN, {})
+            kept = float(total)
+            for allergen_id in set(params["exclude_allergen_id"]):
+                kept *= 1 - by_allergen.get(allergen_id, 0) / total
+            return math.ceil(kept), "recipe_stats"
+
+        if recipe_filter.name == RecipeFilter.CUISINE:
+            by_cuisine = counts.get(RecipeStat.DIMENSION_CUISINE, {})
+            return sum(by_cuisine.get(c, 0) for c in set(params["cuisine_id"])), "recipe_stats"
+
+        dimension = {
+            RecipeFilter.COOKING_TIME: RecipeStat.DIMENSION_COOKING_TIME,
+            RecipeFilter.DIFFICULTY: RecipeStat.DIMENSION_DIFFICULTY,
+        }[recipe_filter.name]
+        low, high = params["min"], params["max"]
+        return (
+            sum(
+                count
+                for value, count in counts.get(dimension, {}).items()
+                if (low is None or value >= low) and (high is None or value <= high)
+            ),
+            "recipe_stats",
+        )
+
+    def _estimate_name(self, name_like: str, total: int) -> Tuple[int, str]:
+        """
+        The index only knows whole (stemmed) title words, so this assumes each
+        word of name__like is a whole word of the title. The LIKE also matches
+        inside longer words, which makes the estimate a lower bound; fragments
+        that are no title word at all get the default selectivity.
+        """
+        # A substring match of several words needs all of them in the title
+        terms = analyze(name_like)
+        if search_index.loaded and terms:
+            frequencies = [search_index.title_frequency(term) for term in terms]
+            if all(frequencies):
+                return min(frequencies), "search_index_whole_words"
+        return math.ceil(total * settings.planner.default_like_selectivity), "default"
+
+    async def build_query(self, query, plan: RecipeQueryPlan):
+        """
+        Apply the planned filters to a recipe query in plan order.
+
+        Pushdown is dropped when the first filter turns out to match more than
+        settings.planner.pushdown_max_rows recipes.
+        """
+        filters = plan.filters
+        if plan.pushdown:
+            # Statistics can be off; give up on the IN list if it would be long
+            limit = settings.planner.pushdown_max_rows
+            result = await self.session.scalars(
+                filters[0].apply(select(Recipe.id)).limit(limit + 1)
+            )
+            recipe_ids = list(result.all())
+            if len(recipe_ids) <= limit:
+                query = self.recipe_queries.apply_recipe_ids_filter(query, recipe_ids)
+                filters = filters[1:]
+            else:
+                plan.pushdown = False
+        for recipe_filter in filters:
+            query = recipe_filter.apply(query)
+        return query
@@ -1,10 +1,42 @@
+import asyncio
+from collections import Counter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional, Dict, Any
-from models import Recipe, Cuisine, Allergen, RecipeAllergen, RecipeIngredient, Ingredient, User
-from queries import RecipeQueries, IngredientQueries
-from schemas import RecipeResponse
+from sqlalchemy import select, literal
+from sqlalchemy.pool import QueuePool
+from typing import List, Literal, Optional, Dict, Any
+from models import (
+    Recipe,
+    Cuisine,
+    Allergen,
+    RecipeAllergen,
+    RecipeIngredient,
+    Ingredient,
+    User,
+    MeasurementEnum,
+)
+from queries import RecipeQueries, IngredientQueries, NameQueries, RecipeRelationQueries
+from schemas import RecipeResponse, RecipeFacets, RecipeQueryPlanResponse
+from config import settings
+from indexes import recipe_count_cache, recipe_table, RecipeTable
+from fastapi_pagination import Params
+from fastapi_pagination.api import create_page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate as apaginate
+from .recipe_filter_planner import RecipeFilter, RecipeFilterPlanner
+
+# Lower bounds (minutes) of the cooking time facet buckets; the last is open-ended
+COOKING_TIME_BUCKETS = [0, 15, 30, 60]
+
+
+class _PeekParams(Params):
+    """
+    Page params that skip COUNT(*) and fetch one extra row to detect a next page.
+    """
+
+    def to_raw_params(self):
+        raw_params = super().to_raw_params()
+        raw_params.include_total = False
+        raw_params.limit += 1
+        return raw_params
 
 
 class RecipeService:
@@ -17,12 +49,23 @@ class RecipeService:
         self.session = session
         self.recipe_queries = RecipeQueries(session)
         self.ingredient_queries = IngredientQueries(session)
+        self.name_queries = NameQueries(session)
 
     async def get_paginated_recipes(
         self,
         name__like: Optional[str] = None,
         ingredient_id: Optional[List[int]] = None,
         sort: Optional[str] = "-id",
+        exclude_allergen_id: Optional[List[int]] = None,
+        facets: bool = False,
+        include_total: bool = True,
+        ingredient_match: Literal["any", "all"] = "any",
+        cooking_time_min: Optional[int] = None,
+        cooking_time_max: Optional[int] = None,
+        difficulty_min: Optional[int] = None,
+        difficulty_max: Optional[int] = None,
+        cuisine_id: Optional[List[int]] = None,
+        explain: bool = False,
     ):
         """
         Get recipes with pagination, filtering, and sorting.
@@ -31,36 +74,338 @@ class RecipeService:
             name__like: Search recipes by name (title)
             ingredient_id: Filter by ingredient IDs
             sort: Sort field (use '-' prefix for descending)
+            exclude_allergen_id: Only return recipes free of these allergens
+            facets: Also count cuisines, difficulties, cooking time buckets and
+                top ingredients over the whole filtered result set
+            include_total: Count all matches; when False, total and pages are
+                None and has_next tells whether another page exists
+            ingredient_match: "any" keeps recipes with at least one of the
+                ingredients, "all" only recipes that use every one of them
+            cooking_time_min, cooking_time_max: Inclusive cooking time range
+            difficulty_min, difficulty_max: Inclusive difficulty range
+            cuisine_id: Only recipes of these cuisines
+            explain: Attach the filter plan (order, estimates, strategy) as
+                the page's plan
+
+        When only the range, cuisine and allergen filters are used and the sort
+        field is a column of the in-memory recipe table, matching and ordering
+        happen in memory and only the page's recipes are read from the database.
+        Combined filters are ordered by estimated selectivity, see
+        RecipeFilterPlanner.
         
         Returns:
             Paginated result with recipe responses
         """
-        query = self.recipe_queries.build_base_query()
-
-        # Apply text search filter
-        if name__like:
-            query = self.recipe_queries.apply_name_filter(query, name__like)
+        filters = self._recipe_filters(
+            name__like,
+            ingredient_id,
+            ingredient_match,
+            exclude_allergen_id,
+            cooking_time_min,
+            cooking_time_max,
+            difficulty_min,
+            difficulty_max,
+            cuisine_id,
+        )
+        planner = RecipeFilterPlanner(self.session)
+        plan = None
+        use_planner = settings.planner.enabled and len(filters) > 1
+
+        base_query = self.recipe_queries.build_base_query()
+        columnar_filters = (
+            cooking_time_min,
+            cooking_time_max,
+            difficulty_min,
+            difficulty_max,
+            cuisine_id,
+        )
+        if (
+            settings.indexes.columnar_filters
+            and any(f is not None for f in columnar_filters)
+            and not name__like
+            and not ingredient_id
+            and (sort or "id").lstrip("-") in RecipeTable.SORT_COLUMNS
+            and all(Recipe.allergen_mask_for([a]) for a in exclude_allergen_id or ())
+        ):
+            if explain or use_planner:
+                plan = await planner.plan(filters)
+                filters = plan.filters
+            query = base_query
+            for recipe_filter in filters:
+                query = recipe_filter.apply(query)
+            page = await self._paginate_columnar(
+                query,
+                sort or "id",
+                include_total,
+                facets,
+                cooking_time=(cooking_time_min, cooking_time_max),
+                difficulty=(difficulty_min, difficulty_max),
+                cuisine_ids=cuisine_id or None,
+                exclude_allergen_mask=Recipe.allergen_mask_for(exclude_allergen_id or ()),
+                order=[f.name for f in filters],
+            )
+            if page is not None:
+                if explain:
+                    page.plan = RecipeQueryPlanResponse(**plan.explain("columnar"))
+                return page
+
+        query = base_query
+        for recipe_filter in filters:
+            query = recipe_filter.apply(query)
+
+        # Totals are cached per filter, independent of sorting; name__like is
+        # keyed as given since LIKE case folding depends on the database
+        total = None
+        if include_total:
+            count_key = (
+                name__like or "",
+                tuple(sorted(set(ingredient_id or ()))),
+                ingredient_match,
+                tuple(sorted(set(exclude_allergen_id or ()))),
+                (cooking_time_min, cooking_time_max, difficulty_min, difficulty_max),
+                tuple(sorted(set(cuisine_id or ()))),
+            )
+            total = recipe_count_cache.get(count_key)
+
+        # Planning costs a statistics query and pushdown another round trip;
+        # both only pay off when the matches still have to be counted
+        if explain or (use_planner and total is None):
+            plan = await planner.plan(filters)
+            if total is None:
+                query = await planner.build_query(base_query, plan)
+            else:
+                plan.pushdown = False
 
-        # Apply ingredient filter
-        if ingredient_id:
-            recipe_ids = await self.recipe_queries.get_recipe_ids_by_ingredient_ids(ingredient_id)
-            query = self.recipe_queries.apply_recipe_ids_filter(query, recipe_ids)
+        count_query = None
+        if include_total:
+            if total is None:
+                generation = recipe_count_cache.generation
+                total = await self.recipe_queries.count(query)
+                recipe_count_cache.put(count_key, total, generation)
+            count_query = select(literal(total))
 
         # Apply sorting
         if sort:
             query = self.recipe_queries.apply_sorting(query, sort)
 
+        params = None
+        has_next = None
+        if not include_total:
+            current = resolve_params()
+            params = _PeekParams(page=current.page, size=current.size)
+
         # Build transformer for pagination
         async def transformer(items):
-            recipes_with_details = []
-            for recipe in items:
-                recipe_response = await self.build_recipe_response(recipe)
-                recipes_with_details.append(RecipeResponse(**recipe_response))
-            return recipes_with_details
+            nonlocal has_next
+            if params is not None:
+                has_next = len(items) > params.size
+                items = items[: params.size]
+            return [
+                RecipeResponse(**recipe_response)
+                for recipe_response in await self.build_recipe_responses(items)
+            ]
 
-        paginated_result = await apaginate(self.session, query, transformer=transformer)
+        paginated_result = await apaginate(
+            self.session,
+            query,
+            params=params,
+            count_query=count_query,
+            transformer=transformer,
+        )
+        if params is not None:
+            paginated_result.has_next = has_next
+        if facets:
+            paginated_result.facets = RecipeFacets(**await self.get_facets(query))
+        if explain:
+            paginated_result.plan = RecipeQueryPlanResponse(**plan.explain("sql"))
         return paginated_result
 
+    def _recipe_filters(
+        self,
+        name__like: Optional[str],
+        ingredient_id: Optional[List[int]],
+        ingredient_match: str,
+        exclude_allergen_id: Optional[List[int]],
+        cooking_time_min: Optional[int],
+        cooking_time_max: Optional[int],
+        difficulty_min: Optional[int],
+        difficulty_max: Optional[int],
+        cuisine_id: Optional[List[int]],
+    ) -> List[RecipeFilter]:
+        queries = self.recipe_queries
+        filters = []
+        if name__like:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.NAME,
+                    {"name__like": name__like},
+                    lambda q: queries.apply_name_filter(q, name__like),
+                )
+            )
+        if ingredient_id:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.INGREDIENT,
+                    {"ingredient_id": ingredient_id, "ingredient_match": ingredient_match},
+                    lambda q: queries.apply_ingredient_filter(
+                        q, ingredient_id, match_all=ingredient_match == "all"
+                    ),
+                )
+            )
+        if exclude_allergen_id:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.ALLERGEN,
+                    {"exclude_allergen_id": exclude_allergen_id},
+                    lambda q: queries.apply_allergen_exclusion(q, exclude_allergen_id),
+                )
+            )
+        if cooking_time_min is not None or cooking_time_max is not None:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.COOKING_TIME,
+                    {"min": cooking_time_min, "max": cooking_time_max},
+                    lambda q: queries.apply_range_filter(
+                        q, Recipe.cooking_time, cooking_time_min, cooking_time_max
+                    ),
+                )
+            )
+        if difficulty_min is not None or difficulty_max is not None:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.DIFFICULTY,
+                    {"min": difficulty_min, "max": difficulty_max},
+                    lambda q: queries.apply_range_filter(
+                        q, Recipe.difficulty, difficulty_min, difficulty_max
+                    ),
+                )
+            )
+        if cuisine_id:
+            filters.append(
+                RecipeFilter(
+                    RecipeFilter.CUISINE,
+                    {"cuisine_id": cuisine_id},
+                    lambda q: queries.apply_cuisine_filter(q, cuisine_id),
+                )
+            )
+        return filters
+
+    async def _paginate_columnar(
+        self, query, sort: str, include_total: bool, facets: bool, **filters
+    ):
+        """
+        Page through the in-memory recipe table and hydrate only the page.
+
+        query carries the same filters in SQL and is applied to the page's ids.
+        If that drops any of them, another worker changed those recipes since
+        the table was built, so the table's total and page are wrong too: the
+        table is marked stale and None is returned, so the caller answers
+        this request from SQL.
+        """
+        await recipe_table.ensure_loaded(self.session)
+        rows = recipe_table.filter(**filters)
+        params = resolve_params()
+        raw = params.to_raw_params().as_limit_offset()
+        page_ids = recipe_table.page(rows, sort, raw.offset or 0, raw.limit or len(rows))
+
+        items = []
+        if page_ids:
+            result = await self.session.execute(query.where(Recipe.id.in_(page_ids)))
+            recipes = {recipe.id: recipe for recipe in result.scalars().all()}
+            if len(recipes) < len(page_ids):
+                recipe_table.mark_stale()
+                return None
+            items = [
+                RecipeResponse(**recipe_response)
+                for recipe_response in await self.build_recipe_responses(
+                    [recipes[recipe_id] for recipe_id in page_ids]
+                )
+            ]
+
+        page = create_page(items, total=len(rows) if include_total else None, params=params)
+        if not include_total:
+            page.has_next = (raw.offset or 0) + len(page_ids) < len(rows)
+        if facets:
+            page.facets = RecipeFacets(**await self.get_facets(query))
+        return page
+
+    async def get_facets(self, query) -> dict:
+        """
+        Facet counts for a filtered recipe query, counted by the database.
+        """
+        counts = await self.recipe_queries.get_facet_counts(
+            query, COOKING_TIME_BUCKETS, settings.limits.facet_top_ingredients
+        )
+        cuisines = counts["cuisine"]
+        difficulties = counts["difficulty"]
+        cooking_times = counts["cooking_time"]
+        top_ingredients = list(counts["ingredient"].items())
+        cuisine_names = await self.name_queries.get_names(Cuisine, cuisines.keys())
+        ingredient_names = await self.name_queries.get_names(
+            Ingredient, [i for i, _ in top_ingredients]
+        )
+
+        buckets = []
+        upper_bounds = COOKING_TIME_BUCKETS[1:] + [None]
+        for index, (lower, upper) in enumerate(zip(COOKING_TIME_BUCKETS, upper_bounds)):
+            buckets.append(
+                {
+                    "label": f"{lower}-{upper}" if upper is not None else f"{lower}+",
+                    "min": lower,
+                    "max": upper,
+                    "count": cooking_times.get(index, 0),
+                }
+            )
+
+        return {
+            "by_cuisine": [
+                {"id": key, "name": cuisine_names.get(key), "count": count}
+                for key, count in sorted(
+                    cuisines.items(), key=lambda kv: (-kv[1], kv[0] or 0)
+                )
+            ],
+            "by_difficulty": [
+                {"value": key, "count": count} for key, count in sorted(difficulties.items())
+            ],
+            "by_cooking_time": buckets,
+            "top_ingredients": [
+                {"id": key, "name": ingredient_names.get(key), "count": count}
+                for key, count in top_ingredients
+            ],
+        }
+
+    async def get_shopping_list(self, recipe_ids: List[int]) -> Dict[str, Any]:
+        """
+        Aggregate the ingredients of many recipes into one shopping list.
+
+        Args:
+            recipe_ids: Recipes to cook; a repeated id counts once per occurrence
+
+        Returns:
+            Totals per ingredient and measurement unit, plus unknown recipe ids
+        """
+        servings = Counter(recipe_ids)
+        existing = set(await self.recipe_queries.get_existing_ids(list(servings)))
+        not_found = [recipe_id for recipe_id in servings if recipe_id not in existing]
+
+        items = []
+        if existing:
+            rows = await self.recipe_queries.get_ingredient_totals(
+                {recipe_id: servings[recipe_id] for recipe_id in existing}
+            )
+            items = [
+                {
+                    "ingredient_id": row.ingredient_id,
+                    "name": row.name,
+                    "measurement": row.measurement,
+                    "unit": MeasurementEnum(row.measurement).label,
+                    "quantity": row.quantity,
+                    "recipe_count": row.recipe_count,
+                }
+                for row in rows
+            ]
+        return {"items": items, "not_found": not_found}
+
     async def get_recipes_by_ingredient(
         self,
         ingredient_id: int,
@@ -105,11 +450,21 @@ class RecipeService:
         if select_fields:
             selected_fields = [f.strip() for f in select_fields.split(",")]
 
+        related = await self.load_relations(recipes, includes) if includes else {}
+
         # Build response
         response = []
         for recipe in recipes:
             if includes:
-                recipe_dict = await self.build_recipe_response_selective(recipe, includes)
+                recipe_dict = {
+                    "id": recipe.id,
+                    "title": recipe.title,
+                    "difficulty": recipe.difficulty,
+                    "description": recipe.description,
+                    "cooking_time": recipe.cooking_time,
+                }
+                for name, values in related.items():
+                    recipe_dict[name] = values[recipe.id]
             else:
                 recipe_dict = {
                     "id": recipe.id,
@@ -127,6 +482,96 @@ class RecipeService:
 
         return response
 
+    async def get_recipes_by_ids(self, recipe_ids: List[int]) -> Dict[str, Any]:
+        """
+        Fetch many recipes with all nested entities in a constant number of queries.
+
+        Args:
+            recipe_ids: Recipe IDs; duplicates are returned once
+
+        Returns:
+            Recipe responses in request order, plus the ids that do not exist
+        """
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        recipes = {r.id: r for r in await self.recipe_queries.get_by_ids(recipe_ids)}
+        ordered = [recipes[recipe_id] for recipe_id in recipe_ids if recipe_id in recipes]
+        items = await self.build_recipe_responses(ordered)
+        missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in recipes]
+        return {"items": items, "missing": missing}
+
+    async def build_recipe_responses(self, recipes: List[Recipe]) -> List[dict]:
+        """
+        Build the full response body of many recipes, in order, with the nested
+        entities loaded by load_relations instead of four queries per recipe.
+        """
+        if not recipes:
+            return []
+        related = await self.load_relations(
+            recipes, ["cuisine", "author", "allergens", "ingredients"]
+        )
+        return [
+            {
+                "id": recipe.id,
+                "title": recipe.title,
+                "description": recipe.description,
+                "cooking_time": recipe.cooking_time,
+                "difficulty": recipe.difficulty,
+                "cuisine": related["cuisine"][recipe.id],
+                "author": related["author"][recipe.id],
+                "allergens": related["allergens"][recipe.id],
+                "ingredients": related["ingredients"][recipe.id],
+            }
+            for recipe in recipes
+        ]
+
+    async def load_relations(
+        self, recipes: List[Recipe], includes: List[str]
+    ) -> Dict[str, Dict[int, Any]]:
+        """
+        Load the included relations for a batch of recipes, one query per relation.
+
+        The queries are independent, so when the connection pool has room they
+        run concurrently, each on its own session; otherwise they run one after
+        another on this request's session.
+
+        Returns:
+            {relation: {recipe_id: value}} for each included relation
+        """
+        loaders = {
+            "cuisine": RecipeRelationQueries.get_cuisines,
+            "author": RecipeRelationQueries.get_authors,
+            "allergens": RecipeRelationQueries.get_allergens,
+            "ingredients": RecipeRelationQueries.get_ingredients,
+        }
+        names = [name for name in loaders if name in includes]
+        if not names:
+            return {}
+
+        workers = self._parallel_load_slots(len(names))
+        if workers <= 1:
+            queries = RecipeRelationQueries(self.session)
+            return {name: await loaders[name](queries, recipes) for name in names}
+
+        semaphore = asyncio.Semaphore(workers)
+
+        async def run(name: str):
+            async with semaphore:
+                async with AsyncSession(self.session.bind) as session:
+                    return await loaders[name](RecipeRelationQueries(session), recipes)
+
+        results = await asyncio.gather(*(run(name) for name in names))
+        return dict(zip(names, results))
+
+    def _parallel_load_slots(self, wanted: int) -> int:
+        # Sequential unless the pool can hand out extra connections right now
+        config = settings.db
+        pool = getattr(self.session.bind, "pool", None)
+        if not config.parallel_loads or wanted <= 1 or not isinstance(pool, QueuePool):
+            return 1
+        idle = pool.size() - pool.checkedout()
+        free = idle - config.parallel_loads_reserved_connections
+        return max(1, min(wanted, config.parallel_loads_max_concurrency, free))
+
     async def build_recipe_response(self, recipe: Recipe) -> dict:
         """
         Build response body for recipe with nested cuisine, allergens and ingredients.
@@ -196,79 +641,3 @@ class RecipeService:
             "allergens": [{"id": a.id, "name": a.name} for a in allergens],
             "ingredients": ingredients,
         }
-
-    async def build_recipe_response_selective(self, recipe: Recipe, includes: List[str]) -> dict:
-        """
-        Build response body for recipe with selective nested entities.
-        """
-        recipe_dict = {
-            "id": recipe.id,
-            "title": recipe.title,
-            "difficulty": recipe.difficulty,
-            "description": recipe.description,
-            "cooking_time": recipe.cooking_time,
-        }
-
-        if "cuisine" in includes:
-            cuisine = None
-            if recipe.cuisine_id:
-                cuisine_result = await self.session.execute(
-                    select(Cuisine).where(Cuisine.id == recipe.cuisine_id)
-                )
-                cuisine = cuisine_result.scalar_one_or_none()
-            recipe_dict["cuisine"] = {"id": cuisine.id, "name": cuisine.name} if cuisine else None
-
-        if "author" in includes:
-            author_result = await self.session.execute(
-                select(User).where(User.id == recipe.author_id)
-            )
-            author = author_result.scalar_one_or_none()
-            recipe_dict["author"] = {
-                "id": author.id,
-                "first_name": author.first_name,
-                "last_name": author.last_name,
-            } if author else None
-
-        if "allergens" in includes:
-            allergen_links_result = await self.session.execute(
-                select(RecipeAllergen).where(RecipeAllergen.recipe_id == recipe.id)
-            )
-            allergen_links = allergen_links_result.scalars().all()
-            allergen_ids = [link.allergen_id for link in allergen_links]
-
-            allergens = []
-            if allergen_ids:
-                allergens_result = await self.session.execute(
-                    select(Allergen).where(Allergen.id.in_(allergen_ids))
-                )
-                allergens = allergens_result.scalars().all()
-
-            recipe_dict["allergens"] = [{"id": a.id, "name": a.name} for a in allergens]
-
-        if "ingredients" in includes:
-            recipe_ingredients_result = await self.session.execute(
-                select(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe.id)
-            )
-            recipe_ingredients = recipe_ingredients_result.scalars().all()
-
-            ingredient_ids = [ri.ingredient_id for ri in recipe_ingredients]
-            ingredients_dict = {}
-            if ingredient_ids:
-                ingredients_result = await self.session.execute(
-                    select(Ingredient).where(Ingredient.id.in_(ingredient_ids))
-                )
-                ingredients_list = ingredients_result.scalars().all()
-                ingredients_dict = {ing.id: ing.name for ing in ingredients_list}
-
-            ingredients = [
-                {
-                    "id": ri.ingredient_id,
-                    "name": ingredients_dict.get(ri.ingredient_id, ""),
-                    "quantity": ri.quantity,
-                    "measurement": ri.measurement,
-                }
-                for ri in recipe_ingredients
-            ]
-            recipe_dict["ingredients"] = ingredients
-
-        return recipe_dict
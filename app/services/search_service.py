@@ -0,0 +1,59 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
+from config import settings
+from indexes import search_index
+from indexes.text import tokenize
+from queries import RecipeQueries, RecipeSearchQueries
+
+
+class SearchService:
+    """
+    Ranked full-text search over recipe titles and descriptions.
+
+    Uses the database's full-text index when there is one (see
+    settings.search.backend) and the in-memory inverted index otherwise.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.recipe_queries = RecipeQueries(session)
+        self.search_queries = RecipeSearchQueries(session)
+
+    async def uses_database(self) -> bool:
+        backend = settings.search.backend
+        if backend == "auto":
+            return await self.search_queries.index_available()
+        return backend == "database"
+
+    async def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Recipes matching any word of the query, most relevant first.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of recipes to return
+
+        Returns:
+            List of dictionaries with id, title and score
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        if await self.uses_database():
+            rows = await self.search_queries.search(terms, limit)
+            return [{"id": id, "title": title, "score": score} for id, title, score in rows]
+
+        await search_index.ensure_loaded(self.session)
+        hits = search_index.search(query, limit)
+        if not hits:
+            return []
+
+        recipes = await self.recipe_queries.get_by_ids([recipe_id for recipe_id, _ in hits])
+        titles = {recipe.id: recipe.title for recipe in recipes}
+        return [
+            {"id": recipe_id, "title": titles[recipe_id], "score": score}
+            for recipe_id, score in hits
+            # Recipe removed by another worker since the index was built
+            if recipe_id in titles
+        ]
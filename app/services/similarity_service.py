@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
+from indexes import similarity_index
+from queries import RecipeQueries
+
+
+class SimilarityService:
+    """
+    Similar-recipe recommendations from the in-memory MinHash index.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.recipe_queries = RecipeQueries(session)
+
+    async def get_similar_recipes(
+        self, recipe_id: int, limit: int = 10, min_similarity: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Recipes whose ingredient sets are most similar to the given recipe's.
+
+        Raises:
+            ValueError: If recipe not found
+        """
+        recipe = await self.recipe_queries.get_by_id(recipe_id)
+        if not recipe:
+            raise ValueError("Recipe not found")
+
+        await similarity_index.ensure_loaded(self.session)
+        similar = similarity_index.similar(recipe_id, limit, min_similarity)
+        if not similar:
+            return []
+
+        recipes = await self.recipe_queries.get_by_ids([other for other, _ in similar])
+        titles = {r.id: r.title for r in recipes}
+        return [
+            {"id": other, "title": titles[other], "similarity": similarity}
+            for other, similarity in similar
+            if other in titles
+        ]
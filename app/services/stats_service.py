@@ -0,0 +1,71 @@
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from models import Cuisine, Allergen, RecipeStat
+from queries import NameQueries
+from queries.recipe_stats_queries import RecipeStatsQueries
+
+
+def histogram_percentile(histogram: Dict[int, int], percentile: float) -> Optional[int]:
+    """
+    Nearest-rank percentile of values given as {value: count}.
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = max(math.ceil(percentile / 100 * total), 1)
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+    return None
+
+
+def _most_common(counts: Dict[int, int]) -> List[tuple]:
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+class StatsService:
+    """
+    Catalog statistics read from the incrementally maintained recipe_stats counters.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.stats_queries = RecipeStatsQueries(session)
+        self.name_queries = NameQueries(session)
+
+    async def get_catalog_stats(self) -> dict:
+        counts = await self.stats_queries.get_counts()
+        by_cuisine = counts.get(RecipeStat.DIMENSION_CUISINE, {})
+        by_allergen = counts.get(RecipeStat.DIMENSION_ALLERGEN, {})
+        by_difficulty = counts.get(RecipeStat.DIMENSION_DIFFICULTY, {})
+        cooking_times = counts.get(RecipeStat.DIMENSION_COOKING_TIME, {})
+
+        cuisine_names = await self.name_queries.get_names(
+            Cuisine, [i for i in by_cuisine if i != RecipeStat.NO_CUISINE]
+        )
+        allergen_names = await self.name_queries.get_names(Allergen, by_allergen.keys())
+
+        return {
+            "total_recipes": sum(by_difficulty.values()),
+            "by_cuisine": [
+                {
+                    "id": None if key == RecipeStat.NO_CUISINE else key,
+                    "name": cuisine_names.get(key),
+                    "count": count,
+                }
+                for key, count in _most_common(by_cuisine)
+            ],
+            "by_allergen": [
+                {"id": key, "name": allergen_names.get(key), "count": count}
+                for key, count in _most_common(by_allergen)
+            ],
+            "by_difficulty": [
+                {"value": key, "count": count} for key, count in sorted(by_difficulty.items())
+            ],
+            "cooking_time": {
+                f"p{p}": histogram_percentile(cooking_times, p) for p in (50, 90, 95, 99)
+            },
+        }
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, Mapping, Optional
+
+import python_multipart
+from fastapi import UploadFile
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# Magic bytes of the accepted image formats and the extension stored on disk
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+)
+
+# Enough bytes to recognise every signature above, including RIFF....WEBP
+SNIFF_SIZE = 12
+
+INDEX_FILENAME = ".index.jsonl"
+
+# Room for boundaries, part headers and small form fields around the file
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+class InvalidImageFormat(ValueError):
+    pass
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class MalformedUpload(ValueError):
+    pass
+
+
+def detect_image_format(header: bytes) -> Optional[str]:
+    """
+    Detect the image format from the first bytes of a file.
+    """
+    for signature, ext in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return ext
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def blob_path(digest: str, ext: str) -> str:
+    """
+    Sharded location of a blob inside the upload directory: ab/cd/<sha256>.<ext>
+    """
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def _write_chunk(tmp, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    tmp.write(chunk)
+
+
+class MultipartFileStream:
+    """
+    The bytes of one file field of a multipart/form-data body, parsed from the
+    request stream as it arrives.
+
+    The body is counted while it is read and abandoned once it exceeds
+    max_body; a Content-Length over max_body is refused before reading. So an
+    oversized upload is never received or buffered in full.
+
+    Raises:
+        UploadTooLarge: If the body is larger than max_body
+        MalformedUpload: If the body is not multipart/form-data or lacks the field
+    """
+
+    def __init__(
+        self,
+        headers: Mapping[str, str],
+        stream: AsyncIterator[bytes],
+        field_name: str,
+        max_body: int,
+    ):
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise MalformedUpload("Expected a multipart/form-data body")
+        content_length = headers.get("content-length")
+        if content_length is not None:
+            try:
+                length = int(content_length)
+            except ValueError:
+                raise MalformedUpload("Invalid Content-Length header")
+            if length > max_body:
+                raise UploadTooLarge(f"Request body exceeds {max_body} bytes")
+        self._boundary = options[b"boundary"]
+        self._stream = stream
+        self._field_name = field_name.encode()
+        self._max_body = max_body
+        self._found = False
+        self._in_field = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._pending: list[bytes] = []
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        # Only the first part with the field name is read
+        self._in_field = not self._found and options.get(b"name") == self._field_name
+        self._found = self._found or self._in_field
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field and end > start:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        parser = python_multipart.MultipartParser(
+            self._boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+        received = 0
+        try:
+            async for chunk in self._stream:
+                received += len(chunk)
+                if received > self._max_body:
+                    raise UploadTooLarge(f"Request body exceeds {self._max_body} bytes")
+                parser.write(chunk)
+                pending, self._pending = self._pending, []
+                for data in pending:
+                    yield data
+            parser.finalize()
+        except MultipartParseError as e:
+            raise MalformedUpload(str(e))
+        if not self._found:
+            raise MalformedUpload(f"Missing file field '{self._field_name.decode()}'")
+
+
+class UploadIndex:
+    """
+    Append-only index of stored blobs, keyed by the path returned to clients.
+
+    Every line of the index file is one JSON record. Appends are single small
+    writes in O_APPEND mode, so several workers can share the same file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            entries = {}
+            if self.path.exists():
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            entries[entry["path"]] = entry
+            self._entries = entries
+        return self._entries
+
+    def get(self, path: str) -> Optional[dict]:
+        return self._load().get(path)
+
+    def add(self, entry: dict) -> None:
+        entries = self._load()
+        if entry["path"] in entries:
+            return
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        entries[entry["path"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+class UploadService:
+    """
+    Streams uploaded images to disk chunk by chunk without blocking the event loop.
+
+    With content_addressed enabled, files are stored once per distinct content
+    under a sharded sha256 path; otherwise every upload gets a new uuid name.
+    """
+
+    def __init__(
+        self,
+        upload_dir: Path,
+        max_size: int,
+        chunk_size: int,
+        content_addressed: bool = True,
+    ):
+        self.upload_dir = upload_dir
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.content_addressed = content_addressed
+        self.index = UploadIndex(upload_dir / INDEX_FILENAME)
+
+    async def save_image(self, file: UploadFile) -> str:
+        """
+        Save an uploaded image and return its path relative to upload_dir.
+
+        See save_image_stream.
+        """
+        if file.size is not None and file.size > self.max_size:
+            raise UploadTooLarge(f"File exceeds {self.max_size} bytes")
+
+        async def chunks() -> AsyncIterator[bytes]:
+            while chunk := await file.read(self.chunk_size):
+                yield chunk
+
+        return await self.save_image_stream(chunks())
+
+    async def save_image_stream(self, chunks: AsyncIterable[bytes]) -> str:
+        """
+        Save an image arriving as a stream of chunks and return its path
+        relative to upload_dir.
+
+        The data is written to a temporary file next to the target and renamed
+        into place only after the whole upload has been validated. If a blob
+        with the same content already exists, the temporary file is dropped.
+
+        Raises:
+            UploadTooLarge: If the upload exceeds max_size
+            InvalidImageFormat: If the content is not PNG, JPEG or WEBP
+        """
+        fd, tmp_name = await run_in_threadpool(
+            tempfile.mkstemp, dir=self.upload_dir, prefix=".upload-", suffix=".part"
+        )
+        tmp_path = Path(tmp_name)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                ext, size = await self._stream_to(chunks, tmp, digest)
+            if self.content_addressed:
+                path = blob_path(digest.hexdigest(), ext)
+            else:
+                path = f"{uuid.uuid4()}.{ext}"
+            stored = await run_in_threadpool(self._store, tmp_path, path)
+        except BaseException:
+            await run_in_threadpool(tmp_path.unlink, missing_ok=True)
+            raise
+
+        if stored and self.content_addressed:
+            await run_in_threadpool(
+                self.index.add,
+                {
+                    "path": path,
+                    "sha256": digest.hexdigest(),
+                    "format": ext,
+                    "size": size,
+                },
+            )
+        return path
+
+    def _store(self, tmp_path: Path, path: str) -> bool:
+        """
+        Move a finished temporary file to its final path.
+
+        Returns False when the blob already existed and nothing was written.
+        """
+        target = self.upload_dir / path
+        if self.content_addressed and target.exists():
+            tmp_path.unlink()
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+        return True
+
+    async def _stream_to(self, chunks: AsyncIterable[bytes], tmp, digest) -> tuple[str, int]:
+        ext = None
+        header = b""
+        written = 0
+        async for chunk in chunks:
+            if ext is None:
+                # Chunks can be shorter than the signatures
+                header += chunk
+                if len(header) < SNIFF_SIZE:
+                    continue
+                ext, chunk = self._sniff(header), header
+            written += len(chunk)
+            if written > self.max_size:
+                raise UploadTooLarge(f"File exceeds {self.max_size} bytes")
+            await run_in_threadpool(_write_chunk, tmp, digest, chunk)
+        if ext is None:
+            ext, written = self._sniff(header), len(header)
+            await run_in_threadpool(_write_chunk, tmp, digest, header)
+        return ext, written
+
+    @staticmethod
+    def _sniff(header: bytes) -> str:
+        ext = detect_image_format(header)
+        if ext is None:
+            raise InvalidImageFormat("Invalid file format. Allowed: PNG, JPG, JPEG, WEBP")
+        return ext
@@ -0,0 +1,41 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Collects how long each worker boot phase took (imports, app construction, lifespan).
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        # Reserve the slot so nested phases are reported after their parent
+        self.phases.setdefault(name, 0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> str:
+        total = sum(v for k, v in self.phases.items() if "." not in k)
+        lines = [f"Startup took {total * 1000:.1f} ms"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<28} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def log_report(self) -> None:
+        log.warning(self.report())
+
+
+startup_timer = StartupTimer()
@@ -21,6 +21,7 @@ from models.ingredient import Ingredient
 from models.recipe_allergen import RecipeAllergen
 from models.recipe_ingredient import RecipeIngredient
 from models.users import User
+from indexes import recipe_indexes
 
 
 # Use in-memory SQLite for testing
@@ -34,6 +35,14 @@ def event_loop_policy():
     return asyncio.DefaultEventLoopPolicy()
 
 
+@pytest.fixture(autouse=True)
+def reset_recipe_indexes():
+    """Start every test with empty in-memory recipe indexes."""
+    recipe_indexes.reset()
+    yield
+    recipe_indexes.reset()
+
+
 @pytest_asyncio.fixture
 async def engine():
     """Create async engine for testing."""
@@ -0,0 +1,103 @@
+"""
+Tests for the app factory and the cached OpenAPI document.
+"""
+
+import json
+import subprocess
+
+import pytest
+from fastapi import FastAPI, Query
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api import build_router
+from api import openapi_cache
+from api.openapi_cache import install_openapi_cache
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'app')
+
+
+def make_app(description: str = "List items", status_code: int = 200) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items", description=description, status_code=status_code)
+    async def list_items(limit: int = Query(10, le=100)):
+        return []
+
+    return app
+
+
+class TestCreateApp:
+    """Tests for create_app function."""
+
+    def test_imports_only_enabled_routers(self):
+        """Test that disabled router modules are never imported."""
+        script = (
+            "import sys\n"
+            "from main import create_app\n"
+            "from api import ROUTER_MODULES\n"
+            "app = create_app(['stats'])\n"
+            "print(sorted(n for n, m in ROUTER_MODULES.items() if 'api' + m in sys.modules))\n"
+            "print(any(r.path.startswith('/api/recipes') for r in app.routes))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=APP_DIR,
+            env={**os.environ, "APP_CONFIG__APP__SERVE_UPLOADS": "false"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        modules, has_recipes = result.stdout.strip().splitlines()[-2:]
+        assert modules == "['stats']"
+        assert has_recipes == "False"
+
+    def test_rejects_unknown_router(self):
+        """Test that a typo in settings.app.routers fails loudly."""
+        with pytest.raises(ValueError):
+            build_router(["recipes", "recipe"])
+
+
+class TestOpenAPICache:
+    """Tests for install_openapi_cache function."""
+
+    def test_miss_writes_then_hit_serves_file(self, tmp_path, monkeypatch):
+        """Test that the first app writes the document and the next one reuses it."""
+        path = tmp_path / "openapi.json"
+        first = make_app()
+        install_openapi_cache(first, path)
+
+        document = first.openapi()
+
+        assert json.loads(path.read_text())["document"] == document
+
+        def fail(app, path):
+            raise AssertionError("regenerated a fresh cache")
+
+        monkeypatch.setattr(openapi_cache, "dump_openapi", fail)
+        second = make_app()
+        install_openapi_cache(second, path)
+        assert second.openapi() == document
+
+    @pytest.mark.parametrize(
+        "changed",
+        [{"description": "Every item"}, {"status_code": 202}],
+    )
+    def test_stale_when_route_changes(self, tmp_path, changed):
+        """Test that changed descriptions or status codes regenerate the document."""
+        path = tmp_path / "openapi.json"
+        original = make_app()
+        install_openapi_cache(original, path)
+        original.openapi()
+
+        app = make_app(**changed)
+        install_openapi_cache(app, path)
+
+        assert openapi_cache.load_openapi(app, path) is None
+        assert app.openapi() == FastAPI.openapi(make_app(**changed))
+        assert openapi_cache.load_openapi(make_app(**changed), path) is not None
@@ -0,0 +1,93 @@
+"""
+Tests for the /api/batch endpoint.
+"""
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api.batch import router as batch_router
+from models import db_helper
+
+
+def make_client() -> TestClient:
+    probe = APIRouter(prefix="/probe")
+
+    @probe.get("/session")
+    async def read_session(session: AsyncSession = Depends(db_helper.session_getter)):
+        return {"session": id(session)}
+
+    @probe.post("/echo", status_code=201)
+    async def echo(payload: dict, session: AsyncSession = Depends(db_helper.session_getter)):
+        return {"payload": payload, "session": id(session)}
+
+    @probe.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Nope")
+
+    @probe.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    app = FastAPI()
+    app.include_router(batch_router, prefix="/api")
+    app.include_router(probe, prefix="/api")
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestBatch:
+    """Tests for run_batch endpoint."""
+
+    def test_runs_sub_requests_in_order(self):
+        """Test that each sub-request gets its own status and body."""
+        client = make_client()
+
+        response = client.post(
+            "/api/batch",
+            json={
+                "requests": [
+                    {"method": "POST", "path": "/api/probe/echo", "body": {"a": 1}},
+                    {"path": "/api/probe/missing"},
+                    {"path": "/api/probe/broken"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        results = response.json()["responses"]
+        assert [r["status"] for r in results] == [201, 404, 500]
+        assert results[0]["body"]["payload"] == {"a": 1}
+        assert results[1]["body"] == {"detail": "Nope"}
+
+    def test_reads_share_one_session(self):
+        """Test that GET sub-requests reuse one session and writes do not."""
+        client = make_client()
+
+        response = client.post(
+            "/api/batch",
+            json={
+                "requests": [
+                    {"path": "/api/probe/session"},
+                    {"path": "/api/probe/session"},
+                    {"method": "POST", "path": "/api/probe/echo", "body": {}},
+                ]
+            },
+        )
+
+        first, second, write = [r["body"]["session"] for r in response.json()["responses"]]
+        assert first == second
+        assert write != first
+
+    def test_nested_batch_rejected(self):
+        """Test that a batch cannot contain another batch call."""
+        client = make_client()
+
+        response = client.post("/api/batch", json={"requests": [{"path": "/api/batch"}]})
+
+        assert response.status_code == 422
@@ -0,0 +1,79 @@
+"""
+Tests for ingredient sorting and usage counter updates.
+"""
+
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api.ingredients import router as ingredients_router
+from models import db_helper
+from models.ingredient import Ingredient
+from queries import IngredientQueries
+from repositories import IngredientRepository
+
+
+class TestGetAll:
+    """Tests for IngredientQueries.get_all method."""
+
+    @pytest.mark.asyncio
+    async def test_sorts_by_usage(
+        self, session: AsyncSession, sample_ingredients: list[Ingredient]
+    ):
+        """Test that '-usage' sorts by usage_count, ties broken by id."""
+        await IngredientRepository(session).apply_usage_deltas(Counter({2: 3, 3: 1}))
+
+        ingredients = await IngredientQueries(session).get_all(sort="-usage")
+
+        assert [i.id for i in ingredients][:2] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_sort_field(self, session: AsyncSession):
+        """Test that a typo in the sort field is an error, not an unsorted list."""
+        with pytest.raises(ValueError):
+            await IngredientQueries(session).get_all(sort="-usages")
+
+    def test_route_rejects_unknown_sort_field(self):
+        """Test that the endpoint answers 422 to an unknown sort field."""
+        app = FastAPI()
+        app.include_router(ingredients_router, prefix="/api")
+        app.dependency_overrides[db_helper.session_getter] = lambda: None
+
+        response = TestClient(app).get("/api/ingredients/", params={"sort": "title"})
+
+        assert response.status_code == 422
+
+
+class TestApplyUsageDeltas:
+    """Tests for IngredientRepository.apply_usage_deltas method."""
+
+    @pytest.mark.asyncio
+    async def test_updates_rows_in_id_order(self, session: AsyncSession, monkeypatch):
+        """Test that rows are updated in id order and zero deltas are skipped."""
+        executed = []
+
+        async def execute(statement, rows=None):
+            executed.append(rows)
+
+        monkeypatch.setattr(session, "execute", execute)
+
+        await IngredientRepository(session).apply_usage_deltas(
+            Counter({9: 1, 2: -1, 5: 0, 4: 2})
+        )
+
+        assert executed == [
+            [
+                {"b_id": 2, "b_delta": -1},
+                {"b_id": 4, "b_delta": 2},
+                {"b_id": 9, "b_delta": 1},
+            ]
+        ]
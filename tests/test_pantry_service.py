@@ -0,0 +1,96 @@
+"""
+Tests for PantryService class and the in-memory pantry index.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from services.pantry_service import PantryService
+from repositories.recipe_repository import RecipeRepository
+from models.recipe import Recipe
+from models.ingredient import Ingredient
+from models.users import User
+from schemas.recipe import RecipeCreate, RecipeUpdate, RecipeIngredientInput
+
+
+def ingredient_inputs(*ingredient_ids: int) -> list[RecipeIngredientInput]:
+    return [
+        RecipeIngredientInput(ingredient_id=i, quantity=1, measurement=2)
+        for i in ingredient_ids
+    ]
+
+
+class TestFindRecipes:
+    """Tests for find_recipes method."""
+
+    @pytest.mark.asyncio
+    async def test_ranks_by_coverage(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that fully covered recipes come first and missing items are listed."""
+        service = PantryService(session)
+
+        # Pasta and Olive Oil: Caesar Salad fully covered, Carbonara half
+        result = await service.find_recipes([1, 4])
+
+        assert [(r["title"], r["coverage"], r["missing"]) for r in result] == [
+            ("Caesar Salad", 1.0, 0),
+            ("Spaghetti Carbonara", 0.5, 1),
+        ]
+        assert result[1]["missing_ingredient_ids"] == [3]
+
+    @pytest.mark.asyncio
+    async def test_max_missing_and_limit(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that max_missing filters and limit truncates the ranking."""
+        service = PantryService(session)
+
+        assert await service.find_recipes([3], max_missing=0) == []
+        result = await service.find_recipes([3], limit=1)
+        assert [r["id"] for r in result] == [1]
+
+    @pytest.mark.asyncio
+    async def test_index_follows_repository_writes(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that creates, updates and deletes are visible without a rebuild."""
+        service = PantryService(session)
+        repository = RecipeRepository(session)
+        await service.find_recipes([2])
+
+        created = await repository.create(
+            RecipeCreate(
+                title="Tomato Soup",
+                description="Description",
+                cooking_time=20,
+                difficulty=1,
+                ingredients=ingredient_inputs(2),
+            ),
+            sample_user.id,
+        )
+        await repository.update(1, RecipeUpdate(ingredients=ingredient_inputs(2, 3)))
+        await repository.delete(2)
+
+        result = await service.find_recipes([2])
+
+        assert [(r["id"], r["coverage"]) for r in result] == [
+            (created.id, 1.0),
+            (1, 0.5),
+        ]
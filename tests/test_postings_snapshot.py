@@ -0,0 +1,162 @@
+"""
+Tests for the memory-mapped recipe -> ingredient postings snapshot.
+"""
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from config import settings
+from indexes import postings
+from indexes.postings import PostingsSnapshot, RecipePostings, SnapshotError, write_snapshot
+from repositories.recipe_repository import RecipeRepository
+from models.recipe import Recipe
+from models.recipe_ingredient_change import RecipeIngredientChange
+from schemas.recipe import RecipeUpdate, RecipeIngredientInput
+
+
+class TestPostingsSnapshot:
+    """Tests for the snapshot file format."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that both directions of the postings are read back."""
+        path = str(tmp_path / "postings")
+        write_snapshot(path, {3: {2, 1}, 1: {2}, 7: set()}, high_water=42)
+
+        with PostingsSnapshot(path) as snapshot:
+            assert snapshot.high_water == 42
+            assert list(snapshot.recipe_ids) == [1, 3]
+            assert list(snapshot.ingredients_of(3)) == [1, 2]
+            assert list(snapshot.recipes_of(2)) == [1, 3]
+            assert list(snapshot.recipes_of(9)) == []
+
+    def test_rejects_truncated_file(self, tmp_path):
+        """Test that a damaged file is refused instead of misread."""
+        path = tmp_path / "postings"
+        write_snapshot(str(path), {1: {2, 3}}, high_water=0)
+        path.write_bytes(path.read_bytes()[:-8])
+
+        with pytest.raises(SnapshotError):
+            PostingsSnapshot(str(path))
+
+
+class TestRecipePostings:
+    """Tests for the overlay of changes over a mapped snapshot."""
+
+    def test_overlay_shadows_snapshot_rows(self, tmp_path):
+        """Test that changed and removed recipes hide their snapshot rows."""
+        path = str(tmp_path / "postings")
+        write_snapshot(path, {1: {2}, 3: {1, 2}, 4: {2}}, high_water=0)
+        postings = RecipePostings(PostingsSnapshot(path))
+
+        postings.set(3, {5})
+        postings.set(4, ())
+        postings.set(6, {2, 5})
+
+        assert len(postings) == 3
+        assert sorted(postings.recipes_of(2)) == [1, 6]
+        assert sorted(postings.recipes_of(5)) == [3, 6]
+        assert list(postings.ingredients_of(1)) == [2]
+        assert postings.ingredients_of(4) == frozenset()
+        assert postings.adjacency() == {1: {2}, 3: {5}, 6: {2, 5}}
+
+
+class TestLoadRecipeIngredients:
+    """Tests for load_recipe_ingredients function."""
+
+    @pytest.mark.asyncio
+    async def test_replays_changes_since_snapshot(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test that a worker loads the snapshot and re-reads only changed recipes."""
+        monkeypatch.setattr(settings.indexes, "snapshot_path", str(tmp_path / "postings"))
+        expected = await postings.scan_recipe_ingredients(session)
+
+        # No snapshot yet: full scan, which writes one
+        loaded = await postings.load_recipe_ingredients(session)
+        assert loaded.adjacency() == expected
+        assert os.path.exists(settings.indexes.snapshot_path)
+
+        repository = RecipeRepository(session)
+        await repository.update(
+            1,
+            RecipeUpdate(
+                ingredients=[RecipeIngredientInput(ingredient_id=2, quantity=1, measurement=2)]
+            ),
+        )
+        await repository.delete(2)
+
+        scans = []
+        original_scan = postings.scan_recipe_ingredients
+
+        async def counting_scan(session):
+            scans.append(1)
+            return await original_scan(session)
+
+        monkeypatch.setattr(postings, "scan_recipe_ingredients", counting_scan)
+        loaded = await postings.load_recipe_ingredients(session)
+
+        assert scans == []
+        assert loaded.identity is not None
+        assert loaded.adjacency() == await original_scan(session)
+        assert set(loaded.ingredients_of(1)) == {2}
+        assert 2 not in loaded.adjacency()
+
+    @pytest.mark.asyncio
+    async def test_rescans_when_snapshot_replaced(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test that pruning the change log behind a worker's back forces a scan."""
+        path = str(tmp_path / "postings")
+        monkeypatch.setattr(settings.indexes, "snapshot_path", path)
+        await postings.load_recipe_ingredients(session)
+        await RecipeRepository(session).delete(2)
+
+        original_replay = postings.replay_changes
+
+        async def prune_then_replay(session, ingredients, high_water):
+            # Another process refreshes the snapshot and prunes the log meanwhile
+            await postings.save_snapshot(session, path)
+            await session.execute(delete(RecipeIngredientChange))
+            return await original_replay(session, ingredients, high_water)
+
+        monkeypatch.setattr(postings, "replay_changes", prune_then_replay)
+        loaded = await postings.load_recipe_ingredients(session)
+
+        assert loaded.identity is None
+        assert loaded.adjacency() == await postings.scan_recipe_ingredients(session)
+
+    @pytest.mark.asyncio
+    async def test_writes_prune_changes_in_snapshot(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test that workers trim the change log once a snapshot covers it."""
+        monkeypatch.setattr(settings.indexes, "snapshot_path", str(tmp_path / "postings"))
+        repository = RecipeRepository(session)
+        ingredients = [RecipeIngredientInput(ingredient_id=2, quantity=1, measurement=2)]
+        await repository.update(1, RecipeUpdate(ingredients=ingredients))
+        covered = await postings.change_high_water(session)
+        await postings.save_snapshot(session, settings.indexes.snapshot_path)
+
+        await repository.update(3, RecipeUpdate(ingredients=ingredients))
+
+        result = await session.scalars(select(RecipeIngredientChange.seq))
+        assert [seq > covered for seq in result.all()] == [True]
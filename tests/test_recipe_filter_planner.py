@@ -0,0 +1,189 @@
+"""
+Tests for RecipeFilterPlanner and the explain output of paginated recipes.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_pagination import Params
+from fastapi_pagination.api import set_params, set_page
+from fastapi_pagination.utils import disable_installed_extensions_check
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+# Disable extension check for testing
+disable_installed_extensions_check()
+
+from config import settings
+from indexes import search_index
+from services.recipe_service import RecipeService
+from services.recipe_filter_planner import RecipeFilter, RecipeFilterPlanner
+from repositories.recipe_repository import RecipeRepository
+from models.recipe import Recipe
+from models.ingredient import Ingredient
+from models.users import User
+from schemas.recipe import RecipeCreate, RecipeIngredientInput, RecipeResponse
+from schemas.facets import FacetedPage
+
+
+async def create_catalog(session: AsyncSession, author_id: int) -> None:
+    """Ten quick pasta recipes, one of them with Cheese."""
+    repository = RecipeRepository(session)
+    for number in range(10):
+        ingredient_ids = [1, 3] if number == 0 else [1]
+        await repository.create(
+            RecipeCreate(
+                title=f"Pasta {number}",
+                description="Description",
+                cooking_time=10 + number,
+                difficulty=1,
+                ingredients=[
+                    RecipeIngredientInput(ingredient_id=i, quantity=1, measurement=1)
+                    for i in ingredient_ids
+                ],
+            ),
+            author_id,
+        )
+
+
+async def paginated(service: RecipeService, **filters) -> FacetedPage:
+    with set_page(FacetedPage[RecipeResponse]), set_params(Params(page=1, size=50)):
+        return await service.get_paginated_recipes(**filters)
+
+
+class TestPlan:
+    """Tests for plan method."""
+
+    @pytest.mark.asyncio
+    async def test_orders_filters_by_estimated_rows(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that estimates come from the counters and the rarest filter runs first."""
+        await create_catalog(session, sample_user.id)
+        filters = [
+            RecipeFilter(RecipeFilter.COOKING_TIME, {"min": None, "max": 30}, None),
+            RecipeFilter(
+                RecipeFilter.INGREDIENT,
+                {"ingredient_id": [3], "ingredient_match": "any"},
+                None,
+            ),
+            RecipeFilter(RecipeFilter.NAME, {"name__like": "pasta"}, None),
+        ]
+
+        plan = await RecipeFilterPlanner(session).plan(filters)
+
+        assert plan.total_recipes == 10
+        assert [(f.name, f.estimated_rows, f.estimate_source) for f in plan.filters] == [
+            ("ingredient", 1, "usage_count"),
+            ("name", 1, "default"),
+            ("cooking_time", 10, "recipe_stats"),
+        ]
+        assert plan.pushdown is True
+
+        await search_index.ensure_loaded(session)
+        plan = await RecipeFilterPlanner(session).plan(filters)
+        assert [(f.name, f.estimated_rows, f.estimate_source) for f in plan.filters][-1] == (
+            "name",
+            10,
+            "search_index_whole_words",
+        )
+
+
+class TestExplain:
+    """Tests for get_paginated_recipes with explain."""
+
+    @pytest.mark.asyncio
+    async def test_planned_results_match_fixed_order(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+        monkeypatch,
+    ):
+        """Test that the plan is reported and does not change the results."""
+        await create_catalog(session, sample_user.id)
+        monkeypatch.setattr(settings.planner, "default_like_selectivity", 0.5)
+        service = RecipeService(session)
+        filters = {"name__like": "Pasta", "ingredient_id": [3], "cooking_time_max": 30}
+
+        result = await paginated(service, explain=True, **filters)
+
+        assert result.plan.execution == "sql"
+        assert [(s.filter, s.strategy) for s in result.plan.steps] == [
+            ("ingredient", "pushdown"),
+            ("name", "filter"),
+            ("cooking_time", "filter"),
+        ]
+        monkeypatch.setattr(settings.planner, "enabled", False)
+        unplanned = await paginated(service, **filters)
+        assert [i.id for i in result.items] == [i.id for i in unplanned.items]
+        assert result.total == unplanned.total == 1
+        assert unplanned.plan is None
+
+    @pytest.mark.asyncio
+    async def test_pushdown_dropped_when_estimate_is_wrong(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+        monkeypatch,
+    ):
+        """Test that stale counters cannot produce an oversized IN list."""
+        await create_catalog(session, sample_user.id)
+        monkeypatch.setattr(settings.planner, "pushdown_max_rows", 1)
+        monkeypatch.setattr(settings.planner, "default_like_selectivity", 0.01)
+        service = RecipeService(session)
+
+        # The name estimate is 1, but every recipe matches
+        result = await paginated(
+            service, name__like="a", cooking_time_max=30, explain=True
+        )
+
+        assert result.total == 10
+        assert [s.strategy for s in result.plan.steps] == ["filter", "filter"]
+
+    @pytest.mark.asyncio
+    async def test_no_pushdown_without_statistics(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that empty counters, where every estimate is 0, never push down."""
+        service = RecipeService(session)
+
+        result = await paginated(
+            service, name__like="a", exclude_allergen_id=[1], explain=True
+        )
+
+        assert result.total == 3
+        assert result.plan.total_recipes == 0
+        assert [s.strategy for s in result.plan.steps] == ["filter", "filter"]
+
+    @pytest.mark.asyncio
+    async def test_cached_total_skips_planning(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+        monkeypatch,
+    ):
+        """Test that a cached total costs neither statistics nor a pushdown query."""
+        await create_catalog(session, sample_user.id)
+        service = RecipeService(session)
+        filters = {"ingredient_id": [3], "cooking_time_max": 30}
+        first = await paginated(service, **filters)
+
+        async def fail(self, filters):
+            raise AssertionError("planned a request with a cached total")
+
+        monkeypatch.setattr(RecipeFilterPlanner, "plan", fail)
+        second = await paginated(service, **filters)
+
+        assert second.total == first.total == 1
+        assert [i.id for i in second.items] == [i.id for i in first.items]
@@ -0,0 +1,96 @@
+"""
+Tests for loading and refreshing RecipeIndex contents.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, Optional, Set
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from config import settings
+from indexes import RecipeIndex
+
+
+class TitleIndex(RecipeIndex):
+    """recipe id -> title, fetched from a dict standing in for the database."""
+
+    def __init__(self, table: Dict[int, str]) -> None:
+        super().__init__()
+        self.table = table
+        self.fetches = 0
+        self.fetched = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+        self._build(None)
+
+    async def _fetch(self, session: AsyncSession) -> Any:
+        self.fetches += 1
+        data = dict(self.table)
+        self.fetched.set()
+        await self.release.wait()
+        return data
+
+    def _build(self, data: Optional[Dict[int, str]]) -> None:
+        self.titles = dict(data or {})
+
+    def _apply_saved(
+        self, recipe_id: int, fields: Dict[str, Any], ingredient_ids: Optional[Set[int]]
+    ) -> None:
+        self.titles[recipe_id] = fields["title"]
+
+    def _apply_deleted(self, recipe_ids: Iterable[int]) -> None:
+        for recipe_id in recipe_ids:
+            self.titles.pop(recipe_id, None)
+
+
+class TestEnsureLoaded:
+    """Tests for ensure_loaded method."""
+
+    @pytest.mark.asyncio
+    async def test_writes_during_fetch_are_replayed(self, session: AsyncSession):
+        """Test that a write racing the first load is kept and no refetch follows."""
+        index = TitleIndex({1: "Soup", 2: "Stew"})
+        index.release.clear()
+
+        load = asyncio.create_task(index.ensure_loaded(session))
+        await index.fetched.wait()
+        index.table[3] = "Pie"
+        index.recipe_saved(3, {"title": "Pie"})
+        index.recipes_deleted([2])
+        index.release.set()
+        await load
+        await index.ensure_loaded(session)
+
+        assert index.titles == {1: "Soup", 3: "Pie"}
+        assert index.fetches == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_index_refreshes_in_background(
+        self, session: AsyncSession, monkeypatch
+    ):
+        """Test that an old index keeps serving while it is rebuilt off the request."""
+        index = TitleIndex({1: "Soup"})
+        await index.ensure_loaded(session)
+        monkeypatch.setattr(settings.indexes, "max_age_seconds", 0)
+        index.table[2] = "Stew"
+        index.release.clear()
+        index.fetched.clear()
+
+        await index.ensure_loaded(session)
+        await index.ensure_loaded(session)
+        await index.fetched.wait()
+
+        assert index.titles == {1: "Soup"}
+        index.recipe_saved(3, {"title": "Pie"})
+        index.release.set()
+        await index._refresh_task
+
+        assert index.titles == {1: "Soup", 2: "Stew", 3: "Pie"}
+        assert index.fetches == 2
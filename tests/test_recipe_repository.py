@@ -0,0 +1,313 @@
+"""
+Tests for RecipeRepository class.
+"""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from repositories.recipe_repository import RecipeRepository
+from repositories.ingredient_repository import IngredientRepository
+from queries.ingredient_queries import IngredientQueries
+from models.recipe import Recipe
+from models.recipe_allergen import RecipeAllergen
+from models.recipe_ingredient import RecipeIngredient
+from models.ingredient import Ingredient
+from models.users import User
+from schemas.recipe import RecipeCreate, RecipeUpdate, RecipeIngredientInput
+
+
+class TestUpdate:
+    """Tests for update method."""
+
+    @pytest.mark.asyncio
+    async def test_update_returns_updated_recipe(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+        sample_user: User,
+    ):
+        """Test that update applies the changes and returns the new row."""
+        repository = RecipeRepository(session)
+
+        updated = await repository.update(
+            sample_recipe.id, RecipeUpdate(title="New Title"), author_id=sample_user.id
+        )
+
+        assert updated is not None
+        assert updated.title == "New Title"
+        assert updated.description == sample_recipe.description
+
+    @pytest.mark.asyncio
+    async def test_update_other_author_returns_none(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that update does not touch a recipe owned by someone else."""
+        repository = RecipeRepository(session)
+
+        updated = await repository.update(
+            sample_recipe.id, RecipeUpdate(title="Hijacked"), author_id=999
+        )
+
+        assert updated is None
+        title = await session.scalar(select(Recipe.title).where(Recipe.id == sample_recipe.id))
+        assert title == "Spaghetti Carbonara"
+
+    @pytest.mark.asyncio
+    async def test_update_missing_recipe_returns_none(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+    ):
+        """Test that updating a non-existent recipe returns None."""
+        repository = RecipeRepository(session)
+
+        assert await repository.update(9999, RecipeUpdate(title="X")) is None
+
+
+class TestDelete:
+    """Tests for delete method."""
+
+    @pytest.mark.asyncio
+    async def test_delete_own_recipe(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+        sample_user: User,
+    ):
+        """Test that the author can delete their recipe."""
+        repository = RecipeRepository(session)
+
+        assert await repository.delete(sample_recipe.id, author_id=sample_user.id) is True
+        assert await repository.get_by_id(sample_recipe.id) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_other_author_returns_false(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that delete keeps a recipe owned by someone else."""
+        repository = RecipeRepository(session)
+
+        assert await repository.delete(sample_recipe.id, author_id=999) is False
+        assert await repository.get_by_id(sample_recipe.id) is not None
+
+
+class TestUpdateLinks:
+    """Tests for replacing allergen and ingredient lists in update."""
+
+    @staticmethod
+    async def get_links(session: AsyncSession, recipe_id: int):
+        allergens = await session.scalars(
+            select(RecipeAllergen.allergen_id).where(RecipeAllergen.recipe_id == recipe_id)
+        )
+        ingredients = await session.execute(
+            select(
+                RecipeIngredient.id,
+                RecipeIngredient.ingredient_id,
+                RecipeIngredient.quantity,
+            ).where(RecipeIngredient.recipe_id == recipe_id)
+        )
+        return set(allergens.all()), {row.ingredient_id: row for row in ingredients}
+
+    @pytest.mark.asyncio
+    async def test_update_replaces_allergens(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that allergen_ids replaces the stored allergen links."""
+        repository = RecipeRepository(session)
+
+        await repository.update(sample_recipe.id, RecipeUpdate(allergen_ids=[2, 3]))
+
+        allergens, _ = await self.get_links(session, sample_recipe.id)
+        assert allergens == {2, 3}
+
+    @pytest.mark.asyncio
+    async def test_update_ingredients_keeps_unchanged_rows(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that only changed ingredient rows are rewritten."""
+        repository = RecipeRepository(session)
+        _, before = await self.get_links(session, sample_recipe.id)
+
+        await repository.update(
+            sample_recipe.id,
+            RecipeUpdate(
+                ingredients=[
+                    RecipeIngredientInput(ingredient_id=1, quantity=250, measurement=1),
+                    RecipeIngredientInput(ingredient_id=3, quantity=100, measurement=1),
+                    RecipeIngredientInput(ingredient_id=4, quantity=10, measurement=3),
+                ]
+            ),
+        )
+
+        _, after = await self.get_links(session, sample_recipe.id)
+        assert set(after) == {1, 3, 4}
+        # Existing rows are updated in place, not deleted and re-created
+        assert after[1].id == before[1].id
+        assert after[1].quantity == 250
+        assert after[3].id == before[3].id
+
+    @pytest.mark.asyncio
+    async def test_update_ingredients_removes_missing(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that ingredients absent from the new list are deleted."""
+        repository = RecipeRepository(session)
+
+        await repository.update(
+            sample_recipe.id,
+            RecipeUpdate(
+                ingredients=[RecipeIngredientInput(ingredient_id=3, quantity=100, measurement=1)]
+            ),
+        )
+
+        _, after = await self.get_links(session, sample_recipe.id)
+        assert set(after) == {3}
+
+    @pytest.mark.asyncio
+    async def test_update_links_of_other_author_ignored(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that links are not changed when the ownership check fails."""
+        repository = RecipeRepository(session)
+
+        result = await repository.update(
+            sample_recipe.id, RecipeUpdate(allergen_ids=[]), author_id=999
+        )
+
+        assert result is None
+        allergens, _ = await self.get_links(session, sample_recipe.id)
+        assert allergens == {1, 2}
+
+
+class TestDeleteMany:
+    """Tests for delete_many method."""
+
+    @pytest.mark.asyncio
+    async def test_delete_many_removes_link_rows(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_user: User,
+    ):
+        """Test that recipes and their ingredient links are deleted together."""
+        repository = RecipeRepository(session)
+
+        deleted = await repository.delete_many([1, 2, 9999], author_id=sample_user.id)
+
+        assert sorted(deleted) == [1, 2]
+        remaining = await session.scalars(select(RecipeIngredient.recipe_id).distinct())
+        assert remaining.all() == [3]
+
+    @pytest.mark.asyncio
+    async def test_delete_many_skips_other_authors(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that recipes and links of other authors are kept."""
+        repository = RecipeRepository(session)
+
+        deleted = await repository.delete_many([sample_recipe.id], author_id=999)
+
+        assert deleted == []
+        links = await session.scalars(
+            select(RecipeAllergen).where(RecipeAllergen.recipe_id == sample_recipe.id)
+        )
+        assert len(links.all()) == 2
+
+
+class TestIngredientUsage:
+    """Tests for the ingredients.usage_count counter."""
+
+    @staticmethod
+    async def get_usage(session: AsyncSession) -> dict[int, int]:
+        rows = await session.execute(select(Ingredient.id, Ingredient.usage_count))
+        return dict(rows.all())
+
+    @pytest.mark.asyncio
+    async def test_usage_follows_repository_writes(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that create, update and delete keep usage counts in sync."""
+        repository = RecipeRepository(session)
+        first = await repository.create(
+            RecipeCreate(
+                title="A",
+                description="Description",
+                cooking_time=10,
+                difficulty=1,
+                ingredients=[
+                    RecipeIngredientInput(ingredient_id=1, quantity=100, measurement=1),
+                    RecipeIngredientInput(ingredient_id=1, quantity=50, measurement=1),
+                    RecipeIngredientInput(ingredient_id=2, quantity=2, measurement=3),
+                ],
+            ),
+            sample_user.id,
+        )
+        second = await repository.create(
+            RecipeCreate(
+                title="B",
+                description="Description",
+                cooking_time=20,
+                difficulty=2,
+                ingredients=[
+                    RecipeIngredientInput(ingredient_id=2, quantity=1, measurement=3),
+                ],
+            ),
+            sample_user.id,
+        )
+        assert await self.get_usage(session) == {1: 1, 2: 2, 3: 0, 4: 0}
+
+        await repository.update(
+            first.id,
+            RecipeUpdate(
+                ingredients=[
+                    RecipeIngredientInput(ingredient_id=1, quantity=100, measurement=1),
+                    RecipeIngredientInput(ingredient_id=3, quantity=10, measurement=1),
+                ]
+            ),
+        )
+        await repository.delete(second.id)
+        usage = await self.get_usage(session)
+        assert usage == {1: 1, 2: 0, 3: 1, 4: 0}
+
+        await IngredientRepository(session).rebuild_usage_counts()
+        assert await self.get_usage(session) == usage
+
+    @pytest.mark.asyncio
+    async def test_sort_by_usage(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that sort=-usage lists the most used ingredients first."""
+        await IngredientRepository(session).rebuild_usage_counts()
+        session.expire_all()
+
+        ingredients = await IngredientQueries(session).get_all(sort="-usage")
+
+        counts = [i.usage_count for i in ingredients]
+        assert counts == sorted(counts, reverse=True)
+        assert counts[0] > 0
@@ -3,7 +3,8 @@ Tests for RecipeService class.
 """
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from fastapi_pagination import Page, Params
 from fastapi_pagination.api import set_params, set_page
 from fastapi_pagination.utils import disable_installed_extensions_check
@@ -17,13 +18,20 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
 # Disable extension check for testing
 disable_installed_extensions_check()
 
+from config import settings
+from indexes import recipe_table
 from services.recipe_service import RecipeService
+from repositories.recipe_repository import RecipeRepository
+from models.base import Base
 from models.recipe import Recipe
+from models.recipe_allergen import RecipeAllergen
+from models.recipe_ingredient import RecipeIngredient
 from models.cuisine import Cuisine
 from models.allergen import Allergen
 from models.ingredient import Ingredient
 from models.users import User
-from schemas.recipe import RecipeResponse
+from schemas.recipe import RecipeCreate, RecipeUpdate, RecipeResponse
+from schemas.facets import FacetedPage
 
 
 class TestBuildRecipeResponse:
@@ -153,151 +161,47 @@ class TestBuildRecipeResponse:
         assert response["ingredients"] == []
 
 
-class TestBuildRecipeResponseSelective:
-    """Tests for build_recipe_response_selective method."""
-    
-    @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_base_fields(
-        self,
-        session: AsyncSession,
-        sample_recipe: Recipe,
-    ):
-        """Test building recipe response with only base fields (empty includes)."""
-        service = RecipeService(session)
-        response = await service.build_recipe_response_selective(sample_recipe, [])
-        
-        # Check basic fields are present
-        assert response["id"] == sample_recipe.id
-        assert response["title"] == sample_recipe.title
-        assert response["description"] == sample_recipe.description
-        assert response["cooking_time"] == sample_recipe.cooking_time
-        assert response["difficulty"] == sample_recipe.difficulty
-        
-        # Check that optional fields are not included
-        assert "cuisine" not in response
-        assert "author" not in response
-        assert "allergens" not in response
-        assert "ingredients" not in response
-    
-    @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_cuisine_only(
-        self,
-        session: AsyncSession,
-        sample_recipe: Recipe,
-        sample_cuisine: Cuisine,
-    ):
-        """Test building recipe response with only cuisine included."""
-        service = RecipeService(session)
-        response = await service.build_recipe_response_selective(sample_recipe, ["cuisine"])
-        
-        assert "cuisine" in response
-        assert response["cuisine"]["id"] == sample_cuisine.id
-        assert response["cuisine"]["name"] == sample_cuisine.name
-        
-        # Check that other optional fields are not included
-        assert "author" not in response
-        assert "allergens" not in response
-        assert "ingredients" not in response
-    
-    @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_author_only(
-        self,
-        session: AsyncSession,
-        sample_recipe: Recipe,
-        sample_user: User,
-    ):
-        """Test building recipe response with only author included."""
-        service = RecipeService(session)
-        response = await service.build_recipe_response_selective(sample_recipe, ["author"])
-        
-        assert "author" in response
-        assert response["author"]["id"] == sample_user.id
-        assert response["author"]["first_name"] == sample_user.first_name
-        
-        # Check that other optional fields are not included
-        assert "cuisine" not in response
-        assert "allergens" not in response
-        assert "ingredients" not in response
-    
-    @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_allergens_only(
-        self,
-        session: AsyncSession,
-        sample_recipe: Recipe,
-    ):
-        """Test building recipe response with only allergens included."""
-        service = RecipeService(session)
-        response = await service.build_recipe_response_selective(sample_recipe, ["allergens"])
-        
-        assert "allergens" in response
-        assert len(response["allergens"]) == 2
-        
-        # Check that other optional fields are not included
-        assert "cuisine" not in response
-        assert "author" not in response
-        assert "ingredients" not in response
-    
-    @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_ingredients_only(
-        self,
-        session: AsyncSession,
-        sample_recipe: Recipe,
-    ):
-        """Test building recipe response with only ingredients included."""
-        service = RecipeService(session)
-        response = await service.build_recipe_response_selective(sample_recipe, ["ingredients"])
-        
-        assert "ingredients" in response
-        assert len(response["ingredients"]) == 2
-        
-        # Check that other optional fields are not included
-        assert "cuisine" not in response
-        assert "author" not in response
-        assert "allergens" not in response
-    
+class TestBuildRecipeResponses:
+    """Tests for build_recipe_responses method."""
+
     @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_multiple_includes(
+    async def test_matches_single_recipe_responses(
         self,
         session: AsyncSession,
-        sample_recipe: Recipe,
+        multiple_recipes: list[Recipe],
     ):
-        """Test building recipe response with multiple includes."""
+        """Test that batched bodies equal the per-recipe ones, in input order."""
         service = RecipeService(session)
-        response = await service.build_recipe_response_selective(
-            sample_recipe, 
-            ["cuisine", "author", "allergens", "ingredients"]
-        )
-        
-        # All optional fields should be present
-        assert "cuisine" in response
-        assert "author" in response
-        assert "allergens" in response
-        assert "ingredients" in response
-    
+        recipes = list(reversed(multiple_recipes))
+
+        responses = await service.build_recipe_responses(recipes)
+
+        assert responses == [await service.build_recipe_response(r) for r in recipes]
+
     @pytest.mark.asyncio
-    async def test_build_recipe_response_selective_no_cuisine(
+    @pytest.mark.parametrize("filters", [{}, {"cooking_time_min": 0}])
+    async def test_paginated_pages_are_hydrated_in_batch(
         self,
         session: AsyncSession,
-        sample_user: User,
+        multiple_recipes: list[Recipe],
+        monkeypatch,
+        filters,
     ):
-        """Test building recipe response selective when cuisine is None."""
-        recipe = Recipe(
-            id=103,
-            title="No Cuisine Recipe",
-            description="Recipe without cuisine",
-            cooking_time=15,
-            difficulty=2,
-            cuisine_id=None,
-            author_id=sample_user.id,
-        )
-        session.add(recipe)
-        await session.commit()
-        await session.refresh(recipe)
-        
+        """Test that the SQL and columnar listings never hydrate one recipe at a time."""
         service = RecipeService(session)
-        response = await service.build_recipe_response_selective(recipe, ["cuisine"])
-        
-        assert response["cuisine"] is None
+        expected = [await service.build_recipe_response(r) for r in multiple_recipes]
+
+        async def fail(self, recipe):
+            raise AssertionError("hydrated a page recipe by recipe")
+
+        monkeypatch.setattr(RecipeService, "build_recipe_response", fail)
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            result = await service.get_paginated_recipes(sort="id", **filters)
+
+        assert [item.model_dump() for item in result.items] == [
+            RecipeResponse(**body).model_dump() for body in expected
+        ]
+        assert recipe_table.loaded == bool(filters)
 
 
 class TestGetRecipesByIngredient:
@@ -497,6 +401,181 @@ class TestGetRecipesByIngredient:
             assert "description" not in recipe
 
 
+class TestLoadRelations:
+    """Tests for load_relations method."""
+
+    @pytest.mark.asyncio
+    async def test_parallel_loads_match_single_recipe_response(self, tmp_path):
+        """Test that concurrent relation loads return what the per-recipe path does."""
+        # A file database gets a queue pool, which enables the concurrent mode
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'loads.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add_all(
+                [
+                    User(
+                        id=1,
+                        email="a@example.com",
+                        hashed_password="x",
+                        first_name="A",
+                        last_name="B",
+                    ),
+                    Cuisine(id=1, name="Italian"),
+                    Allergen(id=1, name="Gluten"),
+                    Ingredient(id=1, name="Pasta"),
+                    Recipe(
+                        id=1,
+                        title="R",
+                        description="D",
+                        cooking_time=10,
+                        difficulty=1,
+                        cuisine_id=1,
+                        author_id=1,
+                    ),
+                    RecipeAllergen(recipe_id=1, allergen_id=1),
+                    RecipeIngredient(
+                        recipe_id=1, ingredient_id=1, quantity=100, measurement=1
+                    ),
+                ]
+            )
+            await session.commit()
+            recipe = await session.get(Recipe, 1)
+            service = RecipeService(session)
+            includes = ["cuisine", "author", "allergens", "ingredients"]
+
+            assert service._parallel_load_slots(len(includes)) > 1
+            related = await service.load_relations([recipe], includes)
+            expected = await service.build_recipe_response(recipe)
+
+        await engine.dispose()
+        for name in includes:
+            assert related[name][recipe.id] == expected[name]
+
+    @pytest.mark.asyncio
+    async def test_single_connection_pool_loads_sequentially(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that a pool without spare connections falls back to sequential loads."""
+        service = RecipeService(session)
+
+        assert service._parallel_load_slots(4) == 1
+        related = await service.load_relations([sample_recipe], ["allergens", "cuisine"])
+
+        assert [a["name"] for a in related["allergens"][sample_recipe.id]] == ["Gluten", "Dairy"]
+        assert related["cuisine"][sample_recipe.id]["name"] == "Italian"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "includes", [[], ["cuisine"], ["author"], ["allergens", "ingredients"]]
+    )
+    async def test_loads_only_included_relations(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+        includes,
+    ):
+        """Test that relations outside includes are not loaded."""
+        service = RecipeService(session)
+
+        related = await service.load_relations([sample_recipe], includes)
+
+        assert sorted(related) == sorted(includes)
+
+    @pytest.mark.asyncio
+    async def test_recipe_without_cuisine(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+    ):
+        """Test that a recipe without cuisine maps to None."""
+        recipe = Recipe(
+            id=103,
+            title="No Cuisine Recipe",
+            description="Recipe without cuisine",
+            cooking_time=15,
+            difficulty=2,
+            cuisine_id=None,
+            author_id=sample_user.id,
+        )
+        session.add(recipe)
+        await session.commit()
+        service = RecipeService(session)
+
+        related = await service.load_relations([recipe], ["cuisine"])
+
+        assert related["cuisine"] == {recipe.id: None}
+
+
+class TestGetRecipesByIds:
+    """Tests for get_recipes_by_ids method."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_request_order_and_reports_missing(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that recipes come back in request order with unknown ids listed."""
+        service = RecipeService(session)
+
+        result = await service.get_recipes_by_ids([3, 9999, 1, 3])
+
+        assert [item["id"] for item in result["items"]] == [3, 1]
+        assert result["missing"] == [9999]
+
+    @pytest.mark.asyncio
+    async def test_matches_single_recipe_response(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that batched items equal the single-recipe response."""
+        service = RecipeService(session)
+
+        result = await service.get_recipes_by_ids([sample_recipe.id])
+
+        assert result["items"] == [await service.build_recipe_response(sample_recipe)]
+
+
+class TestGetShoppingList:
+    """Tests for get_shopping_list method."""
+
+    @pytest.mark.asyncio
+    async def test_totals_grouped_by_ingredient_and_unit(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that quantities are summed per ingredient and measurement."""
+        service = RecipeService(session)
+
+        result = await service.get_shopping_list([1, 2, 9999])
+
+        items = {item["name"]: item for item in result["items"]}
+        assert set(items) == {"Cheese", "Pasta", "Tomato"}
+        assert items["Cheese"]["quantity"] == 300.0
+        assert items["Cheese"]["recipe_count"] == 2
+        assert items["Cheese"]["unit"] == "г"
+        assert result["not_found"] == [9999]
+
+    @pytest.mark.asyncio
+    async def test_repeated_recipe_counts_twice(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that a recipe planned twice doubles its quantities."""
+        service = RecipeService(session)
+
+        result = await service.get_shopping_list([3, 3, 1])
+
+        items = {item["name"]: item["quantity"] for item in result["items"]}
+        assert items == {"Cheese": 100.0, "Olive Oil": 100.0, "Pasta": 200.0}
+
+
 class TestGetPaginatedRecipes:
     """Tests for get_paginated_recipes method."""
     
@@ -600,6 +679,26 @@ class TestGetPaginatedRecipes:
         
         assert result.total == 2
     
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_filter_by_all_ingredients(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that ingredient_match="all" keeps only recipes with every ingredient."""
+        service = RecipeService(session)
+
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            # Pasta and Cheese - only Spaghetti Carbonara has both
+            result = await service.get_paginated_recipes(
+                ingredient_id=[sample_ingredients[0].id, sample_ingredients[2].id],
+                ingredient_match="all",
+            )
+
+        assert result.total == 1
+        assert result.items[0].title == "Spaghetti Carbonara"
+
     @pytest.mark.asyncio
     async def test_get_paginated_recipes_filter_by_nonexistent_ingredient(
         self,
@@ -723,3 +822,246 @@ class TestGetPaginatedRecipes:
         assert hasattr(item, 'author')
         assert hasattr(item, 'allergens')
         assert hasattr(item, 'ingredients')
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_exclude_allergens(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_allergens: list[Allergen],
+    ):
+        """Test that exclude_allergen_id keeps only recipes free of those allergens."""
+        session.add(Allergen(id=70, name="Lupin"))
+        await session.commit()
+        repository = RecipeRepository(session)
+        for title, allergen_ids in [
+            ("Gluten", [1]),
+            ("Gluten Dairy", [1, 2]),
+            ("Nuts", [3]),
+            ("Lupin", [70]),
+            ("Plain", []),
+        ]:
+            await repository.create(
+                RecipeCreate(
+                    title=title,
+                    description="Description",
+                    cooking_time=10,
+                    difficulty=1,
+                    allergen_ids=allergen_ids,
+                ),
+                sample_user.id,
+            )
+        service = RecipeService(session)
+
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            result = await service.get_paginated_recipes(
+                exclude_allergen_id=[1, 70], sort="title"
+            )
+
+        assert [item.title for item in result.items] == ["Nuts", "Plain"]
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_exclude_allergens_after_rebuild(
+        self,
+        session: AsyncSession,
+        sample_recipe: Recipe,
+    ):
+        """Test that rebuilt allergen masks match the allergen links."""
+        await RecipeRepository(session).rebuild_allergen_masks()
+        service = RecipeService(session)
+
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            excluded = await service.get_paginated_recipes(exclude_allergen_id=[2])
+            kept = await service.get_paginated_recipes(exclude_allergen_id=[3])
+
+        assert excluded.total == 0
+        assert kept.total == 1
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_facets(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that facets count the whole filtered set, not just the page."""
+        service = RecipeService(session)
+
+        with set_page(FacetedPage[RecipeResponse]), set_params(Params(page=1, size=1)):
+            result = await service.get_paginated_recipes(
+                ingredient_id=[sample_ingredients[2].id],  # Cheese
+                facets=True,
+            )
+
+        assert len(result.items) == 1
+        facets = result.facets
+        assert [(c.name, c.count) for c in facets.by_cuisine] == [("Italian", 2)]
+        assert [(d.value, d.count) for d in facets.by_difficulty] == [(2, 1), (3, 1)]
+        assert {b.label: b.count for b in facets.by_cooking_time} == {
+            "0-15": 0,
+            "15-30": 0,
+            "30-60": 2,
+            "60+": 0,
+        }
+        assert [(i.name, i.count) for i in facets.top_ingredients] == [
+            ("Cheese", 2),
+            ("Pasta", 1),
+            ("Tomato", 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_facets_filters_once(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that every facet comes from one statement over the filtered set."""
+        service = RecipeService(session)
+        query = select(Recipe).where(
+            exists().where(
+                RecipeIngredient.recipe_id == Recipe.id,
+                RecipeIngredient.ingredient_id == 3,
+            )
+        )
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+        try:
+            facets = await service.get_facets(query)
+        finally:
+            event.remove(session.bind.sync_engine, "before_cursor_execute", record)
+
+        # Only the name lookups run besides the one filtering statement
+        assert len([s for s in statements if "recipe_ingredients" in s]) == 1
+        assert sum(f["count"] for f in facets["by_difficulty"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_without_total(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that include_total=False skips the count and reports has_next."""
+        service = RecipeService(session)
+
+        with set_page(FacetedPage[RecipeResponse]), set_params(Params(page=1, size=2)):
+            first = await service.get_paginated_recipes(include_total=False)
+        with set_page(FacetedPage[RecipeResponse]), set_params(Params(page=2, size=2)):
+            last = await service.get_paginated_recipes(include_total=False)
+
+        assert first.total is None
+        assert len(first.items) == 2
+        assert first.has_next is True
+        assert len(last.items) == 1
+        assert last.has_next is False
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_total_cache_invalidated_by_writes(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that cached totals are dropped when a recipe is deleted."""
+        service = RecipeService(session)
+
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            before = await service.get_paginated_recipes(sort="title")
+            await RecipeRepository(session).delete(3)
+            after = await service.get_paginated_recipes(sort="-id")
+
+        assert before.total == 3
+        assert after.total == 2
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_total_cache_keyed_on_exact_name(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that names matching different rows never share a cached total."""
+        service = RecipeService(session)
+
+        with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+            spaced = await service.get_paginated_recipes(name__like="pizza ")
+            plain = await service.get_paginated_recipes(name__like="pizza")
+
+        assert spaced.total == len(spaced.items) == 0
+        assert plain.total == len(plain.items) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_columnar_filters_match_sql(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+        sample_cuisine: Cuisine,
+        monkeypatch,
+    ):
+        """Test that the in-memory range filters page exactly like the SQL ones."""
+        service = RecipeService(session)
+        cases = [
+            {"cooking_time_min": 20, "sort": "-cooking_time"},
+            {"difficulty_max": 2, "sort": "difficulty"},
+            {"cuisine_id": [sample_cuisine.id], "cooking_time_max": 40},
+            {"cooking_time_min": 0, "exclude_allergen_id": [1], "sort": "-id"},
+        ]
+
+        async def run(filters):
+            pages = []
+            for page in (1, 2):
+                with set_page(Page[RecipeResponse]), set_params(Params(page=page, size=1)):
+                    result = await service.get_paginated_recipes(**filters)
+                pages.append((result.total, [item.id for item in result.items]))
+            return pages
+
+        columnar = [await run(filters) for filters in cases]
+        assert recipe_table.loaded
+        monkeypatch.setattr(settings.indexes, "columnar_filters", False)
+        assert columnar == [await run(filters) for filters in cases]
+        assert columnar[0] == [(2, [2]), (2, [1])]
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_columnar_follows_writes(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that repository writes update the in-memory recipe table."""
+        service = RecipeService(session)
+
+        async def quick_ids():
+            with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+                result = await service.get_paginated_recipes(
+                    cooking_time_max=20, sort="id"
+                )
+            return [item.id for item in result.items]
+
+        assert await quick_ids() == [3]
+        repository = RecipeRepository(session)
+        await repository.update(2, RecipeUpdate(cooking_time=10))
+        await repository.delete(3)
+        assert await quick_ids() == [2]
+
+    @pytest.mark.asyncio
+    async def test_get_paginated_recipes_columnar_falls_back_on_foreign_writes(
+        self,
+        session: AsyncSession,
+        multiple_recipes: list[Recipe],
+    ):
+        """Test that rows changed by another worker give SQL results, not short pages."""
+        service = RecipeService(session)
+
+        async def quick():
+            with set_page(Page[RecipeResponse]), set_params(Params(page=1, size=50)):
+                result = await service.get_paginated_recipes(cooking_time_max=20)
+            return result.total, [item.id for item in result.items]
+
+        assert await quick() == (1, [3])
+        # Another worker's write never reaches this process's table
+        await session.execute(update(Recipe).where(Recipe.id == 3).values(cooking_time=90))
+        await session.execute(update(Recipe).where(Recipe.id == 1).values(cooking_time=5))
+
+        assert await quick() == (1, [1])
+        assert recipe_table._is_stale()
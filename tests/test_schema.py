@@ -0,0 +1,117 @@
+"""
+Tests for the schema version check and upgrades.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from models import schema
+from models.schema import SCHEMA_VERSION, ensure_schema, get_schema_version, upgrade_schema
+from models.schema_version import SchemaVersion
+
+
+@pytest_asyncio.fixture
+async def file_engine(tmp_path):
+    """Engine on a database file, so several connections see the same data."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def set_version(engine, version: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(update(SchemaVersion).values(version=version))
+
+
+async def table_names(engine) -> set:
+    async with engine.connect() as conn:
+        return set(await conn.run_sync(lambda c: inspect(c).get_table_names()))
+
+
+class TestEnsureSchema:
+    """Tests for ensure_schema function."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_is_created(self, file_engine):
+        """Test that an empty database gets every table and the current version."""
+        await ensure_schema(file_engine, apply=True)
+
+        assert await get_schema_version(file_engine) == SCHEMA_VERSION
+        assert {"recipes", "recipe_stats", "schema_version"} <= await table_names(file_engine)
+
+    @pytest.mark.asyncio
+    async def test_outdated_database_is_upgraded(self, file_engine):
+        """Test that pending migrations run and the version is bumped."""
+        await ensure_schema(file_engine, apply=True)
+        await set_version(file_engine, SCHEMA_VERSION - 1)
+
+        await ensure_schema(file_engine, apply=True)
+
+        assert await get_schema_version(file_engine) == SCHEMA_VERSION
+
+    @pytest.mark.asyncio
+    async def test_newer_database_is_refused(self, file_engine):
+        """Test that code older than the database refuses to start or upgrade."""
+        await ensure_schema(file_engine, apply=True)
+        await set_version(file_engine, SCHEMA_VERSION + 1)
+
+        with pytest.raises(RuntimeError, match="newer"):
+            await ensure_schema(file_engine, apply=True)
+        with pytest.raises(RuntimeError, match="newer"):
+            await upgrade_schema(file_engine)
+
+    @pytest.mark.asyncio
+    async def test_without_apply_nothing_is_changed(self, file_engine):
+        """Test that apply=False fails on fresh and outdated databases without DDL."""
+        with pytest.raises(RuntimeError, match="schema upgrade"):
+            await ensure_schema(file_engine, apply=False)
+        assert await table_names(file_engine) == set()
+
+        await ensure_schema(file_engine, apply=True)
+        await set_version(file_engine, SCHEMA_VERSION - 1)
+        with pytest.raises(RuntimeError, match="schema upgrade"):
+            await ensure_schema(file_engine, apply=False)
+        assert await get_schema_version(file_engine) == SCHEMA_VERSION - 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_upgrades_run_migrations_once(
+        self, file_engine, tmp_path, monkeypatch
+    ):
+        """Test that workers starting together do not run the same DDL twice."""
+        runs = []
+
+        def counted(version, migration):
+            def run(conn):
+                runs.append(version)
+                migration(conn)
+
+            return run
+
+        monkeypatch.setattr(
+            schema,
+            "MIGRATIONS",
+            {v: counted(v, m) for v, m in schema.MIGRATIONS.items()},
+        )
+        engines = [file_engine] + [
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+            for _ in range(2)
+        ]
+
+        try:
+            await asyncio.gather(*(ensure_schema(e, apply=True) for e in engines))
+        finally:
+            for engine in engines[1:]:
+                await engine.dispose()
+
+        assert runs == sorted(schema.MIGRATIONS)
+        assert await get_schema_version(file_engine) == SCHEMA_VERSION
@@ -0,0 +1,95 @@
+"""
+Tests for SearchService class and the full-text search indexes.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from services.search_service import SearchService
+from repositories.recipe_repository import RecipeRepository
+from models.schema import MIGRATIONS
+from models.users import User
+from indexes.text import analyze
+from schemas.recipe import RecipeCreate, RecipeUpdate
+
+
+async def create_recipes(session: AsyncSession, author_id: int) -> list:
+    repository = RecipeRepository(session)
+    recipes = []
+    for title, description in [
+        ("Baked potatoes", "Potatoes baked in the oven with butter."),
+        ("Tomato soup", "A smooth soup of baked tomatoes and basil."),
+        ("Green salad", "Leaves, cucumber and olive oil."),
+    ]:
+        recipes.append(
+            await repository.create(
+                RecipeCreate(
+                    title=title, description=description, cooking_time=30, difficulty=1
+                ),
+                author_id,
+            )
+        )
+    return recipes
+
+
+class TestAnalyze:
+    """Tests for the tokenizer and stemmer."""
+
+    def test_inflections_share_a_stem(self):
+        """Test that common English and Russian inflections are folded."""
+        assert analyze("Bake BAKED baking") == ["bak", "bak", "bak"]
+        assert analyze("berries, berry") == ["berri", "berri"]
+        assert analyze("Борщ со свёклой") == analyze("борщ со свекла")
+
+
+class TestSearch:
+    """Tests for search method."""
+
+    @pytest.mark.asyncio
+    async def test_memory_index_ranks_title_matches_first(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+    ):
+        """Test BM25 ranking and that repository writes keep the index current."""
+        potatoes, soup, salad = await create_recipes(session, sample_user.id)
+        service = SearchService(session)
+
+        result = await service.search("baking")
+        assert [r["id"] for r in result] == [potatoes.id, soup.id]
+        assert result[0]["score"] > result[1]["score"]
+        assert await service.search("quinoa") == []
+
+        repository = RecipeRepository(session)
+        await repository.update(salad.id, RecipeUpdate(description="Quinoa and leaves."))
+        await repository.delete(potatoes.id)
+
+        assert [r["id"] for r in await service.search("baked quinoa")] == [
+            salad.id,
+            soup.id,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_database_index(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+    ):
+        """Test that the FTS5 table from migration 5 is used and follows writes."""
+        await session.run_sync(lambda s: MIGRATIONS[5](s.connection()))
+        potatoes, soup, salad = await create_recipes(session, sample_user.id)
+        service = SearchService(session)
+
+        assert await service.uses_database()
+        result = await service.search("baking")
+        assert [r["id"] for r in result] == [potatoes.id, soup.id]
+
+        await RecipeRepository(session).update(salad.id, RecipeUpdate(title="Baked salad"))
+        result = await service.search("baked")
+        assert salad.id in [r["id"] for r in result]
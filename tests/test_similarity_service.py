@@ -0,0 +1,99 @@
+"""
+Tests for SimilarityService class and the MinHash similarity index.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from services.similarity_service import SimilarityService
+from repositories.recipe_repository import RecipeRepository
+from indexes.similar import SimilarityIndex, jaccard
+from models.ingredient import Ingredient
+from models.users import User
+from schemas.recipe import RecipeCreate, RecipeIngredientInput
+
+
+async def create_recipe(session: AsyncSession, author_id: int, title: str, *ingredient_ids: int):
+    return await RecipeRepository(session).create(
+        RecipeCreate(
+            title=title,
+            description="Description",
+            cooking_time=10,
+            difficulty=1,
+            ingredients=[
+                RecipeIngredientInput(ingredient_id=i, quantity=1, measurement=2)
+                for i in ingredient_ids
+            ],
+        ),
+        author_id,
+    )
+
+
+class TestSignature:
+    """Tests for MinHash signatures."""
+
+    def test_signature_estimates_jaccard(self):
+        """Test that the share of equal minima approximates Jaccard similarity."""
+        index = SimilarityIndex()
+        a = set(range(0, 60))
+        b = set(range(20, 80))
+        sig_a, sig_b = index.signature(a), index.signature(b)
+
+        estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+        assert abs(estimate - jaccard(a, b)) < 0.15
+
+
+class TestGetSimilarRecipes:
+    """Tests for get_similar_recipes method."""
+
+    @pytest.mark.asyncio
+    async def test_ranks_by_jaccard(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that the closest ingredient sets come first."""
+        base = await create_recipe(session, sample_user.id, "Base", 1, 2, 3, 4)
+        same = await create_recipe(session, sample_user.id, "Same", 1, 2, 3, 4)
+        close = await create_recipe(session, sample_user.id, "Close", 1, 2, 3)
+        service = SimilarityService(session)
+
+        result = await service.get_similar_recipes(base.id, limit=2)
+
+        assert [(r["id"], r["similarity"]) for r in result] == [
+            (same.id, 1.0),
+            (close.id, 0.75),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_index_follows_deletes(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_ingredients: list[Ingredient],
+    ):
+        """Test that deleted recipes are no longer recommended."""
+        base = await create_recipe(session, sample_user.id, "Base", 1, 2)
+        same = await create_recipe(session, sample_user.id, "Same", 1, 2)
+        service = SimilarityService(session)
+        assert [r["id"] for r in await service.get_similar_recipes(base.id)] == [same.id]
+
+        await RecipeRepository(session).delete(same.id)
+
+        assert await service.get_similar_recipes(base.id) == []
+
+    @pytest.mark.asyncio
+    async def test_missing_recipe_raises(self, session: AsyncSession):
+        """Test that an unknown recipe raises ValueError."""
+        service = SimilarityService(session)
+
+        with pytest.raises(ValueError, match="Recipe not found"):
+            await service.get_similar_recipes(9999)
@@ -0,0 +1,107 @@
+"""
+Tests for StatsService class and the recipe_stats counters.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from services.stats_service import StatsService, histogram_percentile
+from repositories.recipe_repository import RecipeRepository
+from repositories.recipe_stats_repository import RecipeStatsRepository
+from models.cuisine import Cuisine
+from models.allergen import Allergen
+from models.users import User
+from schemas.recipe import RecipeCreate, RecipeUpdate
+
+
+def make_recipe(title: str, cooking_time: int, difficulty: int, **kwargs) -> RecipeCreate:
+    return RecipeCreate(
+        title=title,
+        description="Description",
+        cooking_time=cooking_time,
+        difficulty=difficulty,
+        **kwargs,
+    )
+
+
+class TestHistogramPercentile:
+    """Tests for histogram_percentile function."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles over a value histogram."""
+        histogram = {10: 5, 20: 4, 90: 1}
+
+        assert histogram_percentile(histogram, 50) == 10
+        assert histogram_percentile(histogram, 90) == 20
+        assert histogram_percentile(histogram, 99) == 90
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram has no percentiles."""
+        assert histogram_percentile({}, 50) is None
+
+
+class TestGetCatalogStats:
+    """Tests for get_catalog_stats method."""
+
+    @pytest.mark.asyncio
+    async def test_counters_follow_repository_writes(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_cuisine: Cuisine,
+        sample_allergens: list[Allergen],
+    ):
+        """Test that create, update and delete keep the counters in sync."""
+        repository = RecipeRepository(session)
+        first = await repository.create(
+            make_recipe("A", 10, 1, cuisine_id=sample_cuisine.id, allergen_ids=[1, 2]),
+            sample_user.id,
+        )
+        await repository.create(make_recipe("B", 30, 2, allergen_ids=[2]), sample_user.id)
+        third = await repository.create(make_recipe("C", 60, 2), sample_user.id)
+
+        await repository.update(first.id, RecipeUpdate(difficulty=3, allergen_ids=[1]))
+        await repository.delete(third.id)
+
+        stats = await StatsService(session).get_catalog_stats()
+
+        assert stats["total_recipes"] == 2
+        assert stats["by_difficulty"] == [
+            {"value": 2, "count": 1},
+            {"value": 3, "count": 1},
+        ]
+        assert {c["name"]: c["count"] for c in stats["by_cuisine"]} == {
+            "Italian": 1,
+            None: 1,
+        }
+        assert {a["id"]: a["count"] for a in stats["by_allergen"]} == {1: 1, 2: 1}
+        assert stats["cooking_time"]["p50"] == 10
+        assert stats["cooking_time"]["p99"] == 30
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental_counters(
+        self,
+        session: AsyncSession,
+        sample_user: User,
+        sample_cuisine: Cuisine,
+        sample_allergens: list[Allergen],
+    ):
+        """Test that rebuilding from scratch gives the same figures."""
+        repository = RecipeRepository(session)
+        await repository.create(
+            make_recipe("A", 10, 1, cuisine_id=sample_cuisine.id, allergen_ids=[3]),
+            sample_user.id,
+        )
+        await repository.create(make_recipe("B", 20, 4), sample_user.id)
+        service = StatsService(session)
+        incremental = await service.get_catalog_stats()
+
+        await RecipeStatsRepository(session).rebuild()
+
+        assert await service.get_catalog_stats() == incremental
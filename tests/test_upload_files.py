@@ -0,0 +1,136 @@
+"""
+Tests for serving uploads through UploadFiles and LRUBytesCache.
+"""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api.upload_files import LRUBytesCache, UploadFiles
+
+
+def write_blob(directory: Path, body: bytes) -> str:
+    """Write body at its content-addressed path and return the URL path."""
+    digest = hashlib.sha256(body).hexdigest()
+    path = directory / digest[:2] / digest[2:4] / f"{digest}.jpg"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return f"/uploads/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+
+
+def make_client(directory: Path, **options) -> tuple[TestClient, UploadFiles]:
+    files = UploadFiles(directory=str(directory), **options)
+    app = FastAPI()
+    app.mount("/uploads", files)
+    return TestClient(app), files
+
+
+class TestLRUBytesCache:
+    """Tests for LRUBytesCache class."""
+
+    def test_evicts_least_recently_used_by_size(self):
+        """Test that the byte budget, not the entry count, bounds the cache."""
+        cache = LRUBytesCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+
+        cache.put("c", b"cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("c") == b"cccc"
+        assert cache.size == 8
+
+    def test_skips_bodies_larger_than_budget(self):
+        """Test that one oversized body does not flush the whole cache."""
+        cache = LRUBytesCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+
+        cache.put("big", b"x" * 11)
+
+        assert cache.get("big") is None
+        assert cache.get("a") == b"aaaa"
+
+
+class TestUploadFiles:
+    """Tests for UploadFiles class."""
+
+    @pytest.mark.parametrize("memory_cache_bytes", [0, 1024])
+    def test_immutable_etag_and_not_modified(self, tmp_path, memory_cache_bytes):
+        """Test that blobs get their digest as ETag and revalidate to 304."""
+        client, _ = make_client(tmp_path, memory_cache_bytes=memory_cache_bytes)
+        url = write_blob(tmp_path, b"image body")
+        digest = hashlib.sha256(b"image body").hexdigest()
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.content == b"image body"
+        assert response.headers["etag"] == f'"{digest}"'
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+        response = client.get(url, headers={"If-None-Match": f'"{digest}"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == f'"{digest}"'
+
+    def test_serves_small_blobs_from_memory(self, tmp_path):
+        """Test that a cached blob is served without touching the disk."""
+        client, files = make_client(tmp_path, memory_cache_bytes=1024)
+        url = write_blob(tmp_path, b"image body")
+        client.get(url)
+
+        (tmp_path / url.removeprefix("/uploads/")).unlink()
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.content == b"image body"
+        assert files.memory_cache.size == len(b"image body")
+
+    def test_skips_files_over_max_file_bytes(self, tmp_path):
+        """Test that files above memory_cache_max_file_bytes stay on disk only."""
+        client, files = make_client(
+            tmp_path, memory_cache_bytes=1024, memory_cache_max_file_bytes=8
+        )
+        url = write_blob(tmp_path, b"large image body")
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.content == b"large image body"
+        assert "immutable" in response.headers["cache-control"]
+        assert files.memory_cache.size == 0
+
+    def test_plain_files_are_not_immutable(self, tmp_path):
+        """Test that files outside the content-addressed layout keep default caching."""
+        client, _ = make_client(tmp_path, memory_cache_bytes=1024)
+        (tmp_path / "avatar.jpg").write_bytes(b"avatar")
+
+        response = client.get("/uploads/avatar.jpg")
+
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+    @pytest.mark.parametrize("path", ["/uploads/..%2Fsecret.txt", "/uploads/.index"])
+    def test_rejects_traversal_and_dotfiles(self, tmp_path, path):
+        """Test that paths escaping the directory and dotfiles are never served."""
+        directory = tmp_path / "uploads"
+        directory.mkdir()
+        (tmp_path / "secret.txt").write_bytes(b"secret")
+        (directory / ".index").write_bytes(b"index")
+        client, _ = make_client(directory, memory_cache_bytes=1024)
+
+        response = client.get(path)
+
+        assert response.status_code == 404
@@ -0,0 +1,216 @@
+"""
+Tests for UploadService class.
+"""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api import lab1_misc
+from config import settings
+from services.upload_service import (
+    MULTIPART_OVERHEAD_BYTES,
+    UploadService,
+    UploadTooLarge,
+    InvalidImageFormat,
+    detect_image_format,
+)
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def make_upload(data: bytes, filename: str = "image.png") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+class TestDetectImageFormat:
+    """Tests for detect_image_format function."""
+
+    def test_detect_known_formats(self):
+        """Test that PNG, JPEG and WEBP are recognised from magic bytes."""
+        assert detect_image_format(PNG_HEADER + b"rest") == "png"
+        assert detect_image_format(b"\xff\xd8\xff\xe0" + b"\x00" * 8) == "jpg"
+        assert detect_image_format(b"RIFF\x00\x00\x00\x00WEBP") == "webp"
+
+    def test_detect_unknown_format(self):
+        """Test that other content is rejected regardless of file name."""
+        assert detect_image_format(b"GIF89a......") is None
+
+
+class TestSaveImage:
+    """Tests for save_image method."""
+
+    @pytest.mark.asyncio
+    async def test_save_image_success(self, tmp_path):
+        """Test that a valid image is streamed to disk under a generated name."""
+        service = UploadService(
+            tmp_path, max_size=1024, chunk_size=16, content_addressed=False
+        )
+        data = PNG_HEADER + b"x" * 100
+
+        filename = await service.save_image(make_upload(data, "photo.txt"))
+
+        assert filename.endswith(".png")
+        assert (tmp_path / filename).read_bytes() == data
+        assert [p.name for p in tmp_path.iterdir()] == [filename]
+
+    @pytest.mark.asyncio
+    async def test_save_image_invalid_format(self, tmp_path):
+        """Test that non-image content raises InvalidImageFormat and leaves no files."""
+        service = UploadService(tmp_path, max_size=1024, chunk_size=16)
+
+        with pytest.raises(InvalidImageFormat):
+            await service.save_image(make_upload(b"not an image at all"))
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_save_image_content_addressed(self, tmp_path):
+        """Test that content-addressed uploads land under a sharded sha256 path."""
+        service = UploadService(tmp_path, max_size=1024, chunk_size=16)
+        data = PNG_HEADER + b"x" * 100
+        digest = hashlib.sha256(data).hexdigest()
+
+        path = await service.save_image(make_upload(data))
+
+        assert path == f"{digest[:2]}/{digest[2:4]}/{digest}.png"
+        assert (tmp_path / path).read_bytes() == data
+        assert service.index.get(path)["size"] == len(data)
+
+    @pytest.mark.asyncio
+    async def test_save_image_deduplicates(self, tmp_path):
+        """Test that identical uploads return the same path and are stored once."""
+        service = UploadService(tmp_path, max_size=1024, chunk_size=16)
+        data = PNG_HEADER + b"x" * 100
+
+        first = await service.save_image(make_upload(data, "a.png"))
+        second = await service.save_image(make_upload(data, "b.png"))
+
+        assert first == second
+        assert len([p for p in tmp_path.rglob("*.png")]) == 1
+        assert len(UploadService(tmp_path, 1024, 16).index) == 1
+
+    @pytest.mark.asyncio
+    async def test_save_image_too_large(self, tmp_path):
+        """Test that exceeding max_size mid-stream raises UploadTooLarge and cleans up."""
+        service = UploadService(tmp_path, max_size=64, chunk_size=16)
+
+        with pytest.raises(UploadTooLarge):
+            await service.save_image(make_upload(PNG_HEADER + b"x" * 200))
+
+        assert list(tmp_path.iterdir()) == []
+
+
+def make_client(tmp_path, monkeypatch) -> TestClient:
+    monkeypatch.setattr(
+        lab1_misc, "upload_service", UploadService(tmp_path, max_size=1024, chunk_size=16)
+    )
+    app = FastAPI()
+    app.include_router(lab1_misc.router)
+    return TestClient(app)
+
+
+async def post_chunked(app, body: bytes, boundary: str, chunk_size: int):
+    """Send a body without Content-Length; return the status and chunks read."""
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+    sent = []
+    messages = []
+
+    async def receive():
+        if len(sent) < len(chunks):
+            sent.append(chunks[len(sent)])
+            return {"type": "http.request", "body": sent[-1], "more_body": len(sent) < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": f"{settings.url.lab1a1}/upload-image/",
+        "raw_path": b"",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={boundary}".encode()),
+            (b"transfer-encoding", b"chunked"),
+        ],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], len(sent), len(chunks)
+
+
+class TestUploadImageRoute:
+    """Tests for upload_image endpoint."""
+
+    def test_upload_image_success(self, tmp_path, monkeypatch):
+        """Test that the file field is stored and its URL returned."""
+        client = make_client(tmp_path, monkeypatch)
+        data = PNG_HEADER + b"x" * 100
+
+        response = client.post(
+            f"{settings.url.lab1a1}/upload-image/",
+            data={"note": "ignored"},
+            files={"file": ("photo.png", data, "image/png")},
+        )
+
+        assert response.status_code == 200
+        path = response.json()["url"].removeprefix("/uploads/")
+        assert (tmp_path / path).read_bytes() == data
+
+    def test_upload_image_too_large_by_content_length(self, tmp_path, monkeypatch):
+        """Test that a declared oversized body is refused with 413."""
+        client = make_client(tmp_path, monkeypatch)
+        data = PNG_HEADER + b"x" * (MULTIPART_OVERHEAD_BYTES + 2048)
+
+        response = client.post(
+            f"{settings.url.lab1a1}/upload-image/",
+            files={"file": ("photo.png", data, "image/png")},
+        )
+
+        assert response.status_code == 413
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_upload_image_too_large_stops_reading(self, tmp_path, monkeypatch):
+        """Test that a chunked oversized body is refused before it is all received."""
+        app = make_client(tmp_path, monkeypatch).app
+        boundary = "b0undary"
+        data = PNG_HEADER + b"x" * (MULTIPART_OVERHEAD_BYTES * 4)
+        body = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+
+        status, read, total = await post_chunked(app, body, boundary, chunk_size=256)
+
+        assert status == 413
+        assert read < total / 10
+        assert list(tmp_path.iterdir()) == []
+
+    def test_upload_image_missing_field(self, tmp_path, monkeypatch):
+        """Test that a form without the file field is a 400."""
+        client = make_client(tmp_path, monkeypatch)
+
+        response = client.post(
+            f"{settings.url.lab1a1}/upload-image/",
+            files={"other": ("photo.png", PNG_HEADER, "image/png")},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,158 @@
+"""
+Tests for UserManager password hashing through the worker pool.
+"""
+
+import inspect
+import threading
+import tomllib
+
+import fastapi_users
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_users import BaseUserManager
+from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from api.auth import router as auth_router
+from authentication import password_executor as password_executor_module
+from authentication.password_executor import password_executor, PreparedPasswordHelper
+from authentication.fastapi_users import current_active_superuser
+from authentication.schemas.user import UserCreate, UserUpdate
+from authentication.user_manager import UserManager
+from config import settings
+from models import db_helper
+from models.users import User
+
+PYPROJECT = os.path.join(os.path.dirname(__file__), '..', 'pyproject.toml')
+
+
+@pytest.fixture
+def hashing_threads(monkeypatch) -> list[str]:
+    """Names of the threads every hash and verify call ran on."""
+    threads = []
+    hash_password = password_executor_module._hash
+    verify_and_update = password_executor_module._verify_and_update
+
+    def record_hash(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    def record_verify(plain_password, hashed_password):
+        threads.append(threading.current_thread().name)
+        return verify_and_update(plain_password, hashed_password)
+
+    monkeypatch.setattr(password_executor_module, "_hash", record_hash)
+    monkeypatch.setattr(password_executor_module, "_verify_and_update", record_verify)
+    return threads
+
+
+class TestPasswordHashing:
+    """Tests for UserManager hashing off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_every_hash_runs_in_the_pool(
+        self, session: AsyncSession, hashing_threads: list[str], monkeypatch
+    ):
+        """Test that register, update, forgot and reset password never hash on the loop."""
+        manager = UserManager(SQLAlchemyUserDatabase(session, User))
+        tokens = []
+
+        async def on_after_forgot_password(user, token, request=None):
+            tokens.append(token)
+
+        monkeypatch.setattr(manager, "on_after_forgot_password", on_after_forgot_password)
+
+        user = await manager.create(
+            UserCreate(
+                email="cook@example.com",
+                password="first-password",
+                first_name="Test",
+                last_name="Cook",
+            )
+        )
+        user = await manager.update(UserUpdate(password="second-password"), user)
+        await manager.forgot_password(user)
+        user = await manager.reset_password(tokens[0], "third-password")
+
+        verified, _ = await manager.verify_password("third-password", user.hashed_password)
+        assert verified
+        assert len(hashing_threads) == 6
+        assert all(name.startswith("password-hash") for name in hashing_threads)
+
+    def test_saturated_pool_answers_retry_after(self, session: AsyncSession, monkeypatch):
+        """Test that logins beyond max_pending are rejected with 503 and Retry-After."""
+        monkeypatch.setattr(password_executor, "max_pending", 0)
+        app = FastAPI()
+        app.include_router(auth_router)
+        app.dependency_overrides[db_helper.session_getter] = lambda: session
+        rejected = password_executor.rejected
+
+        response = TestClient(app).post(
+            f"{settings.url.auth}/login",
+            data={"username": "nobody@example.com", "password": "secret"},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(
+            settings.password_hashing.retry_after_seconds
+        )
+        assert password_executor.rejected == rejected + 1
+
+
+class TestPasswordPoolStats:
+    """Tests for the /password-pool endpoint."""
+
+    def test_requires_superuser(self, session: AsyncSession):
+        """Test that pool metrics are hidden from anonymous clients."""
+        app = FastAPI()
+        app.include_router(auth_router)
+        app.dependency_overrides[db_helper.session_getter] = lambda: session
+        client = TestClient(app)
+
+        assert client.get(f"{settings.url.auth}/password-pool").status_code == 401
+
+        app.dependency_overrides[current_active_superuser] = lambda: None
+        response = client.get(f"{settings.url.auth}/password-pool")
+
+        assert response.status_code == 200
+        assert response.json()["max_pending"] == password_executor.max_pending
+
+
+class TestUpstreamCompatibility:
+    """Tests that fail when fastapi-users changes under UserManager."""
+
+    def test_fastapi_users_is_pinned(self):
+        """Test that the installed fastapi-users is the version pinned in pyproject."""
+        with open(PYPROJECT, "rb") as f:
+            dependencies = tomllib.load(f)["project"]["dependencies"]
+
+        pinned = [d for d in dependencies if d.startswith("fastapi-users")]
+
+        assert pinned == [f"fastapi-users[sqlalchemy]=={fastapi_users.__version__}"]
+
+    @pytest.mark.parametrize(
+        "name",
+        ["create", "authenticate", "forgot_password", "reset_password", "_update"],
+    )
+    def test_overrides_match_upstream_signatures(self, name):
+        """Test that every wrapped BaseUserManager method keeps its signature."""
+        ours = inspect.signature(getattr(UserManager, name))
+        upstream = inspect.signature(getattr(BaseUserManager, name))
+
+        assert list(ours.parameters) == list(upstream.parameters)
+
+    def test_unprepared_hash_fails_loudly(self):
+        """Test that a hash nobody computed in the pool is never done inline."""
+        helper = PreparedPasswordHelper()
+
+        with pytest.raises(RuntimeError):
+            helper.hash("secret")
+        with pytest.raises(RuntimeError):
+            helper.verify_and_update("secret", "hash")